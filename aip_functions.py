@@ -1,22 +1,84 @@
 """Functions used to make AIPs from folders of digital objects"""
 
+import copy
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import csv
 from datetime import datetime
+import hashlib
+import json
+import math
 import os
 import pathlib
 import platform
+import re
 import shutil
 import subprocess
+import tempfile
 import time
 import xml.etree.ElementTree as et
-import bagit
-import pandas as pd
 
 import configuration as c
+import format_signatures
+import warc_metadata
+
+# Size (bytes), date modified, and inode of a file, saved in the inventory of the AIP folder (AIP.inventory).
+FileInfo = namedtuple("FileInfo", "size mtime inode")
+
+# One row of the metadata.csv, with the columns in the required order. Made by check_metadata_csv().
+MetadataRow = namedtuple("MetadataRow", "Department Collection Folder AIP_ID Title Rights Version")
+
+# Result of a workflow step, which general_aip.py uses to decide if the next step runs.
+# Success is True or False and error is the name of the error folder the AIP was moved to, or the reason if not moved.
+StepResult = namedtuple("StepResult", "success error")
+SUCCESS = StepResult(True, None)
+
+# Characters in file and folder names that break the workflow or ARCHive: control characters, which cannot be in the
+# preservation.xml and break the bag and ingest manifests, characters that are not allowed in Windows names,
+# where the AIPs are unpacked, and bytes that are not valid UTF-8 (read by Python as \udc80 to \udcff).
+NAME_CHARACTERS = re.compile('[\x00-\x1f\x7f<>:"\\\\|?*\udc80-\udcff]')
+
+# The longest path Windows tools (including 7-Zip tar) can read. The preflight check only uses it on Windows.
+WINDOWS_MAX_PATH = 260
+
+# The FITS version from fits -v, by FITS path, and the size in bytes of the FITS cache, by cache folder,
+# saved the first time they are needed so FITS is only started and the cache is only scanned once per run
+# (see fits_cache_path() and evict_fits_cache()).
+FITS_VERSIONS = {}
+FITS_CACHE_SIZES = {}
+
+# The steps of the workflow, in the order make_aip() runs them, used for the time columns in aip_log.csv.
+STEPS = ("Delete_Temp", "Structure", "FITS", "Combine_FITS", "PreservationXML", "PreservationXML_Validation",
+         "Organize_XML", "Bag", "Bag_Validation", "Package", "Manifest")
+
+# Steps with a throughput column in aip_log.csv, and if it is calculated from the number of files or the size.
+THROUGHPUT = {"FITS": "Files", "Bag": "Bytes", "Bag_Validation": "Bytes", "Package": "Bytes"}
+
+# The external tools run by run_tool() and the name used for their resource usage columns in aip_log.csv.
+TOOLS = {"fits": "FITS", "saxon": "Saxon", "xmllint": "Xmllint", "md5deep": "Md5deep", "tar": "Tar",
+         "bzip2": "Bzip2", "7z": "7Zip"}
+
+# Size (bytes) of each read when calculating bag checksums. Large reads are read from the disk in one sequential pass.
+READ_SIZE = 8 * 1024 * 1024
 
 
 class AIP:
-    """Characteristics of each AIP and log data used by multiple functions"""
+    """Characteristics of each AIP and log data used by multiple functions
+
+    The inventory is a dictionary of every file in the AIP folder, with the path relative to the AIP folder
+    and its FileInfo, made and updated by scan_aip(). It is None until the AIP folder is first scanned.
+    folder_listings saves what was in each folder when it was last scanned, so unchanged folders are not scanned again.
+    bag_md5s is a dictionary of FileInfo and MD5 from the manifest of content that was already bagged (read_bag_manifest()).
+    object_hashing is the Future for the bag checksums of the objects folder (hash_objects()), which are calculated
+    while FITS runs. It is None until extract_metadata() starts it.
+    The log also has the time of each step, which make_aip() saves: StepTimes is a dictionary of step name (STEPS)
+    and seconds for the finished steps, StepStart is the name and start time (time.perf_counter()) of the step
+    that is running, and Files and Bytes are the number of files and size of the AIP content.
+    ToolUsage is a dictionary of tool name (TOOLS) and the resource usage of every run of that tool (run_tool()),
+    with the CPU seconds, peak memory (MB), and blocks read and written.
+    events is the path to the JSON lines file that event() adds to, which make_aip() sets to aip_events.jsonl
+    in the staging folder. It is None when a step is run on its own, and then no events are saved.
+    """
 
     def __init__(self, directory, department, workflow, collection_id, folder_name, aip_type, aip_id, title, rights,
                  version, to_zip):
@@ -32,10 +94,32 @@ class AIP:
         self.version = version
         self.to_zip = to_zip
         self.size = None
+        self.inventory = None
+        self.folder_listings = {}
+        self.bag_md5s = {}
+        self.object_hashing = None
+        self.events = None
         self.log = {"Started": datetime.now(), "AIP": self.id, "Deletions": "n/a",
                     "ObjectsError": "n/a", "MetadataError": "n/a", "FITSTool": "n/a", "FITSError": "n/a",
                     "PresXML": "n/a", "PresValid": "n/a", "Bag": "n/a", "BagValid": "n/a", "Package": "n/a",
-                    "Manifest": "n/a", "Complete": "n/a"}
+                    "Manifest": "n/a", "Complete": "n/a", "StepTimes": {}, "StepStart": None,
+                    "Files": None, "Bytes": None, "ToolUsage": {}}
+
+
+def bag_checksums(aip):
+    """Get the checksum algorithms for the bag manifests of the AIP
+
+    To save time, BMAC AV only generates md5 checksums.
+
+    Parameters:
+         aip : instance of the AIP class, used for type and department
+
+    Returns:
+        checksums : list of checksum algorithms
+    """
+    if aip.type == "av" and aip.department == "bmac":
+        return ["md5"]
+    return ["md5", "sha256"]
 
 
 def check_arguments(arguments):
@@ -169,6 +253,50 @@ def check_configuration(aips_dir):
     except AttributeError:
         errors_list.append("STYLESHEETS variable is missing from the configuration file.")
 
+    # PRESERVATION_XML_ENGINE is optional. If it is present, checks it is one of the supported engines.
+    try:
+        if c.PRESERVATION_XML_ENGINE not in ("python", "saxon"):
+            errors_list.append(f"PRESERVATION_XML_ENGINE '{c.PRESERVATION_XML_ENGINE}' is not python or saxon.")
+    except AttributeError:
+        pass
+
+    # FULL_FITS_FORMATS is optional. If it is present, checks it is a list of format names.
+    try:
+        if not isinstance(c.FULL_FITS_FORMATS, (list, tuple)):
+            errors_list.append("FULL_FITS_FORMATS is not a list of format names.")
+    except AttributeError:
+        pass
+
+    # DPX_SAMPLE_SIZE is optional. If it is present, checks it is a whole number of frames.
+    try:
+        if not isinstance(c.DPX_SAMPLE_SIZE, int) or c.DPX_SAMPLE_SIZE < 1:
+            errors_list.append(f"DPX_SAMPLE_SIZE '{c.DPX_SAMPLE_SIZE}' is not a whole number greater than 0.")
+    except AttributeError:
+        pass
+
+    # AIP_MAX_FILES and AIP_MAX_SIZE are optional. If they are present, checks they are whole numbers.
+    for limit in ("AIP_MAX_FILES", "AIP_MAX_SIZE"):
+        try:
+            value = getattr(c, limit)
+            if not isinstance(value, int) or value < 1:
+                errors_list.append(f"{limit} '{value}' is not a whole number greater than 0.")
+        except AttributeError:
+            pass
+
+    # BAG_MANIFEST_SAMPLE is optional. If it is present, checks it is a whole number of files.
+    try:
+        if not isinstance(c.BAG_MANIFEST_SAMPLE, int) or c.BAG_MANIFEST_SAMPLE < 0:
+            errors_list.append(f"BAG_MANIFEST_SAMPLE '{c.BAG_MANIFEST_SAMPLE}' is not a whole number.")
+    except AttributeError:
+        pass
+
+    # FITS_CACHE is optional. If it is present, checks the path is valid.
+    try:
+        if not os.path.exists(c.FITS_CACHE):
+            errors_list.append(f"FITS_CACHE path '{c.FITS_CACHE}' is not correct.")
+    except AttributeError:
+        pass
+
     # For the two variables where the value is not a path, check if the variable exists.
     try:
         c.NAMESPACE
@@ -184,73 +312,83 @@ def check_configuration(aips_dir):
     return errors_list
 
 
-def check_metadata_csv(md_csv, aips_dir):
+def check_metadata_csv(md_csv, aips_dir, check_folders=True):
     """Verify the content of the metadata.csv is correct
 
     - Columns are in the required order
     - Departments match ARCHive group codes
     - No AIP is in the CSV more than once
-    - The AIPs in the CSV match the folders in the AIPs directory
+    - The AIPs in the CSV match the folders in the AIPs directory (unless check_folders is False)
 
     Parameters:
         md_csv : path to the metadata.csv file
         aips_dir : the path to the folder which contains the folders to be made into AIPs
+        check_folders : False to not compare the CSV to the folders, for watch mode where either may be added first
 
     Returns:
-        md_df : pandas.DataFrame with the contents of the metadata csv
+        md_rows : a list of MetadataRow with the contents of the metadata csv (empty if the columns are not correct)
         errors_list : a list of errors, or an empty list if there were no errors
     """
 
     # Starts a list for all encountered errors, so all errors can be checked before returning a result.
     errors_list = []
 
-    # Reads the metadata csv into a df.
-    md_df = pd.read_csv(md_csv, dtype=str)
-    md_df = md_df.fillna('BLANK')
+    # Reads the metadata csv. Blank rows are skipped and blank cells are read as BLANK.
+    with open(md_csv, "r", newline="", encoding="utf-8-sig") as md_file:
+        md_reader = csv.reader(md_file)
+        header = next(md_reader, [])
+        rows = [row for row in md_reader if any(row)]
 
     # Checks that the CSV header row has the required values (case-sensitive).
     # If the header is not correct, returns the error and does not test the column values.
-    header = md_df.columns.values.tolist()
-    if header != ["Department", "Collection", "Folder", "AIP_ID", "Title", "Rights", "Version"]:
+    if header != list(MetadataRow._fields):
         errors_list.append("The columns in the metadata.csv do not match the required values or order.")
         errors_list.append("Required: Department, Collection, Folder, AIP_ID, Title, Rights, Version")
         errors_list.append(f"Current:  {', '.join(header)}")
         errors_list.append("Since the columns are not correct, did not check the column values.")
-        return md_df, errors_list
+        return [], errors_list
+    md_rows = [MetadataRow(*[value if value else "BLANK" for value in (row + [""] * len(header))[:len(header)]])
+               for row in rows]
 
     # Checks that the values in the department column match the expected ARCHive groups from the configuration file.
-    unique_departments = md_df['Department'].unique()
+    # Unique values are checked in the order they are first in the CSV.
+    unique_departments = dict.fromkeys(row.Department for row in md_rows)
     for department in unique_departments:
         if department not in c.GROUPS:
             errors_list.append(f"{department} is not an ARCHive group.")
 
     # Checks that the values in the rights column are either Creative Commons or RightsStatements.org.
-    unique_rights = md_df['Rights'].unique()
+    unique_rights = dict.fromkeys(row.Rights for row in md_rows)
     for right in unique_rights:
         if not(right.startswith('https://creativecommons.org') or right.startswith('http://rightsstatements.org')):
             errors_list.append(f"{right} is not Creative Commons or RightsStatement.org.")
 
     # Checks if there are any duplicate folder names, which is not permitted.
-    duplicate_folders = md_df.loc[md_df['Folder'].duplicated(), 'Folder'].unique()
+    seen_folders = set()
+    duplicate_folders = {}
+    for row in md_rows:
+        if row.Folder in seen_folders:
+            duplicate_folders[row.Folder] = None
+        seen_folders.add(row.Folder)
     if len(duplicate_folders) > 0:
         errors_list.append(f"Duplicate folder(s): {', '.join(duplicate_folders)}.")
 
     # Compares the folders in the metadata csv to the folders in the aips_directory, which should match.
-    aips_directory_list = []
+    if not check_folders:
+        return md_rows, errors_list
+    aips_directory_set = set()
     for item in os.listdir(aips_dir):
         if os.path.isdir(os.path.join(aips_dir, item)):
-            aips_directory_list.append(item)
-    aips_df = pd.DataFrame(aips_directory_list, columns=['AIP'])
-    compare_df = md_df.merge(aips_df, left_on='Folder', right_on='AIP', how='outer', indicator=True)
-    md_only = compare_df.loc[compare_df['_merge'] == 'left_only', 'Folder'].tolist()
+            aips_directory_set.add(item)
+    md_only = sorted(row.Folder for row in md_rows if row.Folder not in aips_directory_set)
     if len(md_only) > 0:
         errors_list.append(f"Folder(s) in metadata csv but not in aips_directory: {', '.join(md_only)}.")
-    dir_only = compare_df.loc[compare_df['_merge'] == 'right_only', 'AIP'].tolist()
+    dir_only = sorted(aips_directory_set - seen_folders)
     if len(dir_only) > 0:
         errors_list.append(f"Folder(s) in aips_directory but not in metadata_csv: {', '.join(dir_only)}.")
 
     # The errors list is empty if there were no errors.
-    return md_df, errors_list
+    return md_rows, errors_list
 
 
 def combine_metadata(aip, staging):
@@ -259,43 +397,60 @@ def combine_metadata(aip, staging):
     It is moved out of the AIP folder and into the fits-xml folder after the preservation.xml is made.
     Only the FITS XML for each file is kept in the AIP.
 
+    The combined-fits.xml is written one FITS document at a time, so only one is in memory at once
+    no matter how many files are in the AIP.
+
     Parameters:
         aip : instance of the AIP class, used for id and log
         staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
-    # Makes a new XML object with the root element named combined-fits.
-    combo_tree = et.ElementTree(et.Element("combined-fits"))
-    combo_root = combo_tree.getroot()
+    # Makes Python aware of the FITS namespace (it is the default and has no prefix).
+    fits_ns = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+    xsi_ns = "http://www.w3.org/2001/XMLSchema-instance"
+    et.register_namespace("", fits_ns)
 
-    # Gets each of the FITS documents in the AIP's metadata folder.
+    # Starts the combined-fits XML file, named aip-id_combined-fits.xml in the AIP's metadata folder,
+    # with the root element combined-fits. The namespaces are declared here instead of in each FITS element.
     metadata_path = os.path.join(aip.directory, aip.id, "metadata")
-    for doc in os.listdir(metadata_path):
-        if doc.endswith("_fits.xml"):
+    fits_path = os.path.join(metadata_path, f"{aip.id}_combined-fits.xml")
+    parse_error = None
+    with open(fits_path, "w", encoding="UTF-8") as combo_file:
+        combo_file.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+        combo_file.write(f'<combined-fits xmlns="{fits_ns}" xmlns:xsi="{xsi_ns}">')
+
+        # Gets each of the FITS documents in the AIP's metadata folder.
+        for doc in os.listdir(metadata_path):
+            if doc.endswith("_fits.xml"):
+
+                # Reads the FITS element and its children, which also checks it is well-formed.
+                # Errors: the file is empty, is not XML, or has invalid XML.
+                try:
+                    root = et.parse(os.path.join(metadata_path, doc)).getroot()
+                except et.ParseError as error:
+                    parse_error = error
+                    break
+
+                # Adds the FITS element to the combined-fits XML file, without repeating the namespaces.
+                fits_xml = et.tostring(root, encoding="unicode")
+                fits_xml = fits_xml.replace(f' xmlns="{fits_ns}"', "", 1).replace(f' xmlns:xsi="{xsi_ns}"', "", 1)
+                combo_file.write(fits_xml)
+                aip.log["FITSError"] = "Success"
 
-            # Makes Python aware of the FITS namespace (it is the default and has no prefix).
-            et.register_namespace("", "http://hul.harvard.edu/ois/xml/ns/fits/fits_output")
+        combo_file.write("</combined-fits>")
 
-            # Gets the FITS element and its children and makes it a child of the root, combined-fits.
-            try:
-                tree = et.parse(os.path.join(metadata_path, doc))
-                root = tree.getroot()
-                combo_root.append(root)
-                aip.log["FITSError"] = "Success"
-            # Errors: the file is empty, is not XML, or has invalid XML.
-            # Moves the AIP to an error folder and does not execute the rest of this function.
-            except et.ParseError as error:
-                aip.log["FITSError"] = f"Issue when creating combined-fits.xml: {error.msg}"
-                aip.log["Complete"] = "Error during processing"
-                log(aip.log, aip.directory)
-                move_error("combining_fits", os.path.join(aip.directory, aip.id), staging)
-                return
-
-    # Saves the combined-fits XML to a file named aip-id_combined-fits.xml in the AIP's metadata folder.
-    fits_path = os.path.join(metadata_path, f"{aip.id}_combined-fits.xml")
-    combo_tree.write(fits_path, xml_declaration=True, encoding="UTF-8")
+    # If there was an error, deletes the incomplete combined-fits XML file, moves the AIP to an error folder,
+    # and does not execute the rest of this function.
+    if parse_error:
+        os.remove(fits_path)
+        aip.log["FITSError"] = f"Issue when creating combined-fits.xml: {parse_error.msg}"
+        aip.log["Complete"] = "Error during processing"
+        log(aip.log, aip.directory)
+        return move_error("combining_fits", os.path.join(aip.directory, aip.id), staging)
+    return SUCCESS
 
 
 def delete_temp(aip, aip_path, logging):
@@ -306,13 +461,15 @@ def delete_temp(aip, aip_path, logging):
 
     A log is made the first time temporary files are deleted, since they likely came with the accession.
     Later deletions are for temporary files made by the AIP creation process in a Mac and do not need a log.
+    Files are found with the AIP inventory, which is updated first (see scan_aip()).
 
     Parameters:
          aip : instance of the AIP class, used for directory, id and log
          aip_path : path to the aip folder, either named with the aip_id or aip_id_bag
          logging : True or False, indicating if a deletion log should be made
 
-    Returns: none
+    Returns:
+        result : StepResult, which is always a success
     """
 
     # List of files that were deleted, to save to a log.
@@ -322,15 +479,17 @@ def delete_temp(aip, aip_path, logging):
     # Deletes DS_Store, Thumbs.db, starts with a dot, or ends with .tmp.
     # Gets information for the deletion log if a log will be made and deletes the file.
     delete_list = [".DS_Store", "._.DS_Store", "Thumbs.db"]
-    for root, directories, files in os.walk(aip_path):
-        for item in files:
-            if item in delete_list or item.endswith(".tmp") or item.startswith("."):
-                if logging:
-                    path = os.path.join(root, item)
-                    date = time.gmtime(os.path.getmtime(path))
-                    date_reformatted = f"{date.tm_year}-{date.tm_mon}-{date.tm_mday} {date.tm_hour}:{date.tm_hour}:{date.tm_min}"
-                    deleted_files.append([path, item, os.path.getsize(path), date_reformatted])
-                os.remove(os.path.join(root, item))
+    scan_aip(aip, aip_path)
+    for relative_path, file_info in list(aip.inventory.items()):
+        item = os.path.basename(relative_path)
+        if item in delete_list or item.endswith(".tmp") or item.startswith("."):
+            path = os.path.join(aip_path, relative_path)
+            if logging:
+                date = time.gmtime(file_info.mtime)
+                date_reformatted = f"{date.tm_year}-{date.tm_mon}-{date.tm_mday} {date.tm_hour}:{date.tm_hour}:{date.tm_min}"
+                deleted_files.append([path, item, file_info.size, date_reformatted])
+            os.remove(path)
+            del aip.inventory[relative_path]
 
     # If there is logging, creates the deletion log and updates the AIP log.
     # The deletion log contains the path, filename, size in bytes and date/time last modified of every deleted file.
@@ -346,25 +505,277 @@ def delete_temp(aip, aip_path, logging):
             aip.log["Deletions"] = "Yes (see log)"
         else:
             aip.log["Deletions"] = "No"
+    return SUCCESS
+
+
+def dpx_sample(aip, fits_input, sample_size):
+    """Find the DPX frame sequences in the -dpx folders and choose a sample of frames from each for FITS
+
+    A sequence is the frames in one folder with the same name before the frame number
+    and the same DPX header information (version, image size, and pixel format), so they are the same format.
+    The sample is spread evenly through the sequence, including the first and last frames.
+    The rest of the frames get FITS output made from the nearest sample frame by make_dpx_fits().
+    Prints the number of frames FITS runs on.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        fits_input : path to the folder FITS would run on (objects or fits-input)
+        sample_size : number of frames from each sequence that FITS runs on
+
+    Returns:
+        fits_input : path to the folder to run FITS on (objects or fits-input), or None if there are no files
+        derived : a list of tuples with the path to a frame not in the sample and the path to its sample frame,
+                  both in the objects folder
+    """
+
+    # Groups the DPX frames into sequences. Anything that is not a DPX frame with a readable header gets FITS.
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    sequences = {}
+    remaining = []
+    for root, directories, files in os.walk(fits_input):
+        for file in files:
+            file_path = os.path.join(objects, os.path.relpath(os.path.join(root, file), fits_input))
+            folders = pathlib.Path(os.path.relpath(file_path, objects)).parts[:-1]
+            frame = re.match(r"(.*?)(\d+)\.dpx$", file, re.IGNORECASE)
+            if not frame or not any(folder.endswith("-dpx") for folder in folders):
+                remaining.append(file_path)
+                continue
+            with open(os.path.join(root, file), "rb") as dpx:
+                header = dpx.read(808)
+            if len(header) < 808 or header[:4] not in (b"SDPX", b"XPDS"):
+                remaining.append(file_path)
+                continue
+            key = (root, frame.group(1), header[:16] + header[768:784] + header[800:804])
+            sequences.setdefault(key, []).append((int(frame.group(2)), file_path))
+
+    # Chooses the sample for each sequence. Sequences no bigger than the sample all get FITS.
+    derived = []
+    file_count = len(remaining)
+    sampled_sequences = 0
+    for frames in sequences.values():
+        frames = [file_path for number, file_path in sorted(frames)]
+        file_count += len(frames)
+        if len(frames) <= sample_size:
+            remaining.extend(frames)
+            continue
+        sampled_sequences += 1
+        sample = {round(i * (len(frames) - 1) / max(sample_size - 1, 1)) for i in range(max(sample_size, 1))}
+        sample_frame = frames[0]
+        for index, file_path in enumerate(frames):
+            if index in sample:
+                sample_frame = file_path
+                remaining.append(file_path)
+            else:
+                derived.append((file_path, sample_frame))
+
+    # Removes the frames that are not in the sample from the FITS input, which is now the fits-input folder.
+    if derived:
+        print(f"DPX sample: FITS runs on {len(remaining)} of {file_count} files "
+              f"({len(derived)} frames from {sampled_sequences} sequences use the sample)")
+        fits_input = make_fits_input(aip, remaining)
+    return fits_input, derived
+
+
+def entry_file_info(entry):
+    """Get the FileInfo of a file from its DirEntry, which is used to match a file in the inventory and checksums
+
+    The file is only stat once. The inode is from entry.inode(), since entry.stat() has 0 for the inode on Windows.
+
+    Parameters:
+        entry : the DirEntry for the file, from os.scandir()
+
+    Returns:
+        entry_stat : the stat of the file, not following symlinks
+        file_info : the FileInfo of the file (size, date modified, and inode)
+    """
+    entry_stat = entry.stat(follow_symlinks=False)
+    return entry_stat, FileInfo(entry_stat.st_size, entry_stat.st_mtime, entry.inode())
+
+
+def event(aip, event_type, **details):
+    """Add an event for the AIP to the JSON lines file of events (aip.events)
+
+    Each event is one line, a JSON object with the time, AIP ID, event type, and any details,
+    so the events of a run can be read by other scripts while it is still running.
+    The file is opened for each event, which is only a few dozen times per AIP.
+
+    Parameters:
+         aip : instance of the AIP class, used for events and id
+         event_type : the kind of event, for example step_start or tool
+         details : keyword arguments with information about the event, which must be serializable as JSON
+
+    Returns: none
+    """
+    if aip.events is None:
+        return
+    line = {"time": datetime.now().isoformat(), "aip": aip.id, "event": event_type, **details}
+    with open(aip.events, "a", encoding="utf-8") as events_file:
+        events_file.write(json.dumps(line) + "\n")
+
+
+def evict_fits_cache(cache_root, added_size, size_limit):
+    """Delete the least recently used FITS output from the FITS cache if it is larger than the size limit
+
+    The size of the cache is saved (FITS_CACHE_SIZES) the first time, and then the size of new output is added to it,
+    so the cache is only scanned once per run and again each time it is over the limit.
+    Cached FITS output has its date modified updated each time it is used, so the oldest is least recently used.
+    This includes output made with a previous FITS version or configuration, which is no longer used.
+    Output is deleted until the cache is 90% of the limit, so it is not scanned again after every AIP once it is full.
+
+    Parameters:
+        cache_root : path to the FITS cache, which contains one folder per FITS version and configuration
+        added_size : bytes of FITS output added to the cache since this was last run
+        size_limit : the largest size of the cache in bytes, from FITS_CACHE_SIZE in configuration.py
+
+    Returns: none
+    """
+
+    # If the cache size is known and is still under the limit, there is nothing to delete.
+    if cache_root in FITS_CACHE_SIZES:
+        FITS_CACHE_SIZES[cache_root] += added_size
+        if FITS_CACHE_SIZES[cache_root] <= size_limit:
+            return
+
+    # Gets the date modified and size of every file in the cache and deletes the oldest until under the limit.
+    cached_files = []
+    for root, directories, files in os.walk(cache_root):
+        for file in files:
+            stats = os.stat(os.path.join(root, file))
+            cached_files.append((stats.st_mtime, stats.st_size, os.path.join(root, file)))
+    cache_size = sum(file_size for mtime, file_size, path in cached_files)
+    if cache_size > size_limit:
+        for mtime, file_size, path in sorted(cached_files):
+            if cache_size <= size_limit * 0.9:
+                break
+            os.remove(path)
+            cache_size -= file_size
+    FITS_CACHE_SIZES[cache_root] = cache_size
+
+
+def exceeds_page_cache(size):
+    """Test if an amount of data is too large to keep in memory (the page cache) while it is read
+
+    Files read for an AIP that is this large are dropped from the page cache after they are read (see hash_file()),
+    since they would be evicted before they are read again, and otherwise they evict everything else in the cache.
+    The limit is half of the physical memory. This is only known on Linux, which is also the only operating system
+    where Python can give the hint to drop the files (os.posix_fadvise()).
+
+    Parameters:
+        size : the amount of data in bytes
+
+    Returns:
+        True if the size is over the limit, or False if it is not or the physical memory is not known
+    """
+    try:
+        memory = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return False
+    return size > memory // 2
 
 
 def extract_metadata(aip):
     """Extract technical metadata from the files in the objects folder using FITS and saves to metadata folder
 
+    FITS uses the configuration for the profile that matches the AIP type and workflow (see fits_profile()),
+    and the time each FITS tool took is saved to fits_tool_times.csv in the AIPs directory.
+
+    If configuration.py has a FITS_CACHE, FITS output is reused for any file with the same content (MD5)
+    as a file characterized previously with the same profile, and FITS only runs on the rest of the files.
+
+    If configuration.py has FULL_FITS_FORMATS, files with a common format are first identified from their signature
+    and get minimal FITS output instead (see pre_identify()), unless the format is in FULL_FITS_FORMATS.
+    For web AIPs, if WARC_STREAMING is True in configuration.py, WARCs get FITS output made by reading their records
+    instead (see stream_warcs()).
+
+    For the DPX workflow, FITS runs on a sample of the frames in each frame sequence (see dpx_sample())
+    and the FITS output for the rest of the frames is made from the sample.
+
+    While this runs, the bag checksums of the objects are calculated in another thread (see hash_objects()).
+
     Parameters:
          aip : instance of the AIP class, used for directory, id, and log
 
-    Returns: none
+    Returns:
+        result : StepResult, which is always a success (FITS errors are saved to the metadata folder)
     """
 
+    # Starts calculating the bag checksums of the objects in another thread, which make_bag() uses,
+    # so reading the files for the bag happens at the same time as FITS instead of after it.
+    # The MD5 of files that were already bagged are not calculated again, so if the bag only has MD5
+    # and every object was already bagged (for example, the dpx workflow), there is nothing to calculate.
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    checksums = bag_checksums(aip)
+    # Listing the objects folder to check only reads the size, date modified, and inode of each file.
+    all_known = False
+    if checksums == ["md5"] and aip.bag_md5s:
+        try:
+            folders, entries = list_by_inode(objects)
+            all_known = all(entry_file_info(entry)[1] in aip.bag_md5s for entry in entries)
+        except OSError:
+            pass
+    if not all_known:
+        # The executor is shut down without waiting, which lets the thread finish on its own.
+        executor = ThreadPoolExecutor(max_workers=1)
+        aip.object_hashing = executor.submit(hash_objects, objects, checksums, aip.bag_md5s)
+        executor.shutdown(wait=False)
+
+    # If there is a FITS cache, gets the cached FITS output for files that were already characterized
+    # and the path to a folder with the rest of the files, or None if every file was in the cache.
+    # The files are matched by the MD5 from the bag checksums, so FITS waits for those if the cache is not empty.
+    metadata = os.path.join(aip.directory, aip.id, "metadata")
+    profile, config_path = fits_profile(aip)
+    cache_path = fits_cache_path(config_path)
+    fits_input = objects
+    cached_files = []
+    if cache_path:
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+
+    # For web AIPs, if WARC streaming is used, characterizes the WARCs without FITS
+    # and removes those from the FITS input. WARC_STREAMING is optional.
+    warcs = []
+    other_times = {}
+    try:
+        warc_streaming = c.WARC_STREAMING
+    except AttributeError:
+        warc_streaming = False
+    if fits_input and aip.type == "web" and warc_streaming:
+        start = time.perf_counter()
+        fits_input, warcs = stream_warcs(aip, fits_input)
+        other_times[warc_metadata.TOOL_NAME] = (len(warcs), time.perf_counter() - start)
+
+    # If pre-identification is used, identifies what it can of the files FITS would run on
+    # and removes those from the FITS input. FULL_FITS_FORMATS is optional.
+    identified = []
+    try:
+        full_fits_formats = c.FULL_FITS_FORMATS
+    except AttributeError:
+        full_fits_formats = None
+    if fits_input and full_fits_formats is not None:
+        start = time.perf_counter()
+        fits_input, identified = pre_identify(aip, fits_input, full_fits_formats)
+        other_times[format_signatures.TOOL_NAME] = (len(identified), time.perf_counter() - start)
+
+    # For the DPX workflow, FITS only runs on a sample of the frames in each DPX frame sequence.
+    # DPX_SAMPLE_SIZE is optional, and the default is 30 frames per sequence.
+    derived = []
+    if fits_input and aip.workflow == "dpx":
+        try:
+            sample_size = c.DPX_SAMPLE_SIZE
+        except AttributeError:
+            sample_size = 30
+        fits_input, derived = dpx_sample(aip, fits_input, sample_size)
+
     # Runs FITS on the files in the AIP's objects folder and saves the output to its metadata folder.
     # The FITS output is named with the original file name. If there is more than one file anywhere
     # within the objects folder with the same name, FITS adds a number to the duplicates, for example:
     # file.ext.fits.xml, file.ext-1.fits.xml, file.ext-2.fits.xml
-    objects = os.path.join(aip.directory, aip.id, "objects")
-    metadata = os.path.join(aip.directory, aip.id, "metadata")
-    fits_output = subprocess.run(f'"{c.FITS}" -r -i "{objects}" -o "{metadata}"',
-                                 shell=True, stderr=subprocess.PIPE)
+    # If there is a profile for this AIP, FITS uses its configuration (-f) instead of fits.xml.
+    if fits_input:
+        config = f' -f "{config_path}"' if config_path else ""
+        fits_output = run_tool(aip, "fits", f'"{c.FITS}" -r -i "{fits_input}" -o "{metadata}"{config}',
+                               shell=True, stderr=subprocess.PIPE)
+    else:
+        fits_output = subprocess.CompletedProcess(args=None, returncode=0, stderr=b"")
 
     # If there were any tool error messages from FITS, saves those to a log in the AIP's metadata folder.
     # Processing on the AIP continues, since typically other tools still work.
@@ -384,11 +795,348 @@ def extract_metadata(aip):
             new_name = item.replace(".fits", "_fits")
             os.rename(os.path.join(metadata, item), os.path.join(metadata, new_name))
 
+    # If FITS was run on the fits-input folder, updates the file paths in the FITS output to the objects folder
+    # and deletes the fits-input folder.
+    if fits_input and fits_input != objects:
+        fits_ns = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+        et.register_namespace("", fits_ns)
+        for item in os.listdir(metadata):
+            if item.endswith("_fits.xml"):
+                try:
+                    tree = et.parse(os.path.join(metadata, item))
+                except et.ParseError:
+                    continue
+                filepath = tree.getroot().find(f"{{{fits_ns}}}fileinfo/{{{fits_ns}}}filepath")
+                if filepath is not None and filepath.text:
+                    filepath.text = filepath.text.replace(fits_input, objects)
+                    tree.write(os.path.join(metadata, item), xml_declaration=True, encoding="UTF-8")
+        shutil.rmtree(fits_input)
+
+    # Saves the time each FITS tool, WARC streaming, and the pre-identification took. This is before the cached
+    # FITS output is added to the metadata folder, since those tools did not run for this AIP.
+    fits_tool_times(aip, profile, other_times)
+
+    # Adds the new FITS output to the cache and saves the cached FITS output to the metadata folder.
+    if cache_path:
+        update_fits_cache(aip, cache_path, cached_files)
+
+    # Saves the FITS output for the WARCs and files identified from their signature. This is after the cache
+    # is updated, so it is not cached and a file will get full FITS if these options are turned off.
+    if warcs:
+        make_signature_fits(aip, warcs, (warc_metadata.TOOL_NAME, warc_metadata.TOOL_VERSION))
+    if identified:
+        make_signature_fits(aip, identified, (format_signatures.TOOL_NAME, format_signatures.TOOL_VERSION))
+
+    # Saves the FITS output for the DPX frames that were not in the sample, made from the sample FITS output.
+    # This is after the cache is updated, so it is not cached.
+    if derived:
+        make_dpx_fits(aip, derived)
+    return SUCCESS
+
+
+def find_ready_aips(aips_dir, md_rows, watched, quiet_period):
+    """Find the AIP folders that are done being copied into the AIPs directory, for watch mode (watch_aips.py)
+
+    A folder is ready when it has a row in metadata.csv, has at least one file, and is complete: either there is
+    a file named with the folder name and ".complete" in the AIPs directory (for example, "FD001_Text.complete"),
+    or nothing in the folder has changed for the quiet period. Changes are found by comparing the inventory of
+    the folder (scan_aip()) to the one from the last check, so only the folders in it that changed are listed again.
+
+    Parameters:
+        aips_dir : the path to the folder which contains the folders to be made into AIPs
+        md_rows : a list of MetadataRow for the AIPs that are not made yet
+        watched : a dictionary of folder name and a tuple of the AIP instance with the inventory from the last check
+                  and the time the folder last changed, which is updated by this function
+        quiet_period : seconds a folder must be unchanged to be ready, if it does not have a .complete file
+
+    Returns:
+        ready : a list of MetadataRow for the folders that are ready, in the same order as md_rows
+    """
+
+    now = time.time()
+    ready = []
+    for row in md_rows:
+        folder_path = os.path.join(aips_dir, row.Folder)
+        if not os.path.isdir(folder_path):
+            continue
+
+        # Scans the folder, and if the inventory is different from the last check, saves that it changed now.
+        if row.Folder in watched:
+            aip, last_change = watched[row.Folder]
+        else:
+            aip = AIP(aips_dir, row.Department, None, row.Collection, row.Folder, None, row.AIP_ID, row.Title,
+                      row.Rights, row.Version, False)
+            last_change = now
+        previous_inventory = aip.inventory
+        scan_aip(aip, folder_path)
+        if aip.inventory != previous_inventory:
+            last_change = now
+        watched[row.Folder] = (aip, last_change)
+
+        complete = os.path.exists(os.path.join(aips_dir, f"{row.Folder}.complete"))
+        if aip.inventory and (complete or now - last_change >= quiet_period):
+            ready.append(row)
+    return ready
+
+
+def fits_cache_path(config_path=None):
+    """Get the folder in the FITS cache for the current FITS version and FITS configuration
+
+    FITS output is only reused if it was made by the same version of FITS with the same tools,
+    so the folder name is calculated from both and changing either starts a new folder.
+
+    Parameters:
+        config_path : path to the FITS configuration from fits_profile(), or None if FITS uses fits.xml
+            (the FITS cache and FITS paths are from configuration.py)
+
+    Returns:
+        cache_path : path to the folder in the FITS cache, or None if configuration.py does not have a FITS_CACHE
+    """
+
+    # The FITS cache is optional.
+    try:
+        cache_root = c.FITS_CACHE
+    except AttributeError:
+        return None
+
+    # Combines the FITS version (printed by fits -v) and the contents of the FITS configuration into a single key.
+    # FITS is only run to get the version the first time, since starting Java takes a few seconds.
+    if c.FITS not in FITS_VERSIONS:
+        version_output = subprocess.run(f'"{c.FITS}" -v', shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        FITS_VERSIONS[c.FITS] = version_output.stdout.strip()
+    key = hashlib.md5(FITS_VERSIONS[c.FITS])
+    fits_xml = config_path or os.path.join(os.path.dirname(c.FITS), "xml", "fits.xml")
+    if os.path.exists(fits_xml):
+        with open(fits_xml, "rb") as config:
+            key.update(config.read())
+
+    cache_path = os.path.join(cache_root, key.hexdigest())
+    os.makedirs(cache_path, exist_ok=True)
+    return cache_path
+
+
+def fits_profile(aip):
+    """Get the FITS configuration for the AIP type and workflow, made from a profile in the fits_profiles folder
+
+    Profiles turn off FITS tools that are slow or not useful for that kind of content.
+    The most specific profile is used: AIP type and workflow (for example, av_dpx.xml) and then AIP type (web.xml).
+    The configuration is made from the fits.xml in the FITS installation, so it has any local changes,
+    and is saved in the fits-configs folder in AIP_STAGING, so the FITS installation is not changed.
+    It is named with the profile and part of the MD5 of fits.xml and the profile, so it is only made again
+    when either changes, and every script running at the same time uses the same file.
+
+    Parameters:
+        aip : instance of the AIP class, used for type and workflow
+
+    Returns:
+        profile : name of the profile, or "fits" if there is no profile for the AIP
+        config_path : path to the FITS configuration for the profile, or None if FITS uses fits.xml
+    """
+
+    profiles = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fits_profiles")
+    fits_xml = os.path.join(os.path.dirname(c.FITS), "xml", "fits.xml")
+    if os.path.exists(fits_xml):
+        for profile in (f"{aip.type}_{aip.workflow}", aip.type):
+            profile_path = os.path.join(profiles, f"{profile}.xml")
+            if os.path.exists(profile_path):
+                key = hashlib.md5()
+                for path in (fits_xml, profile_path):
+                    with open(path, "rb") as config:
+                        key.update(config.read())
+                config_path = os.path.join(c.AIP_STAGING, "fits-configs", f"fits_{profile}_{key.hexdigest()[:12]}.xml")
+                if not os.path.exists(config_path):
+                    os.makedirs(os.path.dirname(config_path), exist_ok=True)
+                    make_fits_config(fits_xml, profile_path, config_path)
+                return profile, config_path
+    return "fits", None
+
+
+def fits_tool_times(aip, profile, other_times=None):
+    """Save the time each FITS tool took for the AIP to fits_tool_times.csv in the AIPs directory
+
+    The times are from the statistics in the FITS output for each file, which are added together for the AIP.
+    Comparing AIPs made with different profiles shows the time each profile saves.
+    Anything used instead of FITS for some files, like the pre-identification, is included as another tool.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        profile : name of the FITS profile used for the AIP
+        other_times : dictionary with the name of anything used instead of FITS and a tuple with
+                      the number of files and the time it took (seconds), or None
+
+    Returns: none
+    """
+
+    # Adds together the number of files and time (milliseconds) for every tool that ran.
+    # Tools that did not run for a file do not have an executionTime.
+    ns = {"fits": "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"}
+    metadata = os.path.join(aip.directory, aip.id, "metadata")
+    tool_times = {}
+    for item in os.listdir(metadata):
+        if item.endswith("_fits.xml"):
+            try:
+                root = et.parse(os.path.join(metadata, item)).getroot()
+            except et.ParseError:
+                continue
+            for tool in root.findall("fits:statistics/fits:tool[@executionTime]", ns):
+                files, milliseconds = tool_times.get(tool.get("toolname"), (0, 0))
+                tool_times[tool.get("toolname")] = (files + 1, milliseconds + int(tool.get("executionTime")))
+    for tool_name, (files, seconds) in (other_times or {}).items():
+        if files:
+            tool_times[tool_name] = (files, seconds * 1000)
+
+    # Saves one row per tool, adding the header if the CSV is new. Nothing is saved if FITS did not run.
+    if tool_times:
+        times_csv = os.path.join(aip.directory, "fits_tool_times.csv")
+        is_new = not os.path.exists(times_csv)
+        with open(times_csv, "a", newline="") as times_file:
+            times_writer = csv.writer(times_file)
+            if is_new:
+                times_writer.writerow(["AIP_ID", "FITS_Profile", "Tool", "Files", "Seconds"])
+            for tool_name, (files, milliseconds) in sorted(tool_times.items()):
+                times_writer.writerow([aip.id, profile, tool_name, files, round(milliseconds / 1000, 3)])
+
+
+def forget_listing(aip, folder_path):
+    """Remove the saved listing of a folder, so the next scan (scan_aip()) lists the folder again
+
+    This is needed after a file in the folder is rewritten in place, which does not change the folder date modified,
+    so the saved listing would still have the size and date modified from before it was rewritten.
+
+    Parameters:
+        aip : instance of the AIP class, used for folder_listings
+        folder_path : path to the folder
+
+    Returns: none
+    """
+    if os.path.isdir(folder_path):
+        folder_stat = os.stat(folder_path)
+        aip.folder_listings.pop((folder_stat.st_dev, folder_stat.st_ino), None)
+
+
+def hash_file(path, checksums, drop_behind=False):
+    """Calculate one or more checksums of a file, reading it once
+
+    The file is read in large chunks (READ_SIZE). On Linux, the operating system is told the file is read
+    sequentially, so it reads ahead more, and if drop_behind is True, to drop the file from the page cache after,
+    so reading a large AIP does not evict everything else from memory.
+
+    Parameters:
+        path : path to the file
+        checksums : list of checksum algorithms
+        drop_behind : True to drop the file from the page cache after it is read
+
+    Returns:
+        digests : a dictionary of the algorithm and checksum
+        size : the number of bytes read
+    """
+    hashes = [hashlib.new(algorithm) for algorithm in checksums]
+    size = 0
+    with open(path, "rb", buffering=0) as open_file:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(open_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        for chunk in iter(lambda: open_file.read(READ_SIZE), b""):
+            size += len(chunk)
+            for file_hash in hashes:
+                file_hash.update(chunk)
+        if drop_behind and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(open_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return {algorithm: file_hash.hexdigest() for algorithm, file_hash in zip(checksums, hashes)}, size
+
+
+def hash_objects(objects, checksums, known_md5s=None):
+    """Calculate the bag checksums of every file in the objects folder, while FITS runs on the same files
+
+    extract_metadata() runs this in a separate thread, so the files are read for the bag while FITS (which mostly
+    uses the CPU) runs, instead of after it, and make_bag() uses these checksums instead of reading every file again.
+    The files are read in inode order (see list_by_inode()) with hash_file(), dropping them from the page cache after
+    if the AIP is too large to keep in memory (see exceeds_page_cache()).
+    The checksums are saved by the FileInfo of the file, the same as in the inventory (see scan_aip()),
+    which does not change when the file is moved into the bag. A file that is changed while it is read is not saved,
+    and neither is a file that cannot be read (for example, because the AIP was moved to an error folder),
+    so make_bag() calculates the checksums for those, along with the files in the metadata folder.
+    Files with an MD5 from a bag that was already made (AIP.bag_md5s) are only read for the other checksums,
+    so for AIPs that only have MD5 in the bag (bag_checksums()), files that were already bagged are not read at all.
+
+    Parameters:
+        objects : path to the objects folder
+        checksums : list of checksum algorithms for the bag manifests
+        known_md5s : dictionary of FileInfo and MD5 that are already known, or None
+
+    Returns:
+        object_checksums : a dictionary with the FileInfo of each file and a dictionary of the algorithm and checksum,
+                           which only has the checksums that were calculated
+    """
+
+    try:
+        folders, entries = list_by_inode(objects)
+    except OSError:
+        return {}
+    known_md5s = known_md5s or {}
+    file_stats = []
+    for entry in entries:
+        try:
+            before, file_info = entry_file_info(entry)
+        except OSError:
+            continue
+        needed = [checksum for checksum in checksums if not (checksum == "md5" and file_info in known_md5s)]
+        if needed:
+            file_stats.append((entry, before, file_info, needed))
+    drop_behind = exceeds_page_cache(sum(before.st_size for entry, before, file_info, needed in file_stats))
+
+    object_checksums = {}
+    for entry, before, file_info, needed in file_stats:
+        try:
+            digests, size = hash_file(entry.path, needed, drop_behind)
+            after = os.stat(entry.path, follow_symlinks=False)
+        except OSError:
+            continue
+        if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+            object_checksums[file_info] = digests
+    return object_checksums
+
+
+def list_by_inode(folder_path):
+    """List every folder and file in a folder, with the files in inode order, which is the order to read them in
+
+    On most file systems, files made one after the other get inodes in order and are near each other on the disk,
+    so reading files in inode order instead of path order has fewer seeks on a hard drive,
+    for example when content was copied to the hard drive in a different order than its file names.
+    The inode is from DirEntry.inode(), which does not read anything else on Mac and Linux.
+
+    Parameters:
+        folder_path : path to the folder
+
+    Returns:
+        folders : a list of the path to every folder in folder_path, sorted by path
+        files : a list of the DirEntry of every file in folder_path, sorted by inode
+    """
+    folders = []
+    files = []
+    to_list = [folder_path]
+    while to_list:
+        with os.scandir(to_list.pop()) as folder:
+            for entry in folder:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                    to_list.append(entry.path)
+                else:
+                    files.append(entry)
+    files.sort(key=lambda entry: entry.inode())
+    return sorted(folders), files
+
 
 def log(log_data, aips_dir):
     """Save the result about each step done on an AIP to a CSV file
 
     Information is saved to the log after the AIP either finishes processing or encounters an anticipated error.
+    After the result columns, there is a column for the seconds each step took (STEPS), the number of files and bytes
+    of the AIP content, and the throughput of the steps that read all the content (THROUGHPUT), in files or MB per
+    second. These are blank for steps that did not run. The step that saves the log is timed until the log is saved.
+    Last is the CPU seconds (user and system) and peak memory of each external tool (TOOLS), and the blocks read
+    and written by all the tools, which are blank for tools that did not run or on Windows.
+    If the log was started by a version of the script without these columns, the header is updated to add them
+    and the earlier rows are blank for them.
 
     Parameters:
         log_data : "header" or dictionary with log information for the AIP
@@ -400,46 +1148,257 @@ def log(log_data, aips_dir):
     # Formats the data for this row in the log CSV as a list.
     # For the header, uses default values.
     # In all other cases, log_data is a dictionary, with one key per column in the log.
+    header = ["Time_Started", "AIP_ID", "Files_Deleted", "Objects_Folder_Made", "Metadata_Folder_Made",
+              "FITS_Tool_Errors", "FITS_Combination_Errors", "PreservationXML_Made", "PreservationXML_Valid",
+              "Bag_Made", "Bag_Valid", "Package_Errors", "Manifest_Errors", "Processing_Complete"]
+    time_header = ([f"{step}_Seconds" for step in STEPS] + ["Files", "Bytes"]
+                   + [f"{step}_{'Files' if unit == 'Files' else 'MB'}_per_Second" for step, unit in THROUGHPUT.items()]
+                   + [f"{name}_{column}" for name in TOOLS.values() for column in ("CPU_Seconds", "Peak_RSS_MB")]
+                   + ["Tools_Read_Blocks", "Tools_Write_Blocks"])
     if log_data == "header":
-        log_row = ["Time_Started", "AIP_ID", "Files_Deleted", "Objects_Folder_Made", "Metadata_Folder_Made",
-                   "FITS_Tool_Errors", "FITS_Combination_Errors", "PreservationXML_Made", "PreservationXML_Valid",
-                   "Bag_Made", "Bag_Valid", "Package_Errors", "Manifest_Errors", "Processing_Complete"]
+        log_row = header + time_header
     else:
         log_row = [log_data["Started"], log_data["AIP"], log_data["Deletions"],
                    log_data["ObjectsError"], log_data["MetadataError"], log_data["FITSTool"], log_data["FITSError"],
                    log_data["PresXML"], log_data["PresValid"], log_data['Bag'], log_data["BagValid"],
                    log_data["Package"], log_data["Manifest"], log_data["Complete"]]
 
+        # Adds the time columns, including the time so far for the step that is running.
+        step_times = dict(log_data.get("StepTimes", {}))
+        if log_data.get("StepStart"):
+            step, start = log_data["StepStart"]
+            step_times[step] = time.perf_counter() - start
+        log_row += [f"{step_times[step]:.2f}" if step in step_times else "" for step in STEPS]
+        log_row += [log_data.get("Files") if log_data.get("Files") is not None else "",
+                    log_data.get("Bytes") if log_data.get("Bytes") is not None else ""]
+        for step, unit in THROUGHPUT.items():
+            amount = log_data.get(unit)
+            if amount is not None and step_times.get(step):
+                amount = amount if unit == "Files" else amount / 1000000
+                log_row.append(f"{amount / step_times[step]:.2f}")
+            else:
+                log_row.append("")
+
+        # Adds the resource usage columns.
+        tool_usage = log_data.get("ToolUsage", {})
+        for tool in TOOLS:
+            if tool in tool_usage:
+                log_row += [f"{tool_usage[tool]['CPU']:.2f}", f"{tool_usage[tool]['RSS']:.1f}"]
+            else:
+                log_row += ["", ""]
+        for column in ("Read", "Write"):
+            log_row.append(sum(usage[column] for usage in tool_usage.values()) if tool_usage else "")
+
+        # Updates the header of a log from a version of the script without the time or resource usage columns.
+        # Only the header is read, and the whole log is only read and saved again the one time it is updated.
+        log_path = os.path.join(aips_dir, "aip_log.csv")
+        if os.path.exists(log_path):
+            with open(log_path, "r", newline="") as log_file:
+                log_header = next(csv.reader(log_file), None)
+            full_header = header + time_header
+            if log_header and len(log_header) < len(full_header) and log_header == full_header[:len(log_header)]:
+                with open(log_path, "r", newline="") as log_file:
+                    log_rows = list(csv.reader(log_file))
+                log_rows[0] = full_header
+                with open(log_path, "w", newline="") as log_file:
+                    csv.writer(log_file).writerows(log_rows)
+
     # Saves the data for the row to the log CSV.
     with open(os.path.join(aips_dir, "aip_log.csv"), "a", newline="") as log_file:
         log_writer = csv.writer(log_file)
         log_writer.writerow(log_row)
 
 
+def make_aip(aip, staging):
+    """Make an AIP from an AIP folder, running each step of the workflow until a step has an error
+
+    Used by general_aip.py and watch_aips.py. If a step has an error, the AIP was moved to an error folder
+    or could not be packaged, and the rest of the steps are skipped.
+
+    Parameters:
+         aip : instance of the AIP class
+         staging : path to the aip_staging folder from configuration.py
+
+    Returns:
+        result : StepResult of the last step that ran
+    """
+
+    # Saves events about the AIP, each step, and each tool to aip_events.jsonl in the staging folder (see event()).
+    aip.events = os.path.join(staging, "aip_events.jsonl")
+    event(aip, "aip_start", folder=aip.folder_name, type=aip.type, workflow=aip.workflow)
+    aip_start = time.perf_counter()
+
+    # Make the top level folder the AIP ID, if it isn't already.
+    # For the web AIP type, this renames the top level folder (initially named with seed id).
+    # For the other types, it makes a new folder named with the AIP ID and moves the entire folder into it.
+    aip_path = os.path.join(aip.directory, aip.id)
+    if aip.type == "web":
+        os.rename(os.path.join(aip.directory, aip.folder_name), aip_path)
+    elif aip.folder_name != aip.id:
+        os.mkdir(aip_path)
+        shutil.move(os.path.join(aip.directory, aip.folder_name), aip_path)
+
+    # The steps, in order:
+    # Deletes any temporary files and makes a log of each deleted file.
+    # Organizes the AIP folder contents into the UGA Libraries' AIP directory structure (objects and metadata).
+    # Extracts technical metadata from the files using FITS.
+    # Converts the technical metadata into Dublin Core and PREMIS using xslt stylesheets.
+    # Bags the AIP using bagit.
+    # Tars the AIP and may also zip (bz2) depending on the script argument zip_method.
+    # Adds the packaged AIP to the MD5 manifest in the aips-to-ingest folder.
+    # Each step has the name used for its time in the log (STEPS).
+    steps = (lambda: delete_temp(aip, aip_path, logging=True),
+             lambda: structure_directory(aip, staging),
+             lambda: extract_metadata(aip),
+             lambda: combine_metadata(aip, staging),
+             lambda: transform_fits(aip, staging),
+             lambda: validate_preservation_xml(aip, staging),
+             lambda: organize_xml(aip, staging),
+             lambda: make_bag(aip),
+             lambda: validate_bag(aip, staging),
+             lambda: package(aip, staging),
+             lambda: manifest(aip, staging))
+
+    # Runs the next step until every step is done or a step has an error, saving the time of each step to the log.
+    # The number of files and size of the AIP content are saved from the inventory after the temporary files are deleted.
+    step = 0
+    result = SUCCESS
+    while result.success and step < len(steps):
+        event(aip, "step_start", step=STEPS[step])
+        aip.log["StepStart"] = (STEPS[step], time.perf_counter())
+        result = steps[step]()
+        aip.log["StepTimes"][STEPS[step]] = time.perf_counter() - aip.log["StepStart"][1]
+        aip.log["StepStart"] = None
+
+        # Steps rewrite files in the metadata folder in place (for example, the FITS output in extract_metadata()),
+        # so the metadata folder is listed again the next time the AIP is scanned, before or after it is bagged.
+        forget_listing(aip, os.path.join(aip_path, "metadata"))
+        forget_listing(aip, os.path.join(aip.directory, f"{aip.id}_bag", "data", "metadata"))
+        if STEPS[step] == "Delete_Temp":
+            aip.log["Files"] = len(aip.inventory)
+            aip.log["Bytes"] = sum(file_info.size for file_info in aip.inventory.values())
+        event(aip, "step_end", step=STEPS[step], seconds=round(aip.log["StepTimes"][STEPS[step]], 3),
+              success=result.success, error=result.error)
+        step += 1
+
+    # If the AIP was moved to an error folder (errors from the manifest step are not), adds an event with the folder.
+    if not result.success:
+        error_path = os.path.join(staging, "aips-with-errors", result.error)
+        for name in (aip.id, f"{aip.id}_bag"):
+            if os.path.exists(os.path.join(error_path, name)):
+                event(aip, "error_move", error=result.error, path=os.path.join(error_path, name))
+
+    event(aip, "aip_end", complete=aip.log["Complete"], files=aip.log["Files"], bytes=aip.log["Bytes"],
+          bag_bytes=aip.size, seconds=round(time.perf_counter() - aip_start, 3))
+    return result
+
+
 def make_bag(aip):
     """Bag the AIP, with md5 and sha256 manifests, and rename the AIP folder to add "_bag" to the end
 
     Parameters:
          aip : instance of the AIP class, used for id
 
-    Returns: none
+    Returns:
+        result : StepResult, which is always a success (the bag is checked by validate_bag())
     """
 
     # Deletes temporary files. These can be re-generated during the AIP creation process.
     aip_path = os.path.join(aip.directory, aip.id)
     delete_temp(aip, aip_path, logging=False)
 
-    # Bags the AIP. To save time, BMAC AV only generates md5 checksums.
-    if aip.type == "av" and aip.department == "bmac":
-        bagit.make_bag(aip_path, checksums=["md5"])
-    else:
-        bagit.make_bag(aip_path, checksums=["md5", "sha256"])
+    # Bags the AIP, using any checksums that are already known instead of calculating them again:
+    # the checksums of the objects calculated while FITS ran (waiting for them to finish, if needed)
+    # and the MD5 from the bag of any files that were already bagged.
+    # The files are matched with the inventory, which is up to date from deleting the temporary files,
+    # so a file that changed or was added since the checksums were calculated is not matched.
+    checksums = bag_checksums(aip)
+    object_checksums = aip.object_hashing.result() if aip.object_hashing else {}
+    known_checksums = {}
+    for path, file_info in aip.inventory.items():
+        file_checksums = dict(object_checksums.get(file_info, {}))
+        if file_info in aip.bag_md5s:
+            file_checksums.setdefault("md5", aip.bag_md5s[file_info])
+        if file_checksums:
+            known_checksums[path] = file_checksums
+    make_bag_known_checksums(aip_path, checksums, known_checksums)
 
     # Renames the AIP folder to add _bag (common naming convention for the standard).
     os.replace(aip_path, os.path.join(aip.directory, f"{aip.id}_bag"))
 
     # Logs success of bagging (since script hasn't broken - validating of bag is checked in the next step.
     aip.log["Bag"] = "Success"
+    return SUCCESS
+
+
+def make_bag_known_checksums(aip_path, checksums, known_checksums):
+    """Bag the AIP folder the same as bagit.make_bag(), but use the checksums that are already known for a file
+
+    A file is only read if one of the checksums is not known (for example, sha256 for a file from a bag with only MD5).
+    Files are read in inode order instead of path order (see list_by_inode()), which is faster on hard drives.
+    The tag manifests are made by bagit (Bag.save()), so the bag is the same as one made by bagit.make_bag().
+
+    Parameters:
+        aip_path : path to the AIP folder
+        checksums : list of checksum algorithms for the bag manifests
+        known_checksums : dictionary with the path relative to the AIP folder of each file with a known checksum
+                          and a dictionary of the algorithm and checksum for each known checksum
+
+    Returns: none
+    """
+
+    import bagit
+
+    # Moves the contents of the AIP folder into the data folder, using a temporary name in case there is a data folder.
+    temp_data = tempfile.mkdtemp(dir=aip_path)
+    for item in os.listdir(aip_path):
+        if os.path.join(aip_path, item) != temp_data:
+            os.rename(os.path.join(aip_path, item), os.path.join(temp_data, item))
+    data = os.path.join(aip_path, "data")
+    os.rename(temp_data, data)
+    os.chmod(data, os.stat(aip_path).st_mode)
+
+    # Gets each checksum for each file in the data folder, calculating the checksums that are not known
+    # (reading the file once for all of them), with the files in inode order.
+    folders, entries = list_by_inode(data)
+    sizes = {entry.path: entry.stat(follow_symlinks=False).st_size for entry in entries}
+    drop_behind = exceeds_page_cache(sum(sizes.values()))
+    file_digests = {}
+    for entry in entries:
+        relative_path = os.path.relpath(entry.path, data)
+        digests = {algorithm: digest for algorithm, digest in known_checksums.get(relative_path, {}).items()
+                   if algorithm in checksums}
+        needed = [algorithm for algorithm in checksums if algorithm not in digests]
+        if needed:
+            needed_digests, sizes[entry.path] = hash_file(entry.path, needed, drop_behind)
+            digests.update(needed_digests)
+        file_digests[relative_path] = digests
+
+    # Makes the manifests, with the files in the same order as bagit.
+    # Paths are encoded with bagit's own function (carriage returns and line feeds), so bagit reads them the same.
+    manifests = {algorithm: [] for algorithm in checksums}
+    for root, directories, files in os.walk(data):
+        directories.sort()
+        for file in sorted(files):
+            relative_path = os.path.relpath(os.path.join(root, file), data)
+            bag_path = bagit._encode_filename("data/" + relative_path.replace(os.sep, "/"))
+            for algorithm in checksums:
+                manifests[algorithm].append(f"{file_digests[relative_path][algorithm]}  {bag_path}\n")
+    total_bytes = sum(sizes.values())
+    total_files = len(entries)
+
+    # Saves the manifests and the bag metadata files, and has bagit make the tag manifests.
+    # bagit.txt is the same as the one bagit.make_bag() saves, which bagit does not have a variable for.
+    for algorithm, lines in manifests.items():
+        with open(os.path.join(aip_path, f"manifest-{algorithm}.txt"), "w", encoding="utf-8") as manifest_file:
+            manifest_file.writelines(lines)
+    with open(os.path.join(aip_path, "bagit.txt"), "w", encoding="utf-8") as bagit_file:
+        bagit_file.write("BagIt-Version: 0.97\nTag-File-Character-Encoding: UTF-8\n")
+    bag = bagit.Bag(aip_path)
+    bag.info["Bagging-Date"] = datetime.today().strftime("%Y-%m-%d")
+    bag.info["Bag-Software-Agent"] = f"bagit.py v{bagit.VERSION} <{bagit.PROJECT_URL}>"
+    bag.info["Payload-Oxum"] = f"{total_bytes}.{total_files}"
+    bag.save()
 
 
 def make_cleaned_fits_xml(aip, staging):
@@ -447,21 +1406,23 @@ def make_cleaned_fits_xml(aip, staging):
 
     The cleaned FITS makes the format information is easier to aggregate.
     It is deleted after the preservation.xml is made.
+    The workflow uses transform_fits() instead, which does not save it. This runs fits-cleanup.xsl by itself.
 
     Parameters:
         aip : instance of the AIP class, used for directory, id and log
         staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
     # Uses saxon and a stylesheet to make the cleaned-fits.xml from the combined-fits.xml.
     input_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_combined-fits.xml")
     stylesheet = os.path.join(c.STYLESHEETS, "fits-cleanup.xsl")
     output_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_cleaned-fits.xml")
-    saxon_output = subprocess.run(f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
-                                  f'-xsl:"{stylesheet}" -o:"{output_file}"',
-                                  stderr=subprocess.PIPE, shell=True)
+    saxon_output = run_tool(aip, "saxon", f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
+                            f'-xsl:"{stylesheet}" -o:"{output_file}"',
+                            stderr=subprocess.PIPE, shell=True)
 
     # If saxon has an error, logs the event and moves the AIP to an error folder.
     if saxon_output.stderr:
@@ -469,7 +1430,156 @@ def make_cleaned_fits_xml(aip, staging):
         aip.log["PresXML"] = f"Issue when creating cleaned-fits.xml. Saxon error: {error_msg}"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("cleaned_fits_saxon_error", os.path.join(aip.directory, aip.id), staging)
+        return move_error("cleaned_fits_saxon_error", os.path.join(aip.directory, aip.id), staging)
+    return SUCCESS
+
+
+def make_dpx_fits(aip, derived):
+    """Save FITS output to the metadata folder for the DPX frames that FITS did not run on, made from the sample frames
+
+    The format identification and creating application are copied from the FITS output for the sample frame,
+    which is the same format since it is in the same sequence. The size and MD5 are for each frame. The MD5 is from
+    the bag the frames came in (AIP.bag_md5s), matched by FileInfo, and is only calculated for frames not in it.
+    Information that is only true of the sample frame (valid, well-formed, and technical metadata) is not included.
+    It is named the same as FITS output, adding a number if there is already FITS output with that name.
+
+    Parameters:
+        aip : instance of the AIP class, used for bag_md5s, directory, and id
+        derived : a list of tuples with the path to a frame and the path to its sample frame, from dpx_sample()
+
+    Returns: none
+    """
+
+    fits_ns = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+    et.register_namespace("", fits_ns)
+    metadata = os.path.join(aip.directory, aip.id, "metadata")
+    fits_names = set(os.listdir(metadata))
+
+    # Finds the FITS output for each sample frame, using the file path in the output.
+    sample_frames = {sample_frame for file_path, sample_frame in derived}
+    sample_fits = {}
+    for item in fits_names:
+        if item.endswith("_fits.xml"):
+            try:
+                root = et.parse(os.path.join(metadata, item)).getroot()
+            except et.ParseError:
+                continue
+            filepath = root.find(f"{{{fits_ns}}}fileinfo/{{{fits_ns}}}filepath")
+            if filepath is not None and filepath.text in sample_frames:
+                sample_fits[filepath.text] = root
+
+    # Makes the FITS output for each frame. If FITS did not make output for the sample frame,
+    # the frame only has file information, so the preservation.xml is not valid and the AIP gets an error.
+    hash_tool = {"toolname": "hashlib", "toolversion": platform.python_version()}
+    for file_path, sample_frame in derived:
+        root = et.Element(f"{{{fits_ns}}}fits")
+        if sample_frame in sample_fits:
+            root = copy.deepcopy(sample_fits[sample_frame])
+            for element_name in ("filestatus", "metadata", "statistics"):
+                for element in root.findall(f"{{{fits_ns}}}{element_name}"):
+                    root.remove(element)
+        fileinfo = root.find(f"{{{fits_ns}}}fileinfo")
+        if fileinfo is None:
+            fileinfo = et.SubElement(root, f"{{{fits_ns}}}fileinfo")
+        frame_stat = os.stat(file_path, follow_symlinks=False)
+        md5 = aip.bag_md5s.get(FileInfo(frame_stat.st_size, frame_stat.st_mtime, frame_stat.st_ino))
+        if not md5:
+            md5 = hash_file(file_path, ["md5"])[0]["md5"]
+        file_information = (("filepath", file_path, {}), ("filename", os.path.basename(file_path), {}),
+                            ("size", str(frame_stat.st_size), hash_tool), ("md5checksum", md5, hash_tool),
+                            ("fslastmodified", str(int(frame_stat.st_mtime * 1000)), {}))
+        for element_name, value, attributes in file_information:
+            element = fileinfo.find(f"{{{fits_ns}}}{element_name}")
+            if element is None:
+                element = et.SubElement(fileinfo, f"{{{fits_ns}}}{element_name}")
+            element.attrib = dict(attributes)
+            element.text = value
+
+        # If more than one file has the same name, adds a number the same as FITS does (file.ext-1_fits.xml).
+        name = os.path.basename(file_path)
+        number = 0
+        while f"{name}_fits.xml" in fits_names:
+            number += 1
+            name = f"{os.path.basename(file_path)}-{number}"
+        fits_names.add(f"{name}_fits.xml")
+        et.ElementTree(root).write(os.path.join(metadata, f"{name}_fits.xml"), xml_declaration=True, encoding="UTF-8")
+
+
+def make_fits_config(fits_xml, profile_path, config_path):
+    """Make a FITS configuration file by applying a profile to fits.xml
+
+    Each tool in the profile matches a tool in fits.xml by the end of its class name.
+    If run is "no", the tool is removed. Otherwise, the profile's exclude-exts are added to the tool's exclude-exts.
+    The configuration is saved to a temporary file that then replaces config_path, so FITS started by another script
+    at the same time never reads a partly saved configuration.
+
+    Parameters:
+        fits_xml : path to fits.xml in the FITS installation
+        profile_path : path to the profile in the fits_profiles folder
+        config_path : path for saving the FITS configuration
+
+    Returns: none
+    """
+
+    config = et.parse(fits_xml)
+    profile_tools = {tool.get("name"): tool for tool in et.parse(profile_path).getroot().findall("tool")}
+    tools = config.getroot().find("tools")
+    for tool in tools.findall("tool"):
+        profile_tool = profile_tools.get(tool.get("class", "").split(".")[-1])
+        if profile_tool is None:
+            continue
+        if profile_tool.get("run") == "no":
+            tools.remove(tool)
+        elif profile_tool.get("exclude-exts"):
+            extensions = [ext for ext in tool.get("exclude-exts", "").split(",") if ext]
+            for ext in profile_tool.get("exclude-exts").split(","):
+                if ext not in extensions:
+                    extensions.append(ext)
+            tool.set("exclude-exts", ",".join(extensions))
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(config_path), suffix=".tmp", delete=False) as temp_file:
+        config.write(temp_file, encoding="UTF-8", xml_declaration=True)
+    os.replace(temp_file.name, config_path)
+
+
+def make_fits_input(aip, file_paths):
+    """Link files from the objects folder into a fits-input folder in the AIP folder, so FITS only runs on those files
+
+    The files keep the same folder structure as in the objects folder.
+    Files are copied instead if links are not supported.
+    If the fits-input folder already exists, any files in it that are not in file_paths are deleted.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        file_paths : list of paths to files in the objects folder
+
+    Returns:
+        fits_input : path to the fits-input folder, or None if there are no files
+    """
+
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    fits_input = os.path.join(aip.directory, aip.id, "fits-input")
+    if not file_paths:
+        if os.path.exists(fits_input):
+            shutil.rmtree(fits_input)
+        return None
+
+    # Deletes files from an existing fits-input folder that FITS no longer needs to run on.
+    link_paths = {os.path.join(fits_input, os.path.relpath(file_path, objects)) for file_path in file_paths}
+    for root, directories, files in os.walk(fits_input):
+        for file in files:
+            if os.path.join(root, file) not in link_paths:
+                os.remove(os.path.join(root, file))
+
+    for file_path in file_paths:
+        link_path = os.path.join(fits_input, os.path.relpath(file_path, objects))
+        if os.path.exists(link_path):
+            continue
+        os.makedirs(os.path.dirname(link_path), exist_ok=True)
+        try:
+            os.link(file_path, link_path)
+        except OSError:
+            shutil.copy2(file_path, link_path)
+    return fits_input
 
 
 def make_output_directories(staging, aip_type):
@@ -500,11 +1610,14 @@ def make_output_directories(staging, aip_type):
 def make_preservation_xml(aip, staging):
     """Make the preservation.xml from the cleaned FITS XML in the metadata folder
 
+    The workflow uses transform_fits() instead. This runs fits-to-preservation.xsl by itself.
+
     Parameters:
         aip : instance of the AIP class, used for collection_id, department, directory, id, log, title, and version
         staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
     # Uses saxon and a stylesheet to make the preservation.xml file from the cleaned-fits.xml.
@@ -513,9 +1626,9 @@ def make_preservation_xml(aip, staging):
     output_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_preservation.xml")
     args = f'collection-id="{aip.collection_id}" aip-id="{aip.id}" aip-title="{aip.title}" ' \
            f'department="{aip.department}" rights="{aip.rights}" version={aip.version} ns={c.NAMESPACE}'
-    saxon_output = subprocess.run(f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
-                                  f'-xsl:"{stylesheet}" -o:"{output_file}" {args}',
-                                  stderr=subprocess.PIPE, shell=True)
+    saxon_output = run_tool(aip, "saxon", f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
+                            f'-xsl:"{stylesheet}" -o:"{output_file}" {args}',
+                            stderr=subprocess.PIPE, shell=True)
 
     # If saxon has an error, logs the event and moves the AIP to an error folder.
     if saxon_output.stderr:
@@ -523,7 +1636,60 @@ def make_preservation_xml(aip, staging):
         aip.log["PresXML"] = f"Issue when creating preservation.xml. Saxon error: {error_msg}"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("pres_xml_saxon_error", os.path.join(aip.directory, aip.id), staging)
+        return move_error("pres_xml_saxon_error", os.path.join(aip.directory, aip.id), staging)
+    return SUCCESS
+
+
+def make_signature_fits(aip, identified, tool):
+    """Save minimal FITS output to the metadata folder for the files that were identified without FITS
+
+    The output has the same structure as FITS output, with the format identification, size, MD5,
+    and creating application if known, so it is combined and used for the preservation.xml
+    the same as the rest of the FITS output.
+    It is named the same as FITS output, adding a number if there is already FITS output with that name.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        identified : a list of tuples with the path to the file, its Signature, size, MD5,
+                     and creating application (name, version) or None, from pre_identify() or stream_warcs()
+        tool : tuple with the name and version of what identified the files, for the FITS tool attributes
+
+    Returns: none
+    """
+
+    fits_ns = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+    et.register_namespace("", fits_ns)
+    metadata = os.path.join(aip.directory, aip.id, "metadata")
+    fits_names = set(os.listdir(metadata))
+    tool = {"toolname": tool[0], "toolversion": tool[1]}
+
+    for file_path, signature, size, md5, application in identified:
+        root = et.Element(f"{{{fits_ns}}}fits")
+        identification = et.SubElement(root, f"{{{fits_ns}}}identification")
+        identity = et.SubElement(identification, f"{{{fits_ns}}}identity",
+                                 {"format": signature.format, "mimetype": signature.mimetype, **tool})
+        et.SubElement(identity, f"{{{fits_ns}}}tool", tool)
+        if signature.version:
+            et.SubElement(identity, f"{{{fits_ns}}}version", tool).text = signature.version
+        et.SubElement(identity, f"{{{fits_ns}}}externalIdentifier", {**tool, "type": "puid"}).text = signature.puid
+        fileinfo = et.SubElement(root, f"{{{fits_ns}}}fileinfo")
+        file_information = (("filepath", file_path), ("filename", os.path.basename(file_path)), ("size", str(size)),
+                            ("md5checksum", md5), ("fslastmodified", str(int(os.path.getmtime(file_path) * 1000))))
+        if application:
+            file_information += (("creatingApplicationName", application[0]),
+                                 ("creatingApplicationVersion", application[1]))
+        for element_name, value in file_information:
+            if value:
+                et.SubElement(fileinfo, f"{{{fits_ns}}}{element_name}", tool).text = value
+
+        # If more than one file has the same name, adds a number the same as FITS does (file.ext-1_fits.xml).
+        name = os.path.basename(file_path)
+        number = 0
+        while f"{name}_fits.xml" in fits_names:
+            number += 1
+            name = f"{os.path.basename(file_path)}-{number}"
+        fits_names.add(f"{name}_fits.xml")
+        et.ElementTree(root).write(os.path.join(metadata, f"{name}_fits.xml"), xml_declaration=True, encoding="UTF-8")
 
 
 def manifest(aip, staging):
@@ -536,7 +1702,8 @@ def manifest(aip, staging):
          aip : instance of the AIP class, used for department, id, log, size, and to_zip
          staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the reason if the AIP could not be added to the manifest
     """
 
     # Makes the path to the packaged AIP, which is different depending on if it is zipped or not.
@@ -550,11 +1717,11 @@ def manifest(aip, staging):
         aip.log["Manifest"] = f"Tar/zip file '{aip_path}' not in aips-ready-for-ingest folder"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        return
+        return StepResult(False, "package_not_found")
 
     # Calculates the MD5 of the packaged AIP.
-    md5deep_result = subprocess.run(f'"{c.MD5DEEP}" -br "{aip_path}"',
-                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+    md5deep_result = run_tool(aip, "md5deep", f'"{c.MD5DEEP}" -br "{aip_path}"',
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
 
     # If md5deep has an error, logs the event and does not execute the rest of this function.
     if md5deep_result.stderr:
@@ -562,7 +1729,7 @@ def manifest(aip, staging):
         aip.log["Manifest"] = f"Issue when generating MD5. md5deep error: {error_msg}"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        return
+        return StepResult(False, "md5deep_error")
 
     # Adds the md5 and AIP filename to the appropriate manifest in staging.
     # Initial output of md5deep is b'md5_value  filename.ext\r\n'
@@ -579,6 +1746,80 @@ def manifest(aip, staging):
     aip.log["Manifest"] = "Success"
     aip.log["Complete"] = "Success"
     log(aip.log, aip.directory)
+    return SUCCESS
+
+
+def move_dpx(aip_path, staging, journal):
+    """Move the contents of the data folder of a DPX bag into the objects folder and delete the bag metadata
+
+    Everything is renamed instead of copied, since the data and objects folders are on the same volume,
+    so a multi-TB film scan is not duplicated. The MOV files are also copied to the movs-to-bag folder,
+    with shutil.copy2 which has the operating system copy the data when it can (for example, sendfile in Linux).
+
+    The list of moves is saved to the journal before anything is moved and deleted when everything is done.
+    If the journal is already there, the script stopped during an earlier run, and the moves from it that were not done
+    (the source is still in the data folder) are finished. If a move has an error, every move in the journal is undone.
+
+    Parameters:
+        aip_path : path to the AIP folder
+        staging : path to the aip_staging folder from configuration.py
+        journal : path to the CSV with the list of moves, which is in the AIPs directory
+
+    Returns:
+        error : None if everything was moved, or the error message if the moves were undone
+    """
+
+    # Reads the list of moves from the journal if resuming, or makes it and saves it to the journal.
+    # Each move is a list of the action (copy or move), the source path, and the destination path.
+    # The journal is saved to a temporary file first, so it is never incomplete.
+    data = os.path.join(aip_path, "data")
+    objects = os.path.join(aip_path, "objects")
+    if os.path.exists(journal):
+        with open(journal, newline="") as journal_file:
+            moves = list(csv.reader(journal_file))
+    else:
+        moves = []
+        for item in os.listdir(data):
+            source = os.path.join(data, item)
+            if os.path.isdir(source):
+                moves.append(["move", source, os.path.join(objects, f"{item}-dpx")])
+            elif item.endswith(".cue"):
+                moves.append(["move", source, os.path.join(objects, item)])
+            elif item.endswith(".mov"):
+                moves.append(["copy", source, os.path.join(staging, "movs-to-bag", item)])
+                moves.append(["move", source, os.path.join(objects, item)])
+            elif item.endswith(".wav"):
+                moves.append(["move", source, os.path.join(objects, f"{pathlib.Path(item).stem}-dpx.wav")])
+        with open(f"{journal}.tmp", "w", newline="") as journal_file:
+            csv.writer(journal_file).writerows(moves)
+        os.replace(f"{journal}.tmp", journal)
+
+    # Does every move that is not done yet.
+    # If there is an error, puts everything that was moved back in the data folder and deletes the copies.
+    try:
+        for action, source, destination in moves:
+            if os.path.exists(source):
+                if action == "copy":
+                    shutil.copy2(source, destination)
+                else:
+                    os.replace(source, destination)
+    except OSError as error:
+        for action, source, destination in reversed(moves):
+            if action == "copy" and os.path.exists(destination):
+                os.remove(destination)
+            elif action == "move" and os.path.exists(destination) and not os.path.exists(source):
+                os.replace(destination, source)
+        os.remove(journal)
+        return str(error)
+
+    # Deletes the bag metadata files and data folder, now that the rest is organized into the AIP directory.
+    for bag_metadata_file in ("bag-info.txt", "bagit.txt", "manifest-md5.txt", "tagmanifest-md5.txt"):
+        if os.path.exists(os.path.join(aip_path, bag_metadata_file)):
+            os.remove(os.path.join(aip_path, bag_metadata_file))
+    if os.path.exists(data):
+        shutil.rmtree(data)
+    os.remove(journal)
+    return None
 
 
 def move_error(error_name, aip_path, staging):
@@ -591,7 +1832,8 @@ def move_error(error_name, aip_path, staging):
         aip_path : the path of the AIP folder with the error
         staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult for the error, which the step that had the error returns
     """
 
     # Makes the error folder, if it does not already exist.
@@ -604,6 +1846,7 @@ def move_error(error_name, aip_path, staging):
 
     # Prints the error, so if all AIPs are failing for the same reason, the script can be stopped to address it.
     print("Moved to error folder", error_name)
+    return StepResult(False, error_name)
 
 
 def organize_xml(aip, staging):
@@ -611,12 +1854,13 @@ def organize_xml(aip, staging):
 
     - A copy of the preservation.xml is made in the preservation-xml folder
     - The combined-fits.xml is moved to the fits-xml folder
-    - The cleaned-fits.xml is deleted
+    - The cleaned-fits.xml is deleted, if it was made
 
     Parameters:
          aip : instance of the AIP class, used for id
          staging : path to the aip_staging folder from configuration.py, where copies are saved
-    Returns: none
+    Returns:
+        result : StepResult, which is always a success
     """
 
     # Copies the preservation.xml file to the preservation-xml folder for staff reference.
@@ -629,20 +1873,26 @@ def organize_xml(aip, staging):
                os.path.join(staging, "fits-xmls", f"{aip.id}_combined-fits.xml"))
 
     # Deletes the cleaned-fits.xml file because it is a temporary file.
-    os.remove(os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_cleaned-fits.xml"))
+    # It is only made by transform_fits() if SAVE_CLEANED_FITS is True in configuration.py.
+    cleaned_fits = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_cleaned-fits.xml")
+    if os.path.exists(cleaned_fits):
+        os.remove(cleaned_fits)
+    return SUCCESS
 
 
 def package(aip, staging):
     """Tar and zip (optional) the AIP, rename it to include the size, and save it to the aips-ready-to-ingest folder
 
     AIPs may not be zipped if zipping is time-consuming and does not save much space. They must be tarred.
+    On Mac and Linux, the files are tarred in inode order (see list_by_inode()), which is faster on hard drives.
     The unzipped size is included so the preservation system can determine if there is room to unzip it during ingest.
 
     Parameters:
          aip : instance of the AIP class, used for directory, id, log, size, and to_zip
          staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP could not be packaged
     """
 
     # Gets the operating system, since the tar and zip commands are different for Windows and Mac/Linux.
@@ -664,15 +1914,15 @@ def package(aip, staging):
         aip.log["Package"] = f"Could not tar. Bag not in expected location: {bag_path}"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        return
+        return StepResult(False, "bag_not_found")
     bag_size = 0
     for line in bag_info:
         if line.startswith("Payload-Oxum"):
             payload = line.split()[1]
             bag_size += float(payload)
-    for file in os.listdir(bag_path):
-        if file.endswith(".txt"):
-            bag_size += os.path.getsize(os.path.join(bag_path, file))
+    for relative_path, file_info in aip.inventory.items():
+        if os.path.dirname(relative_path) == "" and relative_path.endswith(".txt"):
+            bag_size += file_info.size
     bag_info.close()
     bag_size = int(bag_size)
 
@@ -680,8 +1930,8 @@ def package(aip, staging):
     tar_path = os.path.join(staging, 'aips-ready-to-ingest', f"{aip_bag}.tar")
     if operating_system == "Windows":
         # Does not print the progress to the terminal (stdout), which is a lot of text. [subprocess.DEVNULL]
-        tar_output = subprocess.run(f'"C:/Program Files/7-Zip/7z.exe" -ttar a "{tar_path}" "{bag_path}"',
-                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, shell=True)
+        tar_output = run_tool(aip, "7z", f'"C:/Program Files/7-Zip/7z.exe" -ttar a "{tar_path}" "{bag_path}"',
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, shell=True)
         # If there is an error, saves the error to the log and does not complete the rest of the function for this AIP.
         # Cannot move it to an error folder because getting a permissions error.
         if not tar_output.stderr == b"":
@@ -689,10 +1939,16 @@ def package(aip, staging):
             aip.log["Package"] = f"Could not tar. 7zip error: {error_msg}"
             aip.log["Complete"] = "Error during processing"
             log(aip.log, aip.directory)
-            move_error('tar-bag', bag_path, staging)
-            return
+            return move_error('tar-bag', bag_path, staging)
     else:
-        subprocess.run(f'tar -C "{bag_path}" -cf "{tar_path}" .', shell=True)
+        # Gives tar the list of folders and then files in inode order (list_by_inode()),
+        # so the files are read in the order they are on the disk instead of the order tar finds them.
+        # The names are the same as tarring the folder ".", and are separated by a null character (--null).
+        folders, entries = list_by_inode(bag_path)
+        paths = folders + [entry.path for entry in entries]
+        names = ["."] + [os.path.join(".", os.path.relpath(path, bag_path)) for path in paths]
+        run_tool(aip, "tar", f'tar -C "{bag_path}" -cf "{tar_path}" --no-recursion --null -T -', shell=True,
+                 input=b"\0".join(os.fsencode(name) for name in names))
 
     # Renames the file to include the size.
     tar_size_path = os.path.join(staging, "aips-ready-to-ingest", f"{aip_bag}.{bag_size}.tar")
@@ -706,10 +1962,11 @@ def package(aip, staging):
     if aip.to_zip is True:
         if operating_system == "Windows":
             # Does not print the progress to the terminal (stdout), which is a lot of text.
-            subprocess.run(f'"C:/Program Files/7-Zip/7z.exe" -tbzip2 a -aoa "{tar_size_path}.bz2" "{tar_size_path}"',
-                           stdout=subprocess.DEVNULL, shell=True)
+            run_tool(aip, "7z",
+                     f'"C:/Program Files/7-Zip/7z.exe" -tbzip2 a -aoa "{tar_size_path}.bz2" "{tar_size_path}"',
+                     stdout=subprocess.DEVNULL, shell=True)
         else:
-            subprocess.run(f'bzip2 "{tar_size_path}"', shell=True)
+            run_tool(aip, "bzip2", f'bzip2 "{tar_size_path}"', shell=True)
 
         # Deletes the tar version. Just want the tarred and zipped version.
         # For Mac/Linux, the bzip2 command overwrites the tar file so this step is unnecessary.
@@ -718,6 +1975,645 @@ def package(aip, staging):
 
     # Updates the log with success.
     aip.log["Package"] = "Success"
+    return SUCCESS
+
+
+def pre_identify(aip, fits_input, full_fits_formats):
+    """Identify files with a common format from their signature, so FITS only runs on the rest of the files
+
+    Formats are identified with format_signatures.py, which only identifies a file if its signature
+    and file extension are unambiguous. Files that are not identified or are a format in full_fits_formats
+    (for example, formats that FITS checks are valid) are left for FITS.
+    The size and MD5 of identified files are calculated for their FITS output, which is saved by make_signature_fits().
+    Prints the number of files that were identified and sent to FITS.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        fits_input : path to the folder FITS would run on (objects or fits-input)
+        full_fits_formats : list of format names which always get full FITS
+
+    Returns:
+        fits_input : path to the folder to run FITS on (objects or fits-input), or None if every file was identified
+        identified : a list of tuples with the path to the file in the objects folder, its Signature, size, MD5,
+                     and None for the creating application (not known from the signature)
+    """
+
+    # Identifies every file, using the path to the file in the objects folder if fits_input is fits-input.
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    identified = []
+    remaining = []
+    for root, directories, files in os.walk(fits_input):
+        for file in files:
+            input_path = os.path.join(root, file)
+            file_path = os.path.join(objects, os.path.relpath(input_path, fits_input))
+            signature = format_signatures.identify(input_path)
+            if signature and signature.format not in full_fits_formats:
+                md5 = hashlib.md5()
+                with open(input_path, "rb") as open_file:
+                    for chunk in iter(lambda: open_file.read(1024 * 1024), b""):
+                        md5.update(chunk)
+                identified.append((file_path, signature, os.path.getsize(input_path), md5.hexdigest(), None))
+            else:
+                remaining.append(file_path)
+
+    # Prints how many files took each path, so staff can see if it is helping.
+    file_count = len(identified) + len(remaining)
+    if file_count:
+        print(f"Pre-identification: {len(identified)} of {file_count} files ({len(identified) / file_count:.0%}) "
+              f"identified from their signature, {len(remaining)} sent to FITS")
+
+    # Removes the identified files from the FITS input, which is now the fits-input folder.
+    if identified:
+        fits_input = make_fits_input(aip, remaining)
+    return fits_input, identified
+
+
+def preflight(aips_dir, aip_type, workflow, md_rows, max_files, max_size, append=False):
+    """Check every AIP folder for problems that would cause an error partway through the workflow, before any AIP is made
+
+    The AIP folders are checked in parallel with preflight_aip(), since the time is mostly waiting to read the folders.
+    Every problem in the batch is found at once, so they can all be fixed before the long steps (FITS, bagging, packaging)
+    instead of finding them one AIP at a time in the error folders. The problems are saved to preflight_issues.csv
+    in the AIPs directory, with a row for each problem, replacing the problems from any earlier batch
+    unless append is True (watch_aips.py, which checks one AIP at a time).
+
+    Parameters:
+        aips_dir : the path to the folder which contains the folders to be made into AIPs
+        aip_type : the type of AIPs, from the script arguments
+        workflow : the AV workflow, from the script arguments, or None
+        md_rows : a list of MetadataRow from check_metadata_csv() or split_aips()
+        max_files : the most files in a general AIP, or None for no limit
+        max_size : the largest size of a general AIP in bytes, or None for no limit
+        append : if True, adds the problems to the end of preflight_issues.csv instead of replacing it
+
+    Returns:
+        issues : a dictionary of AIP ID and the list of problems with that AIP folder, only for AIPs with problems,
+                 in the same order as md_rows
+    """
+
+    with ThreadPoolExecutor() as executor:
+        futures = [(row.AIP_ID, executor.submit(preflight_aip, aips_dir, aip_type, workflow, row, max_files, max_size))
+                   for row in md_rows]
+        issues = {aip_id: future.result() for aip_id, future in futures if future.result()}
+
+    # Saves the problems, if any, since there may be too many to read in the terminal.
+    if issues:
+        issues_path = os.path.join(aips_dir, "preflight_issues.csv")
+        header = not append or not os.path.exists(issues_path)
+        with open(issues_path, "a" if append else "w", newline="", encoding="utf-8") as issues_csv:
+            issues_writer = csv.writer(issues_csv)
+            if header:
+                issues_writer.writerow(["AIP_ID", "Issue"])
+            for aip_id, aip_issues in issues.items():
+                for issue in aip_issues:
+                    issues_writer.writerow([aip_id, issue])
+    return issues
+
+
+def preflight_aip(aips_dir, aip_type, workflow, row, max_files, max_size):
+    """Check one AIP folder for problems that would cause an error partway through the workflow
+
+    The problems checked for are an AIP folder that already has an objects or metadata folder (or is not a bag,
+    for the dpx workflow), another folder already named with the AIP ID, names with characters that break
+    the workflow or ARCHive (NAME_CHARACTERS), paths too long for Windows once the files are in the AIP bag,
+    folders that cannot be read or changed, files that cannot be opened, AIPs that are empty,
+    and general AIPs that are over the limits. AV and web AIPs are not split (split_aips()), so they are made
+    even if they are over the limits. Files are opened but not read, so this is fast even for large AIPs.
+
+    Parameters:
+        aips_dir : the path to the folder which contains the folders to be made into AIPs
+        aip_type : the type of AIPs, from the script arguments
+        workflow : the AV workflow, from the script arguments, or None
+        row : MetadataRow for the AIP
+        max_files : the most files in a general AIP, or None for no limit
+        max_size : the largest size of a general AIP in bytes, or None for no limit
+
+    Returns:
+        issues : a list of problems with the AIP folder, which is empty if there are none
+    """
+
+    issues = []
+    folder_path = os.path.join(aips_dir, row.Folder)
+
+    # The AIP folder is renamed to the AIP ID (web) or moved into a new folder named with the AIP ID (others),
+    # which fails if there is already a folder named with the AIP ID.
+    if row.Folder != row.AIP_ID and os.path.exists(os.path.join(aips_dir, row.AIP_ID)):
+        issues.append("The AIPs directory already has a folder named with the AIP ID")
+
+    # The objects and metadata folders are made in the folder named with the AIP ID, which is the AIP folder
+    # if it is already named with the AIP ID or is a web AIP, and otherwise only contains the AIP folder.
+    # For the dpx workflow, the AIP folder must be a bag, and the content of the data folder is moved into objects.
+    try:
+        top_names = os.listdir(folder_path)
+    except OSError as error:
+        return issues + [f"The AIP folder cannot be read: {error.strerror}"]
+    if aip_type != "web" and row.Folder != row.AIP_ID:
+        top_names = [row.Folder]
+    for name in ("objects", "metadata"):
+        if name in top_names:
+            issues.append(f"The AIP folder already has a folder named {name}")
+    if workflow == "dpx" and not os.path.isdir(os.path.join(folder_path, "data")):
+        issues.append("The AIP folder is not a bag (no data folder), which is required for the dpx workflow")
+
+    # The longest path is when the files are in the objects folder of the AIP bag.
+    # If the AIP folder is moved into a folder named with the AIP ID, it is the first folder in objects.
+    objects_path = os.path.join(os.path.abspath(aips_dir), f"{row.AIP_ID}_bag", "data", "objects")
+    if aip_type != "web" and row.Folder != row.AIP_ID:
+        objects_path = os.path.join(objects_path, row.Folder)
+    check_length = platform.system() == "Windows"
+
+    # Checks every folder and file in the AIP folder.
+    file_count = 0
+    total_size = 0
+    folders = [""]
+    while folders:
+        relative_folder = folders.pop()
+        folder = os.path.join(folder_path, relative_folder)
+        if not os.access(folder, os.W_OK):
+            issues.append(f"Folder cannot be changed (read-only): {relative_folder or row.Folder}")
+        try:
+            entries = sorted(os.scandir(folder), key=lambda folder_entry: folder_entry.name)
+        except OSError as error:
+            issues.append(f"Folder cannot be read ({error.strerror}): {relative_folder or row.Folder}")
+            continue
+        for entry in entries:
+            relative_path = os.path.join(relative_folder, entry.name)
+            if NAME_CHARACTERS.search(entry.name):
+                issues.append(f"Name has characters not allowed in ARCHive: {ascii(relative_path)}")
+            if check_length and len(os.path.join(objects_path, relative_path)) > WINDOWS_MAX_PATH:
+                issues.append(f"Path will be over {WINDOWS_MAX_PATH} characters in the AIP bag: {relative_path}")
+            if entry.is_dir(follow_symlinks=False):
+                folders.append(relative_path)
+                continue
+            try:
+                total_size += entry.stat(follow_symlinks=False).st_size
+                with open(entry.path, "rb"):
+                    pass
+            except OSError as error:
+                issues.append(f"File cannot be opened ({error.strerror}): {relative_path}")
+            file_count += 1
+
+    # Checks the size of the AIP. Only general AIPs are split if they are over the limits (split_aips()),
+    # so a general AIP is only still over the limits if it could not be split.
+    if file_count == 0:
+        issues.append("The AIP folder has no files")
+    if aip_type == "general" and max_files is not None and file_count > max_files:
+        issues.append(f"The AIP has {file_count} files, which is over the limit of {max_files}")
+    if aip_type == "general" and max_size is not None and total_size > max_size:
+        issues.append(f"The AIP is {total_size} bytes, which is over the limit of {max_size}")
+    return issues
+
+
+def read_bag_manifest(aip, aip_path):
+    """Save the MD5s from the manifest of content that was already bagged, so make_bag() does not calculate them again
+
+    The AIP folder, or a folder in it, is already a bag if it has bagit.txt and manifest-md5.txt, for example
+    DPX from a vendor. The manifest is only used if the bag is complete: the Payload-Oxum (size and number of files)
+    matches the data folder and every file in the data folder is in the manifest. If BAG_MANIFEST_SAMPLE is in
+    configuration.py, that many files, spread evenly through the bag, are also hashed to check they match the manifest.
+    The MD5s are saved by the FileInfo of the file (size, date modified, and inode), which does not change when
+    the file is renamed or moved in the same volume, so the files are matched again after they are moved into
+    the objects folder and bagged, no matter what their path is then.
+
+    Parameters:
+        aip : instance of the AIP class, used for bag_md5s, folder_listings, and inventory
+        aip_path : path to the AIP folder
+
+    Returns: none
+    """
+
+    # BAG_MANIFEST_SAMPLE is optional. If it is not present, no files are hashed to check the manifest.
+    try:
+        sample_size = c.BAG_MANIFEST_SAMPLE
+    except AttributeError:
+        sample_size = 0
+
+    # Checks the AIP folder and each folder in it for a bag.
+    scan_aip(aip, aip_path)
+    for bag_folder in [""] + sorted(item for item in os.listdir(aip_path) if os.path.isdir(os.path.join(aip_path, item))):
+        bag_path = os.path.join(aip_path, bag_folder)
+        manifest_path = os.path.join(bag_path, "manifest-md5.txt")
+        if not os.path.exists(os.path.join(bag_path, "bagit.txt")) or not os.path.exists(manifest_path):
+            continue
+
+        # Reads the manifest, which has one line per file formatted "md5  data/path",
+        # and the Payload-Oxum (bytes.files) from bag-info.txt.
+        manifest = {}
+        with open(manifest_path, "r", encoding="utf-8-sig") as manifest_file:
+            for line in manifest_file:
+                if line.strip():
+                    md5, path = line.rstrip("\r\n").split(maxsplit=1)
+                    manifest[os.path.join(bag_folder, *path.split("/"))] = md5.lower()
+        oxum = None
+        if os.path.exists(os.path.join(bag_path, "bag-info.txt")):
+            with open(os.path.join(bag_path, "bag-info.txt"), "r", encoding="utf-8-sig") as bag_info:
+                for line in bag_info:
+                    if line.startswith("Payload-Oxum"):
+                        oxum = line.split(":", 1)[1].strip()
+
+        # Checks the bag is complete, using the sizes from the inventory.
+        data = os.path.join(bag_folder, "data", "")
+        payload = {path: file_info for path, file_info in aip.inventory.items() if path.startswith(data)}
+        if oxum != f"{sum(file_info.size for file_info in payload.values())}.{len(payload)}":
+            print(f"Bag manifest in '{bag_path}' not used: Payload-Oxum does not match the data folder")
+            continue
+        if set(payload) != set(manifest):
+            print(f"Bag manifest in '{bag_path}' not used: manifest does not match the data folder")
+            continue
+
+        # Checks the MD5 of a sample of the files.
+        paths = sorted(payload)
+        sample = [paths[i * len(paths) // sample_size] for i in range(min(sample_size, len(paths)))] if paths else []
+        mismatch = False
+        for path in sample:
+            md5 = hashlib.md5()
+            with open(os.path.join(aip_path, path), "rb") as open_file:
+                for chunk in iter(lambda: open_file.read(1024 * 1024), b""):
+                    md5.update(chunk)
+            if md5.hexdigest() != manifest[path]:
+                mismatch = True
+                break
+        if mismatch:
+            print(f"Bag manifest in '{bag_path}' not used: MD5 of '{path}' does not match the manifest")
+            continue
+
+        aip.bag_md5s.update({payload[path]: manifest[path] for path in paths})
+        print(f"Bag manifest: reusing the MD5 for {len(paths)} files from '{bag_path}'")
+
+
+def read_fits_cache(aip, cache_path):
+    """Find the files in the objects folder which already have FITS output in the cache
+
+    Files are matched by their MD5, so a file with the same content anywhere in any AIP uses the same FITS output.
+    The MD5 is from the bag of content that was already bagged (AIP.bag_md5s) or from the bag checksums calculated
+    while FITS runs (hash_objects()), waiting for them to finish, so the files are only read once for both.
+    A file is only read here if its MD5 is not from either, for example because it changed while it was read.
+    Nothing is read if the cache folder is empty, for example the first AIP with a new FITS version or configuration.
+    If some files are in the cache, the rest are linked into a fits-input folder in the AIP folder,
+    so FITS is run on a folder with only the files that are not in the cache.
+
+    Parameters:
+        aip : instance of the AIP class, used for bag_md5s, directory, id, and object_hashing
+        cache_path : path to the folder in the FITS cache for the current FITS version and configuration
+
+    Returns:
+        fits_input : path to the folder to run FITS on (objects or fits-input), or None if every file is in the cache
+        cached_files : a list of tuples with the path to the file and the path to its cached FITS output
+    """
+
+    # If the cache folder is empty, FITS runs on the objects folder without getting the MD5 of any file.
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    with os.scandir(cache_path) as cache:
+        if not any(entry.name.endswith("_fits.xml") for entry in cache):
+            return objects, []
+
+    # Gets the MD5 of every file and checks if it is in the cache.
+    object_checksums = aip.object_hashing.result() if aip.object_hashing else {}
+    folders, entries = list_by_inode(objects)
+    cached_files = []
+    new_files = []
+    for entry in sorted(entries, key=lambda entry: entry.path):
+        file_info = entry_file_info(entry)[1]
+        md5 = aip.bag_md5s.get(file_info) or object_checksums.get(file_info, {}).get("md5")
+        if not md5:
+            md5 = hash_file(entry.path, ["md5"])[0]["md5"]
+        cached_fits = os.path.join(cache_path, f"{md5}_fits.xml")
+        if os.path.exists(cached_fits):
+            cached_files.append((entry.path, cached_fits))
+        else:
+            new_files.append(entry.path)
+
+    # If no files are in the cache, FITS runs on the objects folder. If every file is, FITS does not run.
+    if not cached_files:
+        return objects, cached_files
+    if not new_files:
+        return None, cached_files
+
+    # Links the files that are not in the cache into the fits-input folder.
+    fits_input = make_fits_input(aip, new_files)
+    return fits_input, cached_files
+
+
+def run_tool(aip, tool, command, **kwargs):
+    """Run an external tool and add an event with its exit code, size of its error output, time, and resource usage
+
+    The resource usage (see run_with_rusage()) is also added to the total for the tool in the log,
+    with the CPU seconds and blocks added together and the largest peak memory of any run.
+
+    Parameters:
+         aip : instance of the AIP class, used for the event and log
+         tool : name of the tool (TOOLS) for the event and log, for example fits or saxon
+         command : the command to run
+         kwargs : keyword arguments for subprocess.run()
+
+    Returns:
+        output : the CompletedProcess from subprocess.run()
+    """
+    start = time.perf_counter()
+    output, usage = run_with_rusage(command, **kwargs)
+    event(aip, "tool", tool=tool, exit_code=output.returncode,
+          stderr_bytes=len(output.stderr) if output.stderr is not None else None,
+          seconds=round(time.perf_counter() - start, 3), **(usage or {}))
+
+    if usage:
+        totals = aip.log.setdefault("ToolUsage", {}).setdefault(tool, {"CPU": 0, "RSS": 0, "Read": 0, "Write": 0})
+        totals["CPU"] += usage["user_seconds"] + usage["system_seconds"]
+        totals["RSS"] = max(totals["RSS"], usage["peak_rss_mb"])
+        totals["Read"] += usage["read_blocks"]
+        totals["Write"] += usage["write_blocks"]
+    return output
+
+
+def run_with_rusage(command, input=None, **kwargs):
+    """Run a command the same as subprocess.run() and get the resources used by it and every process it started
+
+    The resource usage is from os.wait4(), which is not available on Windows.
+    The output is read in other threads, since the command is waited for with wait4() instead of communicate().
+    Peak memory is in MB (1,000,000 bytes) and blocks are usually 512 bytes.
+
+    Parameters:
+         command : the command to run
+         input : bytes to send to the command (stdin), if any
+         kwargs : keyword arguments for subprocess.Popen(), which are the same as subprocess.run() for this script
+
+    Returns:
+        output : the CompletedProcess, the same as subprocess.run()
+        usage : dictionary with user_seconds, system_seconds, peak_rss_mb, read_blocks, and write_blocks,
+                or None on Windows
+    """
+    if not hasattr(os, "wait4"):
+        return subprocess.run(command, input=input, **kwargs), None
+
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    with subprocess.Popen(command, **kwargs) as process:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stdout = executor.submit(process.stdout.read) if process.stdout else None
+            stderr = executor.submit(process.stderr.read) if process.stderr else None
+            if input is not None:
+                try:
+                    process.stdin.write(input)
+                except BrokenPipeError:
+                    pass
+                process.stdin.close()
+            pid, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+    output = subprocess.CompletedProcess(process.args, process.returncode, stdout.result() if stdout else None,
+                                         stderr.result() if stderr else None)
+
+    # Peak memory (ru_maxrss) is in bytes on Mac and KB on Linux.
+    peak_rss = rusage.ru_maxrss if platform.system() == "Darwin" else rusage.ru_maxrss * 1024
+    usage = {"user_seconds": round(rusage.ru_utime, 3), "system_seconds": round(rusage.ru_stime, 3),
+             "peak_rss_mb": round(peak_rss / 1000000, 1), "read_blocks": rusage.ru_inblock,
+             "write_blocks": rusage.ru_oublock}
+    return output, usage
+
+
+def scan_aip(aip, aip_path):
+    """Make or update the inventory of every file in the AIP folder, saved to the AIP instance
+
+    The first scan lists every folder with os.scandir, which gets the size and date modified with the listing
+    instead of a separate request for each file. Later scans only list folders that changed (date modified of the folder)
+    and reuse what was saved for the rest, so the large objects folder is not read again by each step.
+    Folders are matched by inode, so they are still matched after being moved (for example, into the bag data folder).
+    Adding, deleting, or moving a file changes the folder date modified, but rewriting a file in place does not,
+    so make_aip() has the metadata folder, where steps rewrite files, listed again after each step (forget_listing()).
+    A folder changed within the last few seconds is always listed again, since the date modified is not precise enough
+    to tell if it changed again in the same instant.
+
+    Parameters:
+        aip : instance of the AIP class, used for inventory and folder_listings
+        aip_path : path to the aip folder, either named with the aip_id or aip_id_bag
+
+    Returns: none
+    """
+
+    # The inventory is empty if the AIP folder is not there, so the error is found by the step using it.
+    recent = time.time_ns() - 2_000_000_000
+    listings = {}
+    inventory = {}
+    folders = [("", os.stat(aip_path))] if os.path.isdir(aip_path) else []
+    while folders:
+        relative_folder, folder_stat = folders.pop()
+        key = (folder_stat.st_dev, folder_stat.st_ino)
+
+        # Reuses the saved listing if the folder has not changed, and otherwise lists the folder.
+        saved = aip.folder_listings.get(key)
+        if saved and saved[0] == folder_stat.st_mtime_ns and saved[0] < recent:
+            entries = saved[1]
+        else:
+            entries = []
+            with os.scandir(os.path.join(aip_path, relative_folder)) as folder:
+                for entry in folder:
+                    if entry.is_dir(follow_symlinks=False):
+                        entries.append((entry.name, None))
+                    else:
+                        entries.append((entry.name, entry_file_info(entry)[1]))
+        listings[key] = (folder_stat.st_mtime_ns, entries)
+
+        # Subfolders are checked again every scan, since a change inside them does not change this folder.
+        for name, file_info in entries:
+            relative_path = os.path.join(relative_folder, name)
+            if file_info:
+                inventory[relative_path] = file_info
+            else:
+                folders.append((relative_path, os.stat(os.path.join(aip_path, relative_path))))
+
+    aip.folder_listings = listings
+    aip.inventory = inventory
+
+
+def split_aips(aips_dir, aip_type, md_csv, md_rows, max_files, max_size):
+    """Split any AIP folder that is over the limits in configuration.py into multiple AIPs, before the AIPs are made
+
+    AIPs are easier to process and maintain with under 10,000 files and 100 GB.
+    general_aip.py runs this if AIP_MAX_FILES (number of files) or AIP_MAX_SIZE (bytes) is in configuration.py.
+    Each AIP folder is checked with its inventory (see scan_aip()). A folder over a limit is split into the fewest parts that are under the limits,
+    of about the same size, keeping the files in path order so folders stay together as much as possible.
+    Each part is a new folder in the AIPs directory, named with the part AIP ID, which is the AIP ID plus a two-digit
+    part number, using the same separator as the number at the end of the AIP ID (or _ if there is none).
+    If the AIP folder was not already named with the AIP ID, each part keeps it as the first folder, the same as
+    when the AIP folder is moved into a folder named with the AIP ID later in the workflow.
+    Files are renamed into the part folders, not copied. The metadata.csv is updated with a row for each part,
+    with "Part # of #" added to the title, and the original is saved as metadata_before_split.csv.
+    Splitting cannot be resumed if it is interrupted: some files are already in the part folders and metadata.csv
+    is not updated until every AIP is split, so the AIPs directory must be fixed by hand before running again.
+
+    Only general AIPs are split. Web and AV AIPs have metadata files or bags that must stay with all the content,
+    so AIPs of those types that are over a limit are printed but not split.
+
+    Parameters:
+        aips_dir : the path to the folder which contains the folders to be made into AIPs
+        aip_type : the type of AIPs, from the script arguments
+        md_csv : path to the metadata.csv file
+        md_rows : a list of MetadataRow from check_metadata_csv()
+        max_files : the most files in an AIP, or None for no limit
+        max_size : the largest size of an AIP in bytes, or None for no limit
+
+    Returns:
+        md_rows : a list of MetadataRow, with a row for each part instead of each AIP that was split
+    """
+
+    new_rows = []
+    split_count = 0
+    for row in md_rows:
+
+        # Gets the number of files and size of the AIP folder from its inventory.
+        # A temporary AIP instance is used, since the inventory is saved to it.
+        folder_path = os.path.join(aips_dir, row.Folder)
+        aip = AIP(aips_dir, row.Department, None, row.Collection, row.Folder, aip_type, row.AIP_ID, row.Title,
+                  row.Rights, row.Version, False)
+        scan_aip(aip, folder_path)
+        file_count = len(aip.inventory)
+        total_size = sum(file_info.size for file_info in aip.inventory.values())
+        over_files = max_files is not None and file_count > max_files
+        over_size = max_size is not None and total_size > max_size
+        if not over_files and not over_size:
+            new_rows.append(row)
+            continue
+        if aip_type != "general":
+            print(f"{row.AIP_ID} is over the AIP limits ({file_count} files, {total_size} bytes) but is not split "
+                  f"because it is a {aip_type} AIP.")
+            new_rows.append(row)
+            continue
+
+        # Divides the files, in path order, into the fewest parts that are under the limits.
+        # Each file goes in the part for where it falls in the AIP, by number of files and by size (the middle of the file),
+        # so the parts are about the same size. If a part is still over a limit, tries again with one more part.
+        paths = sorted(aip.inventory)
+        parts_count = max(-(-file_count // max_files) if max_files else 1,
+                          -(-total_size // max_size) if max_size else 1)
+        while True:
+            parts = [[] for _ in range(parts_count)]
+            position = 0
+            for index, path in enumerate(paths):
+                size = aip.inventory[path].size
+                part = index * parts_count // file_count if max_files else 0
+                if max_size:
+                    part = max(part, int((position + size / 2) * parts_count // total_size))
+                parts[min(part, parts_count - 1)].append(path)
+                position += size
+            parts = [part for part in parts if part]
+            if parts_count >= file_count or all(
+                    (not max_files or len(part) <= max_files)
+                    and (not max_size or sum(aip.inventory[path].size for path in part) <= max_size) for part in parts):
+                break
+            parts_count += 1
+
+        # An AIP with one file larger than AIP_MAX_SIZE cannot be split.
+        if len(parts) == 1:
+            print(f"{row.AIP_ID} is over the AIP limits but is not split because it is one file.")
+            new_rows.append(row)
+            continue
+
+        # Makes the AIP ID for each part. If any is already used, the AIP is not split.
+        number = re.search(r"([-_]?)\d+$", row.AIP_ID)
+        separator = number.group(1) if number and number.group(1) else "_"
+        part_ids = [f"{row.AIP_ID}{separator}{part_number:02d}" for part_number in range(1, len(parts) + 1)]
+        used_ids = {other.AIP_ID for other in md_rows} | {other.Folder for other in md_rows}
+        if any(part_id in used_ids or os.path.exists(os.path.join(aips_dir, part_id)) for part_id in part_ids):
+            print(f"{row.AIP_ID} is over the AIP limits but is not split because a part AIP ID is already used.")
+            new_rows.append(row)
+            continue
+
+        # Moves the files for each part into the part folder and adds a row for the part to the metadata.
+        for part_number, (part_id, part_paths) in enumerate(zip(part_ids, parts), start=1):
+            part_path = os.path.join(aips_dir, part_id)
+            if row.Folder != row.AIP_ID:
+                part_path = os.path.join(part_path, row.Folder)
+            for path in part_paths:
+                os.makedirs(os.path.join(part_path, os.path.dirname(path)), exist_ok=True)
+                os.replace(os.path.join(folder_path, path), os.path.join(part_path, path))
+            new_rows.append(row._replace(Folder=part_id, AIP_ID=part_id,
+                                         Title=f"{row.Title} Part {part_number} of {len(parts)}"))
+
+        # Deletes the folders that are empty now that the files are moved, starting with the deepest.
+        # Anything added to the AIP folder after it was scanned is left where it is, since it is not in any part.
+        for root, directories, files in os.walk(folder_path, topdown=False):
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+        if os.path.exists(folder_path):
+            print(f"{row.AIP_ID} had files added after it was scanned, which are left in {folder_path} "
+                  f"and are not in any AIP.")
+        split_count += 1
+        print(f"Split {row.AIP_ID} ({file_count} files, {total_size} bytes) into {len(parts)} AIPs.")
+
+    # Saves the updated metadata.csv, keeping the original for reference.
+    if split_count:
+        shutil.copy2(md_csv, os.path.join(os.path.dirname(md_csv), "metadata_before_split.csv"))
+        with open(md_csv, "w", newline="", encoding="utf-8") as md_file:
+            md_writer = csv.writer(md_file)
+            md_writer.writerow(MetadataRow._fields)
+            md_writer.writerows([value if value != "BLANK" else "" for value in new_row] for new_row in new_rows)
+    return new_rows
+
+
+def step_time_summary(aip_logs):
+    """Summarize the time of each step for the AIPs made in a batch
+
+    The percentiles use the nearest rank, so they are always the time of one of the AIPs.
+
+    Parameters:
+        aip_logs : list of the log dictionaries (AIP.log) of the AIPs
+
+    Returns:
+        summary : dictionary with the step name (STEPS) and a dictionary with the number of AIPs
+        and the total, median, 90th percentile, and maximum seconds, for every step that ran at least once
+    """
+    summary = {}
+    for step in STEPS:
+        times = sorted(aip_log["StepTimes"][step] for aip_log in aip_logs if step in aip_log["StepTimes"])
+        if times:
+            summary[step] = {"AIPs": len(times), "Total": sum(times),
+                             "Median": times[math.ceil(0.5 * len(times)) - 1],
+                             "P90": times[math.ceil(0.9 * len(times)) - 1], "Max": times[-1]}
+    return summary
+
+
+def stream_warcs(aip, fits_input):
+    """Characterize the WARCs in a web AIP by reading their records once, so FITS does not run on them
+
+    FITS reads each WARC in full with several tools, which is slow for multi-GB WARCs.
+    warc_metadata.py reads the record headers and content in a single pass to get the WARC version, size, MD5,
+    and the crawl software from the warcinfo record, which are used for the FITS output saved by make_signature_fits().
+    Any WARC that cannot be read to the end (for example, compressed or damaged) is left for FITS.
+    Prints the number of WARCs that were characterized.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory and id
+        fits_input : path to the folder FITS would run on (objects or fits-input)
+
+    Returns:
+        fits_input : path to the folder to run FITS on (objects or fits-input), or None if there are no other files
+        warcs : a list of tuples with the path to the WARC in the objects folder, its Signature, size, MD5,
+                and crawl software (name, version) or None
+    """
+
+    objects = os.path.join(aip.directory, aip.id, "objects")
+    warcs = []
+    remaining = []
+    records = 0
+    for root, directories, files in os.walk(fits_input):
+        for file in files:
+            input_path = os.path.join(root, file)
+            file_path = os.path.join(objects, os.path.relpath(input_path, fits_input))
+            warc_info = warc_metadata.characterize(input_path) if file.lower().endswith(".warc") else None
+            if warc_info:
+                signature = format_signatures.Signature("WARC", warc_info.version,
+                                                        warc_metadata.VERSIONS[warc_info.version],
+                                                        "application/warc", ("warc",))
+                warcs.append((file_path, signature, warc_info.size, warc_info.md5, warc_info.software))
+                records += warc_info.records
+            else:
+                remaining.append(file_path)
+
+    # Removes the WARCs from the FITS input, which is now the fits-input folder.
+    if warcs:
+        print(f"WARC streaming: {len(warcs)} WARCs ({records} records) characterized without FITS")
+        fits_input = make_fits_input(aip, remaining)
+    return fits_input, warcs
 
 
 def structure_directory(aip, staging):
@@ -726,57 +2622,78 @@ def structure_directory(aip, staging):
     Anything not recognized as metadata is moved into the objects folder.
     If the digital objects are already organized into folders,
     that directory structure is maintained within the objects folder.
+    For the dpx workflow, the content of the bag is moved with move_dpx(), which can resume if it was interrupted.
 
     Parameters:
          aip : instance of the AIP class, used for directory, workflow, department, id, and log
          staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
+    # For the dpx workflow, the list of moves is saved while the files are moved.
+    # If it is already there, the script stopped while moving the files for this AIP and it will finish the moves.
+    aip_path = os.path.join(aip.directory, aip.id)
+    dpx_journal = os.path.join(aip.directory, f"{aip.id}_dpx-moves.csv")
+    resume = aip.workflow == "dpx" and os.path.exists(dpx_journal)
+
+    # Saves the MD5s from any bag in the AIP folder, before the bag is reorganized, so make_bag() can use them.
+    # If the dpx workflow is resuming, the bag has already been reorganized.
+    if not resume:
+        read_bag_manifest(aip, aip_path)
+
+    # For the dpx workflow, checks there is space to copy the MOV files to the movs-to-bag folder before changing anything.
+    # If there is not, moves the AIP to an error folder.
+    if aip.workflow == "dpx" and not resume:
+        movs_size = sum(os.path.getsize(os.path.join(aip_path, "data", item))
+                        for item in os.listdir(os.path.join(aip_path, "data")) if item.endswith(".mov"))
+        free_space = shutil.disk_usage(os.path.join(staging, "movs-to-bag")).free
+        if movs_size > free_space:
+            aip.log["ObjectsError"] = f"Not enough space to copy MOV files to movs-to-bag ({movs_size} bytes)"
+            aip.log["Complete"] = "Error during processing"
+            log(aip.log, aip.directory)
+            return move_error("not_enough_space", aip_path, staging)
+
     # Makes the objects folder within the AIP folder, if it doesn't exist.
     # If it does, moves the AIP to an error folder so the original directory structure is not altered.
-    aip_path = os.path.join(aip.directory, aip.id)
+    # It will already exist if the dpx workflow is resuming.
     try:
-        os.mkdir(os.path.join(aip_path, "objects"))
+        os.makedirs(os.path.join(aip_path, "objects"), exist_ok=resume)
         aip.log["ObjectsError"] = "Success"
     except FileExistsError:
         aip.log["ObjectsError"] = "Objects folder already exists in original files"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("objects_folder_exists", aip_path, staging)
-        return
+        return move_error("objects_folder_exists", aip_path, staging)
 
     # Makes the metadata folders within the AIP folder, if it doesn't exist.
     # If it does, moves the AIP to an error folder so the original directory structure is not altered.
     try:
-        os.mkdir(os.path.join(aip_path, "metadata"))
+        os.makedirs(os.path.join(aip_path, "metadata"), exist_ok=resume)
         aip.log["MetadataError"] = "Success"
     except FileExistsError:
         aip.log["MetadataError"] = "Metadata folder already exists in original files"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("metadata_folder_exists", aip_path, staging)
-        return
+        return move_error("metadata_folder_exists", aip_path, staging)
 
     # Moves DPX files to the objects folder.
     # DPX files are already in bags, so have to navigate to the data folder to find the content to move into objects.
+    # If there is an error, the moves are undone, the empty objects and metadata folders are deleted
+    # so the AIP can be run again, and the AIP is moved to an error folder.
     if aip.workflow == 'dpx':
-        for item in os.listdir(os.path.join(aip_path, 'data')):
-            if os.path.isdir(os.path.join(aip_path, 'data', item)):
-                shutil.copytree(os.path.join(aip_path, 'data', item), os.path.join(aip_path, 'objects', f'{item}-dpx'))
-            elif item.endswith('.cue'):
-                os.replace(os.path.join(aip_path, 'data', item), os.path.join(aip_path, 'objects', item))
-            elif item.endswith('.mov'):
-                shutil.copy2(os.path.join(aip_path, 'data', item), os.path.join(staging, 'movs-to-bag'))
-                os.replace(os.path.join(aip_path, 'data', item), os.path.join(aip_path, 'objects', item))
-            elif item.endswith('.wav'):
-                os.replace(os.path.join(aip_path, 'data', item),
-                           os.path.join(aip_path, 'objects', f'{pathlib.Path(item).stem}-dpx.wav'))
-        # Deletes the bag metadata files and data folder, now that the rest is organized into the AIP directory.
-        for bag_metadata_file in ('bag-info.txt', 'bagit.txt', 'manifest-md5.txt', 'tagmanifest-md5.txt'):
-            os.remove(os.path.join(aip_path, bag_metadata_file))
-        shutil.rmtree(os.path.join(aip_path, 'data'))
+        error = move_dpx(aip_path, staging, dpx_journal)
+        if error:
+            for folder in ('objects', 'metadata'):
+                try:
+                    os.rmdir(os.path.join(aip_path, folder))
+                except OSError:
+                    pass
+            aip.log["ObjectsError"] = f"Could not move DPX files to the objects folder: {error}"
+            aip.log["Complete"] = "Error during processing"
+            log(aip.log, aip.directory)
+            return move_error("dpx_move_error", aip_path, staging)
 
     # Moves any metadata files to the metadata folder and then the rest to the objects folder, with renaming as needed.
     # Metadata files are matched as specifically as possible to reduce the risk of incorrect identifications.
@@ -804,6 +2721,166 @@ def structure_directory(aip, staging):
         # Moves all remaining files and folders to the objects folder.
         else:
             os.replace(item_path, os.path.join(aip_path, "objects", item))
+    return SUCCESS
+
+
+def transform_fits(aip, staging):
+    """Make the preservation.xml from the FITS output in the metadata folder
+
+    The preservation.xml is made with the preservation_xml module, which gives the same result as the stylesheets.
+    It cleans the FITS for each file separately, in parallel for large AIPs, and then combines the results.
+    If PRESERVATION_XML_ENGINE is "saxon" in configuration.py, it is made from the combined-fits.xml
+    with a single Saxon run instead: the fits-pipeline.xsl stylesheet runs fits-cleanup.xsl and fits-to-preservation.xsl,
+    passing the cleaned FITS between them in memory instead of saving and reading the cleaned-fits.xml.
+    To also save the cleaned-fits.xml for debugging, set SAVE_CLEANED_FITS to True in configuration.py.
+
+    Parameters:
+        aip : instance of the AIP class, used for collection_id, department, directory, id, log, title, and version
+        staging : path to the aip_staging folder from configuration.py
+
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
+    """
+
+    # Uses saxon and a stylesheet to make the preservation.xml file from the combined-fits.xml.
+    input_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_combined-fits.xml")
+    stylesheet = os.path.join(c.STYLESHEETS, "fits-pipeline.xsl")
+    output_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_preservation.xml")
+    args = f'collection-id="{aip.collection_id}" aip-id="{aip.id}" aip-title="{aip.title}" ' \
+           f'department="{aip.department}" rights="{aip.rights}" version={aip.version} ns={c.NAMESPACE}'
+
+    # PRESERVATION_XML_ENGINE is optional. Unless it is "saxon", makes the preservation.xml without Saxon.
+    # The FITS for each file is cleaned separately (in parallel for large AIPs) and the results are combined,
+    # in the same order as the combined-fits.xml. If there is any error, for example FITS that cannot be read
+    # or is not what the module expects, logs the event and moves the AIP.
+    try:
+        engine = c.PRESERVATION_XML_ENGINE
+    except AttributeError:
+        engine = "python"
+    if engine == "python":
+        import preservation_xml
+        metadata_path = os.path.join(aip.directory, aip.id, "metadata")
+        try:
+            fits_paths = [os.path.join(metadata_path, doc) for doc in os.listdir(metadata_path)
+                          if doc.endswith("_fits.xml")]
+            records = preservation_xml.clean_fits_files(fits_paths)
+            preservation_xml.write_preservation_xml(records, output_file, aip, c.NAMESPACE)
+        except Exception as error:
+            error_msg = f"{type(error).__name__}: {error}"
+            aip.log["PresXML"] = f"Issue when creating preservation.xml. Python error: {error_msg}"
+            aip.log["Complete"] = "Error during processing"
+            log(aip.log, aip.directory)
+            return move_error("pres_xml_python_error", os.path.join(aip.directory, aip.id), staging)
+        return SUCCESS
+
+    # SAVE_CLEANED_FITS is optional. If it is True, the cleaned-fits.xml is saved to the metadata folder.
+    try:
+        if c.SAVE_CLEANED_FITS:
+            cleaned_fits = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_cleaned-fits.xml")
+            args += f' cleaned-fits="{pathlib.Path(cleaned_fits).as_uri()}"'
+    except AttributeError:
+        pass
+
+    saxon_output = run_tool(aip, "saxon", f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
+                            f'-xsl:"{stylesheet}" -o:"{output_file}" {args}',
+                            stderr=subprocess.PIPE, shell=True)
+
+    # If saxon has an error, logs the event and moves the AIP to an error folder.
+    # Errors are from making the preservation.xml if the message is from fits-to-preservation.xsl,
+    # and otherwise are from making the cleaned-fits.xml (including reading the combined-fits.xml).
+    if saxon_output.stderr:
+        error_msg = saxon_output.stderr.decode("utf-8")
+        if "fits-to-preservation.xsl error:" in error_msg:
+            aip.log["PresXML"] = f"Issue when creating preservation.xml. Saxon error: {error_msg}"
+            error_name = "pres_xml_saxon_error"
+        else:
+            aip.log["PresXML"] = f"Issue when creating cleaned-fits.xml. Saxon error: {error_msg}"
+            error_name = "cleaned_fits_saxon_error"
+        aip.log["Complete"] = "Error during processing"
+        log(aip.log, aip.directory)
+        return move_error(error_name, os.path.join(aip.directory, aip.id), staging)
+    return SUCCESS
+
+
+def update_fits_cache(aip, cache_path, cached_files):
+    """Save new FITS output to the cache and save the cached FITS output for the rest of the files to the metadata folder
+
+    Cached FITS output has the information that depends on the file path (filepath, filename, and fslastmodified)
+    updated to match the file in this AIP. Prints the number of files that used the cache
+    and the FITS execution time that was saved, which is the time it took FITS to make the cached output,
+    and adds them to the AIP events (see event()), so they are kept for each AIP.
+
+    Parameters:
+        aip : instance of the AIP class, used for directory, events, and id
+        cache_path : path to the folder in the FITS cache for the current FITS version and configuration
+        cached_files : a list of tuples with the path to the file and the path to its cached FITS output
+
+    Returns: none
+    """
+
+    # Makes Python aware of the FITS namespace (it is the default and has no prefix).
+    fits_ns = "http://hul.harvard.edu/ois/xml/ns/fits/fits_output"
+    et.register_namespace("", fits_ns)
+    metadata = os.path.join(aip.directory, aip.id, "metadata")
+
+    # Adds the FITS output made by this run to the cache, named with the MD5 from FITS.
+    new_fits = [item for item in os.listdir(metadata) if item.endswith("_fits.xml")]
+    added_size = 0
+    for item in new_fits:
+        try:
+            tree = et.parse(os.path.join(metadata, item))
+        except et.ParseError:
+            continue
+        fileinfo = tree.getroot().find(f"{{{fits_ns}}}fileinfo")
+        if fileinfo is None:
+            continue
+        md5 = fileinfo.find(f"{{{fits_ns}}}md5checksum")
+        if md5 is not None and md5.text:
+            shutil.copy2(os.path.join(metadata, item), os.path.join(cache_path, f"{md5.text}_fits.xml"))
+            added_size += os.path.getsize(os.path.join(metadata, item))
+
+    # Saves the cached FITS output for the rest of the files, updated for the file in this AIP.
+    # If more than one file has the same name, adds a number the same as FITS does (file.ext-1_fits.xml).
+    saved_ms = 0
+    for file_path, cached_fits in cached_files:
+        tree = et.parse(cached_fits)
+        root = tree.getroot()
+        fileinfo = root.find(f"{{{fits_ns}}}fileinfo")
+        updates = {"filepath": file_path, "filename": os.path.basename(file_path),
+                   "fslastmodified": str(int(os.path.getmtime(file_path) * 1000))}
+        for element_name, value in updates.items():
+            element = fileinfo.find(f"{{{fits_ns}}}{element_name}")
+            if element is not None:
+                element.text = value
+        name = os.path.basename(file_path)
+        number = 0
+        while f"{name}_fits.xml" in new_fits:
+            number += 1
+            name = f"{os.path.basename(file_path)}-{number}"
+        new_fits.append(f"{name}_fits.xml")
+        tree.write(os.path.join(metadata, f"{name}_fits.xml"), xml_declaration=True, encoding="UTF-8")
+
+        # Updates the date modified of the cached output, which is used to find the least recently used output.
+        os.utime(cached_fits)
+        statistics = root.find(f"{{{fits_ns}}}statistics")
+        if statistics is not None:
+            saved_ms += int(statistics.get("fitsExecutionTime", 0))
+
+    # Deletes the least recently used FITS output if the cache is now too big.
+    # The size limit is from the configuration file. The default is 10 GB.
+    try:
+        size_limit = c.FITS_CACHE_SIZE
+    except AttributeError:
+        size_limit = 10_000_000_000
+    evict_fits_cache(os.path.dirname(cache_path), added_size, size_limit)
+
+    # Prints and saves how much the cache was used, so staff can see if it is helping.
+    file_count = len(new_fits)
+    if file_count:
+        print(f"FITS cache: {len(cached_files)} of {file_count} files ({len(cached_files) / file_count:.0%}) "
+              f"reused FITS output, saving {saved_ms / 1000:.1f} seconds of FITS execution time")
+        event(aip, "fits_cache", files=file_count, cached_files=len(cached_files),
+              hit_rate=round(len(cached_files) / file_count, 3), saved_seconds=round(saved_ms / 1000, 3))
 
 
 def validate_bag(aip, staging):
@@ -813,9 +2890,12 @@ def validate_bag(aip, staging):
          aip : instance of the AIP class, used for id and log
          staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
+    import bagit
+
     # Validate the bag with bagit, and save an errors in a separate log.
     bag_path = os.path.join(aip.directory, f"{aip.id}_bag")
     new_bag = bagit.Bag(bag_path)
@@ -826,7 +2906,7 @@ def validate_bag(aip, staging):
         aip.log["BagValid"] = "Bag not valid (see log in bag_not_valid error folder)"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("bag_not_valid", bag_path, staging)
+        result = move_error("bag_not_valid", bag_path, staging)
         # Error log is formatted to be easier to read (one error per line) if error information is in details.
         # Otherwise, the entire error output is saved to the log in the errors folder alongside the AIP folder.
         log_path = os.path.join(staging, "aips-with-errors", "bag_not_valid", f"{aip.id}_bag_validation.txt")
@@ -836,6 +2916,8 @@ def validate_bag(aip, staging):
                     log_path.write(str(error_type) + "\n")
             else:
                 log_path.write(str(errors))
+        return result
+    return SUCCESS
 
 
 def validate_preservation_xml(aip, staging):
@@ -845,14 +2927,15 @@ def validate_preservation_xml(aip, staging):
          aip : instance of the AIP class, used for id and log
          staging : path to the aip_staging folder from configuration.py
 
-    Returns: none
+    Returns:
+        result : StepResult, with the error if the AIP was moved to an error folder
     """
 
     # Uses xmllint and an XSD file to validate the preservation.xml.
     input_file = os.path.join(aip.directory, aip.id, "metadata", f"{aip.id}_preservation.xml")
     stylesheet = os.path.join(c.STYLESHEETS, "preservation.xsd")
-    xmllint_output = subprocess.run(f'xmllint --noout -schema "{stylesheet}" "{input_file}"',
-                                    stderr=subprocess.PIPE, shell=True)
+    xmllint_output = run_tool(aip, "xmllint", f'xmllint --noout -schema "{stylesheet}" "{input_file}"',
+                              stderr=subprocess.PIPE, shell=True)
 
     # If the preservation.xml file was not made in the expected location, moves the AIP to an error folder.
     # If it was made, updates the log with the success.
@@ -861,8 +2944,7 @@ def validate_preservation_xml(aip, staging):
         aip.log["PresXML"] = f"Preservation.xml was not created. xmllint error: {validation_result}"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("preservationxml_not_found", os.path.join(aip.directory, aip.id), staging)
-        return
+        return move_error("preservationxml_not_found", os.path.join(aip.directory, aip.id), staging)
     else:
         aip.log["PresXML"] = "Success"
 
@@ -873,12 +2955,13 @@ def validate_preservation_xml(aip, staging):
         aip.log["PresValid"] = "Preservation.xml is not valid (see log in error folder)"
         aip.log["Complete"] = "Error during processing"
         log(aip.log, aip.directory)
-        move_error("preservationxml_not_valid", os.path.join(aip.directory, aip.id), staging)
+        result = move_error("preservationxml_not_valid", os.path.join(aip.directory, aip.id), staging)
         log_path = os.path.join(staging, "aips-with-errors", "preservationxml_not_valid",
                                 f"{aip.id}_presxml_validation.txt")
         with open(log_path, "w") as validation_log:
             for line in validation_result.split("\r"):
                 validation_log.write(line + "\n")
-        return
+        return result
     else:
         aip.log["PresValid"] = f"Valid on {datetime.now()}"
+    return SUCCESS
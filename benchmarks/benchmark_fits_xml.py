@@ -0,0 +1,108 @@
+"""Benchmark the time to make the cleaned-fits.xml and preservation.xml as the number of files in an AIP grows
+
+Makes a combined-fits.xml for AIPs from 10 to 100,000 files, with a realistic mix of formats and tools,
+and runs the same Saxon commands as make_cleaned_fits_xml() and make_preservation_xml() on each one.
+Prints the time for each stylesheet and the time per file, which should stay about the same as the AIP grows.
+
+To check that a change to the stylesheets does not change the output, give the path to a folder with
+the previous version of the stylesheets (e.g. from git worktree). The previous version is timed as well,
+and the preservation.xml made by each version is compared.
+
+Uses the SAXON and STYLESHEETS paths from configuration.py.
+
+Parameters:
+    max_files (optional): the largest AIP to test, as a number of files (default is 100000)
+    baseline_stylesheets (optional): path to a folder with the previous version of the stylesheets
+
+Returns:
+    Prints a table of the results to the terminal
+"""
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Adds the repo folder to the path so the configuration.py used by the scripts is found.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import configuration as c
+
+# Formats to cycle through when making the FITS for each file, as (extension, format, version, puid, tools).
+# Some formats share a name with a different version or PUID, and the tools and tool versions vary,
+# so the stylesheets have to group and remove duplicates the same as they would for a real AIP.
+FORMATS = [('pdf', 'Portable Document Format', '1.4', 'fmt/18', [('Droid', '6.4'), ('Jhove', '1.20.1')]),
+           ('pdf', 'Portable Document Format', '1.7', 'fmt/276', [('Droid', '6.4'), ('Exiftool', '11.54')]),
+           ('txt', 'Plain text', '', 'x-fmt/111', [('Droid', '6.4'), ('Jhove', '1.20.1'), ('file utility', '5.03')]),
+           ('jpg', 'JPEG File Interchange Format', '1.01', 'fmt/43', [('Exiftool', '11.54'), ('Jhove', '1.20.1')]),
+           ('jpg', 'JPEG File Interchange Format', '1.01', 'fmt/43', [('Exiftool', '11.54'), ('Jhove', '1.22.1')]),
+           ('doc', 'Microsoft Word Binary File Format', '97-2003', 'fmt/40', [('Droid', '6.4')]),
+           ('xml', 'Extensible Markup Language', '1.0', 'fmt/101', [('Jhove', '1.20.1'), ('Exiftool', '11.54')]),
+           ('html', 'Hypertext Markup Language', '', 'fmt/96', [('Droid', '6.4'), ('Jhove', '1.20.1')])]
+
+
+def make_combined_fits(path, file_count):
+    """Make a combined-fits.xml with FITS output for the number of files, in the same format as combine_metadata()"""
+    with open(path, 'w', encoding='utf-8') as combined:
+        combined.write("<?xml version='1.0' encoding='UTF-8'?>\n")
+        combined.write('<combined-fits xmlns="http://hul.harvard.edu/ois/xml/ns/fits/fits_output">')
+        for number in range(file_count):
+            extension, format_name, version, puid, tools = FORMATS[number % len(FORMATS)]
+            tool_xml = ''.join(f'<tool toolname="{name}" toolversion="{tool_version}" />' for name, tool_version in tools)
+            version_xml = f'<version toolname="{tools[0][0]}" toolversion="{tools[0][1]}">{version}</version>' if version else ''
+            combined.write(f'<fits><identification><identity format="{format_name}" mimetype="application/octet-stream" '
+                           f'toolname="FITS" toolversion="1.5.0">{tool_xml}{version_xml}'
+                           f'<externalIdentifier toolname="Droid" toolversion="6.4" type="puid">{puid}</externalIdentifier>'
+                           f'</identity></identification>'
+                           f'<fileinfo><size>{1000 + number}</size>'
+                           f'<filepath>/benchmark/aip-1/objects/folder-{number % 100}/file-{number}.{extension}</filepath>'
+                           f'<filename>file-{number}.{extension}</filename>'
+                           f'<md5checksum>{number:032x}</md5checksum>'
+                           f'<created toolname="Exiftool" toolversion="11.54">2020:01:01 00:00:00</created></fileinfo>'
+                           f'<filestatus><well-formed toolname="Jhove" toolversion="1.20.1">true</well-formed>'
+                           f'<valid toolname="Jhove" toolversion="1.20.1">true</valid></filestatus></fits>')
+        combined.write('</combined-fits>')
+
+
+def run_saxon(input_file, stylesheet, output_file, args=''):
+    """Run Saxon the same way as the aip functions and return the time it took in seconds"""
+    start = time.perf_counter()
+    saxon_output = subprocess.run(f'java -cp "{c.SAXON}" net.sf.saxon.Transform -s:"{input_file}" '
+                                  f'-xsl:"{stylesheet}" -o:"{output_file}" {args}',
+                                  stderr=subprocess.PIPE, shell=True)
+    seconds = time.perf_counter() - start
+    if saxon_output.stderr:
+        print(f"Saxon error with {stylesheet}: {saxon_output.stderr.decode('utf-8')}")
+        sys.exit(1)
+    return seconds
+
+
+def make_xml(stylesheets, combined, folder, label):
+    """Make the cleaned-fits.xml and preservation.xml with one version of the stylesheets and return the times"""
+    cleaned = os.path.join(folder, f'{label}_cleaned-fits.xml')
+    preservation = os.path.join(folder, f'{label}_preservation.xml')
+    args = 'collection-id="coll-1" aip-id="aip-1" aip-title="Benchmark" department="dept" ' \
+           f'rights="http://rightsstatements.org/vocab/InC/1.0/" version=1 ns={c.NAMESPACE}'
+    cleanup_time = run_saxon(combined, os.path.join(stylesheets, 'fits-cleanup.xsl'), cleaned)
+    preservation_time = run_saxon(cleaned, os.path.join(stylesheets, 'fits-to-preservation.xsl'), preservation, args)
+    return cleanup_time, preservation_time, preservation
+
+
+if __name__ == '__main__':
+
+    max_files = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    baseline = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print('\nFiles\tCleanup (s)\tPreservation (s)\tPer file (ms)' + ('\tBaseline (s)\tSame output' if baseline else ''))
+    with tempfile.TemporaryDirectory() as temp_folder:
+        file_count = 10
+        while file_count <= max_files:
+            combined_fits = os.path.join(temp_folder, f'{file_count}_combined-fits.xml')
+            make_combined_fits(combined_fits, file_count)
+            cleanup, preservation, output = make_xml(c.STYLESHEETS, combined_fits, temp_folder, 'current')
+            row = f'{file_count}\t{cleanup:.2f}\t{preservation:.2f}\t{(cleanup + preservation) / file_count * 1000:.3f}'
+            if baseline:
+                base_cleanup, base_preservation, base_output = make_xml(baseline, combined_fits, temp_folder, 'baseline')
+                row += f'\t{base_cleanup + base_preservation:.2f}\t{filecmp.cmp(output, base_output, shallow=False)}'
+            print(row)
+            file_count *= 10
@@ -0,0 +1,97 @@
+"""Benchmark the time to calculate bag checksums for many small files read in path order and in inode order
+
+Makes a corpus of small files in the folder being tested, written in a random order so the order of the files
+on the disk (inode order) is not the order of their paths, the same as content copied from another drive
+by a tool that does not copy in path order. Each file is then read with hash_file() for md5 and sha256,
+in path order (the order bagit and tar read files) and in inode order (list_by_inode(), used by the workflow).
+
+For the results to show the time to read from the disk, the files must not be in memory (the page cache).
+On Linux, each file is dropped from the page cache before each run, and otherwise run it on a drive that was
+just connected or after restarting the computer, and only the first run is meaningful.
+Run it on the drive that the AIPs are made on, since the difference is from seek time on hard drives
+and there will be little or no difference on an SSD.
+
+Parameters:
+    folder (required): path to a folder on the drive to test, where the corpus is made and then deleted
+    file_count (optional): number of files in the corpus (default is 10000)
+    runs (optional): number of times to read the corpus in each order (default is 3)
+
+Returns:
+    Prints a table of the results to the terminal
+"""
+import os
+import random
+import shutil
+import sys
+import time
+
+# Adds the repo folder to the path so aip_functions and the configuration.py it uses are found.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import aip_functions as a
+
+
+def make_corpus(corpus, file_count):
+    """Make the files, 4 KB to 64 KB each in 100 folders, writing them in a random order"""
+    paths = [os.path.join(corpus, f'folder-{number % 100:03d}', f'file-{number:06d}.bin')
+             for number in range(file_count)]
+    for folder_number in range(min(file_count, 100)):
+        os.makedirs(os.path.join(corpus, f'folder-{folder_number:03d}'))
+    random.seed(0)
+    random.shuffle(paths)
+    for path in paths:
+        with open(path, 'wb') as new_file:
+            new_file.write(os.urandom(random.randint(4, 64) * 1024))
+    # Writes the files to the disk, so they can be dropped from the page cache.
+    if hasattr(os, 'sync'):
+        os.sync()
+
+
+def drop_from_cache(paths):
+    """Drop the files from the page cache, if the operating system can (Linux), and return if they were dropped"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for path in paths:
+        with open(path, 'rb') as open_file:
+            os.posix_fadvise(open_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def time_read(paths):
+    """Calculate the md5 and sha256 of every file in the order of the list and return the time in seconds"""
+    start = time.perf_counter()
+    for path in paths:
+        a.hash_file(path, ['md5', 'sha256'])
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    test_folder = sys.argv[1]
+    file_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+
+    corpus = os.path.join(test_folder, 'benchmark_read_order')
+    print(f'\nMaking {file_count} files in {corpus}')
+    make_corpus(corpus, file_count)
+
+    try:
+        path_order = sorted(os.path.join(root, file) for root, directories, files in os.walk(corpus) for file in files)
+        folders, entries = a.list_by_inode(corpus)
+        inode_order = [entry.path for entry in entries]
+
+        # Alternates the orders, so any change in the load on the drive affects both.
+        times = {'path order': [], 'inode order': []}
+        dropped = True
+        for run in range(runs):
+            for label, paths in (('path order', path_order), ('inode order', inode_order)):
+                dropped = drop_from_cache(paths) and dropped
+                times[label].append(time_read(paths))
+    finally:
+        shutil.rmtree(corpus)
+
+    if not dropped:
+        print('The files could not be dropped from the page cache, so only the first run read from the disk.')
+    print(f"\n{'Order':<14}{'First run':>12}{'Fastest run':>14}{'Files per second':>20}")
+    for label, run_times in times.items():
+        print(f'{label:<14}{run_times[0]:>10.2f} s{min(run_times):>12.2f} s{file_count / min(run_times):>20.0f}')
+    print(f"\nInode order is {min(times['path order']) / min(times['inode order']):.1f} times faster than path order.")
@@ -0,0 +1,62 @@
+"""Benchmark the time for the scripts to start, which is paid by every run and every test process
+
+Times importing aip_functions and running general_aip.py with no arguments, which stops right away
+with the argument errors, so it is only the time to start Python and import the modules.
+Each is run several times in a new Python process and the fastest time is used, to reduce the noise from other programs.
+
+To compare to a previous version (e.g. from git worktree), give the path to the folder with that version
+of aip_functions.py and general_aip.py. The configuration.py from this repo is used for both.
+
+Parameters:
+    baseline_folder (optional): path to a folder with the previous version of the scripts
+    runs (optional): number of times to run each one (default is 10)
+
+Returns:
+    Prints a table of the results to the terminal
+"""
+import os
+import subprocess
+import sys
+import time
+
+# The repo folder, which has the current version of the scripts and the configuration.py used by both versions.
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_command(folder, arguments, runs):
+    """Run a Python command with the scripts in the folder and return the fastest time in seconds"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([folder, REPO]))
+    times = []
+    for run in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=folder, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(folder, runs):
+    """Return the times to import aip_functions and run general_aip.py with no arguments for the scripts in the folder"""
+    import_time = time_command(folder, ['-c', 'import aip_functions'], runs)
+    script_time = time_command(folder, [os.path.join(folder, 'general_aip.py')], runs)
+    return import_time, script_time
+
+
+if __name__ == '__main__':
+
+    baseline_folder = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    # Runs Python once with nothing imported, which is the part of the time that cannot be reduced.
+    python_time = time_command(REPO, ['-c', 'pass'], runs)
+
+    results = [('current', *benchmark(REPO, runs))]
+    if baseline_folder:
+        results.append(('baseline', *benchmark(baseline_folder, runs)))
+
+    print(f"\nPython with no imports: {python_time:.3f} seconds (fastest of {runs} runs)\n")
+    print(f"{'Version':<10}{'import aip_functions':>24}{'general_aip.py (no arguments)':>34}")
+    for label, import_time, script_time in results:
+        print(f"{label:<10}{import_time:>22.3f} s{script_time:>32.3f} s")
+    if baseline_folder:
+        print(f"\nStartup is {results[1][2] / results[0][2]:.1f} times faster than the baseline.")
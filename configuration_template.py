@@ -15,7 +15,7 @@ In a Mac or Linux environment:
 # Location for saving script outputs.
 AIP_STAGING = 'C:\\INSERT\\PATH'
 
-# Dependencies. Stylesheets is a folder in the GitHub repo.
+# Dependencies. Stylesheets is a folder in the GitHub repo. Saxon must be Saxon-HE 10 or later.
 FITS = 'C:\\INSERT\\PATH\\fits.bat'
 SAXON = 'C:\\INSERT\\PATH\\saxon-he-#.#.jar'
 MD5DEEP = 'C:\\INSERT\\PATH\\md5deep64.exe'
@@ -28,3 +28,42 @@ NAMESPACE = 'INSERT_NAMESPACE'
 # Department for AIP identifiers.
 # For UGA, this is the group codes for ARCHive
 GROUPS = ('INSERT_GROUP1', 'INSERT_GROUP2')
+
+# Optional: folder for saving FITS output, which is reused for files with the same content in any AIP.
+# FITS_CACHE_SIZE is the maximum size of the cache in bytes (default is 10 GB).
+# This is not used unless it is uncommented. Without it, FITS runs on every file.
+# FITS_CACHE = 'C:\\INSERT\\PATH\\fits-cache'
+# FITS_CACHE_SIZE = 10000000000
+
+# Optional: set to True to save the cleaned-fits.xml made while making the preservation.xml, for debugging.
+# It is deleted once the preservation.xml is valid, so it is only kept for AIPs with an error.
+SAVE_CLEANED_FITS = False
+
+# Optional: identify common formats (WARC, MP3, GIF, DOCX, XLSX, PPTX) from their signature instead of running FITS.
+# Files identified this way get minimal FITS output,
+# so the preservation.xml does not say if they are valid or well-formed.
+# Formats in this list (names as in FITS output) always get full FITS, for example so FITS can check they are valid.
+# This is not used unless it is uncommented.
+# FULL_FITS_FORMATS = ['Graphics Interchange Format']
+
+# Optional: the preservation.xml is made with Python (preservation_xml.py), which gives the same result as the
+# stylesheets and uses every CPU for large AIPs. Set this to "saxon" to use the stylesheets instead.
+PRESERVATION_XML_ENGINE = 'python'
+
+# Optional: for the DPX workflow, the number of frames from each DPX frame sequence that FITS runs on.
+# The FITS output for the rest of the frames is made from the sample. The default is 30.
+DPX_SAMPLE_SIZE = 30
+
+# Optional: set to True for web AIPs to characterize WARCs by reading their records once instead of with FITS.
+# Delete this variable or set it to False to run FITS on WARCs.
+WARC_STREAMING = False
+
+# Optional: for content that is already a bag (for example, DPX), the number of files hashed to check the bag manifest
+# before its MD5s are reused for the AIP bag. The default is 0 (only the Payload-Oxum and list of files are checked).
+BAG_MANIFEST_SAMPLE = 0
+
+# Optional: the most files (AIP_MAX_FILES) and largest size in bytes (AIP_MAX_SIZE) for an AIP.
+# General AIP folders over either limit are split into multiple AIPs before processing, and metadata.csv is updated.
+# These are not used unless they are uncommented. Recommended values are 10,000 files and 100 GB.
+# AIP_MAX_FILES = 10000
+# AIP_MAX_SIZE = 100000000000
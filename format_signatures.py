@@ -0,0 +1,67 @@
+"""Identify common formats from their signature (magic number), so FITS does not need to run on them
+
+Used by pre_identify() in aip_functions.py when FULL_FITS_FORMATS is in configuration.py.
+A file is only identified if its signature is unambiguous for a single PRONOM format and version
+and its extension is expected for that format. Everything else, including empty files and formats with
+sub-types that are only found by reading the whole file (for example, PDF/A or the kinds of JPEG and TIFF),
+is not identified and gets full FITS.
+"""
+from collections import namedtuple
+import os
+import zipfile
+
+# The format information used for the FITS identity, with the file extensions expected for the format.
+Signature = namedtuple('Signature', 'format version puid mimetype extensions')
+
+# Tool name and version for the FITS output made from a signature.
+TOOL_NAME = 'Signature identification'
+TOOL_VERSION = '1.0'
+
+# Signatures at the start of the file. Checked in order, so a longer signature must be before a shorter one.
+HEADERS = ((b'GIF87a', Signature('Graphics Interchange Format', '87a', 'fmt/3', 'image/gif', ('gif',))),
+           (b'GIF89a', Signature('Graphics Interchange Format', '89a', 'fmt/4', 'image/gif', ('gif',))),
+           (b'WARC/1.0\r\n', Signature('WARC', '1.0', 'fmt/289', 'application/warc', ('warc',))),
+           (b'WARC/1.1\r\n', Signature('WARC', '1.1', 'fmt/1355', 'application/warc', ('warc',))),
+           (b'ID3', Signature('MPEG 1/2 Audio Layer 3', None, 'fmt/134', 'audio/mpeg', ('mp3',))))
+
+# Office Open XML formats are ZIP files, identified by the main part inside the ZIP.
+OOXML = {'word/document.xml': Signature('Microsoft Word for Windows', '2007 onwards', 'fmt/412',
+                                        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+                                        ('docx',)),
+         'xl/workbook.xml': Signature('Microsoft Excel for Windows', '2007 onwards', 'fmt/214',
+                                      'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                                      ('xlsx',)),
+         'ppt/presentation.xml': Signature('Microsoft Powerpoint for Windows', '2007 onwards', 'fmt/215',
+                                           'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+                                           ('pptx',))}
+
+
+def identify(path):
+    """Identify the format of a file from its signature
+
+    Parameters:
+        path : path to the file
+
+    Returns:
+        signature : Signature for the format, or None if the format is not confidently identified
+    """
+    extension = os.path.splitext(path)[1][1:].lower()
+    with open(path, 'rb') as open_file:
+        header = open_file.read(16)
+
+    for magic, signature in HEADERS:
+        if header.startswith(magic):
+            return signature if extension in signature.extensions else None
+
+    # Only checks inside ZIP files with an Office Open XML extension, since reading the ZIP directory takes longer.
+    if header.startswith(b'PK\x03\x04') and extension in ('docx', 'xlsx', 'pptx'):
+        try:
+            with zipfile.ZipFile(path) as zip_file:
+                names = set(zip_file.namelist())
+        except (zipfile.BadZipFile, OSError):
+            return None
+        if '[Content_Types].xml' in names:
+            for part, signature in OOXML.items():
+                if part in names and extension in signature.extensions:
+                    return signature
+    return None
@@ -18,108 +18,100 @@ Returns:
 """
 
 import os
-import shutil
 import sys
 import aip_functions as a
 import configuration
 
-# Verifies the script arguments are correct and calculates the associated variables.
-# If there are errors, ends the script.
-AIPS_DIRECTORY, AIP_TYPE, ZIP, WORKFLOW, aip_metadata_csv, argument_errors = a.check_arguments(sys.argv)
-if len(argument_errors) > 0:
-    print('\nProblems detected with the provided script arguments:')
-    for error in argument_errors:
-        print("   * " + error)
-    sys.exit()
-
-# Verifies all the variables from the configuration file are present, all the paths are valid,
-# and the FITS path is in the same letter directory as AIPS_DIRECTORY.
-# If not, ends the script.
-configuration_errors = a.check_configuration(AIPS_DIRECTORY)
-if len(configuration_errors) > 0:
-    print('\nProblems detected with configuration.py:')
-    for error in configuration_errors:
-        print("   * " + error)
-    sys.exit()
-
-# Verifies the metadata csv has the expected values and returns them in a dataframe.
-# If there are an errors, ends the script.
-metadata_df, metadata_errors = a.check_metadata_csv(aip_metadata_csv, AIPS_DIRECTORY)
-if len(metadata_errors) > 0:
-    print('\nProblems detected with metadata.csv:')
-    for error in metadata_errors:
-        print("   * " + error)
-    sys.exit()
-
-# If there isn't already a log from running this script on a previous batch,
-# starts a log for tracking script success and adds a header row.
-if not os.path.exists(os.path.join(AIPS_DIRECTORY, 'aip_log.csv')):
-    a.log("header", AIPS_DIRECTORY)
-
-# Makes directories used to store script outputs in the AIP_STAGING directory.
-a.make_output_directories(configuration.AIP_STAGING, AIP_TYPE)
-
-# Starts counters for tracking the script progress.
-# Some steps are time-consuming, so this shows the script is not stuck.
-CURRENT_AIP = 0
-TOTAL_AIPS = len(metadata_df.index)
-
-# Uses the AIP functions to create an AIP for each folder in the metadata CSV.
-# Checks if the AIP folder is still present before calling the function for the next step
-# in case it was moved due to an error in the previous step.
-for aip_row in metadata_df.itertuples():
-
-    # Makes an instance of the AIP class using metadata from the CSV and global variables.
-    aip = a.AIP(AIPS_DIRECTORY, aip_row.Department, WORKFLOW, aip_row.Collection, aip_row.Folder, AIP_TYPE,
-                aip_row.AIP_ID, aip_row.Title, aip_row.Rights, aip_row.Version, ZIP)
-
-    # Updates the current AIP number and prints the script progress in the terminal.
-    CURRENT_AIP += 1
-    print(f'\n>>>Processing {aip.id} ({CURRENT_AIP} of {TOTAL_AIPS}).')
-
-    # Make the top level folder the AIP ID, if it isn't already.
-    # For the web AIP type, this renames the top level folder (initially named with seed id).
-    # For the other types, it makes a new folder named with the AIP ID and moves the entire folder into it.
-    aip_path = os.path.join(aip.directory, aip.id)
-    if aip.type == 'web':
-        os.rename(os.path.join(AIPS_DIRECTORY, aip.folder_name), aip_path)
-    elif aip.folder_name != aip.id:
-        os.mkdir(os.path.join(AIPS_DIRECTORY, aip.id))
-        shutil.move(os.path.join(AIPS_DIRECTORY, aip.folder_name), aip_path)
-
-    # Deletes any temporary files and makes a log of each deleted file.
-    a.delete_temp(aip, aip_path, logging=True)
-
-    # Organizes the AIP folder contents into the UGA Libraries' AIP directory structure (objects and metadata).
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.structure_directory(aip, configuration.AIP_STAGING)
-
-    # Extracts technical metadata from the files using FITS.
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.extract_metadata(aip)
-        a.combine_metadata(aip, configuration.AIP_STAGING)
-
-    # Converts the technical metadata into Dublin Core and PREMIS using xslt stylesheets.
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.make_cleaned_fits_xml(aip, configuration.AIP_STAGING)
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.make_preservation_xml(aip, configuration.AIP_STAGING)
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.validate_preservation_xml(aip, configuration.AIP_STAGING)
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.organize_xml(aip, configuration.AIP_STAGING)
-
-    # Bags the AIP using bagit.
-    if aip.id in os.listdir(AIPS_DIRECTORY):
-        a.make_bag(aip)
-        a.validate_bag(aip, configuration.AIP_STAGING)
-
-    # Tars the AIP and may also zip (bz2) depending on the script argument zip_method.
-    if f'{aip.id}_bag' in os.listdir(AIPS_DIRECTORY):
-        a.package(aip, configuration.AIP_STAGING)
-
-    # Adds the packaged AIP to the MD5 manifest in the aips-to-ingest folder.
-    if f'{aip.id}_bag' in os.listdir(AIPS_DIRECTORY):
-        a.manifest(aip, configuration.AIP_STAGING)
-
-print("\nScript is finished running.")
+if __name__ == '__main__':
+
+    # Verifies the script arguments are correct and calculates the associated variables.
+    # If there are errors, ends the script.
+    AIPS_DIRECTORY, AIP_TYPE, ZIP, WORKFLOW, aip_metadata_csv, argument_errors = a.check_arguments(sys.argv)
+    if len(argument_errors) > 0:
+        print('\nProblems detected with the provided script arguments:')
+        for error in argument_errors:
+            print("   * " + error)
+        sys.exit()
+
+    # Verifies all the variables from the configuration file are present, all the paths are valid,
+    # and the FITS path is in the same letter directory as AIPS_DIRECTORY.
+    # If not, ends the script.
+    configuration_errors = a.check_configuration(AIPS_DIRECTORY)
+    if len(configuration_errors) > 0:
+        print('\nProblems detected with configuration.py:')
+        for error in configuration_errors:
+            print("   * " + error)
+        sys.exit()
+
+    # Verifies the metadata csv has the expected values and returns them as a list of rows.
+    # If there are an errors, ends the script.
+    metadata_rows, metadata_errors = a.check_metadata_csv(aip_metadata_csv, AIPS_DIRECTORY)
+    if len(metadata_errors) > 0:
+        print('\nProblems detected with metadata.csv:')
+        for error in metadata_errors:
+            print("   * " + error)
+        sys.exit()
+
+    # AIP_MAX_FILES and AIP_MAX_SIZE are optional. If either is present,
+    # splits any AIP folders that are over the limits into multiple AIPs and updates the metadata.csv.
+    MAX_FILES = getattr(configuration, 'AIP_MAX_FILES', None)
+    MAX_SIZE = getattr(configuration, 'AIP_MAX_SIZE', None)
+    if MAX_FILES or MAX_SIZE:
+        metadata_rows = a.split_aips(AIPS_DIRECTORY, AIP_TYPE, aip_metadata_csv, metadata_rows, MAX_FILES, MAX_SIZE)
+
+    # Checks every AIP folder for problems that would cause an error partway through the workflow.
+    # If there are any, prints them all and skips those AIPs, leaving their folders in the AIPs directory.
+    preflight_issues = a.preflight(AIPS_DIRECTORY, AIP_TYPE, WORKFLOW, metadata_rows, MAX_FILES, MAX_SIZE)
+    if len(preflight_issues) > 0:
+        print('\nProblems detected with the AIP folders, which will be skipped (saved to preflight_issues.csv):')
+        for aip_id, issues in preflight_issues.items():
+            print(f"   * {aip_id}")
+            for issue in issues[:10]:
+                print(f"      - {issue}")
+            if len(issues) > 10:
+                print(f"      - and {len(issues) - 10} more")
+        metadata_rows = [row for row in metadata_rows if row.AIP_ID not in preflight_issues]
+
+    # If there isn't already a log from running this script on a previous batch,
+    # starts a log for tracking script success and adds a header row.
+    if not os.path.exists(os.path.join(AIPS_DIRECTORY, 'aip_log.csv')):
+        a.log("header", AIPS_DIRECTORY)
+
+    # Makes directories used to store script outputs in the AIP_STAGING directory.
+    a.make_output_directories(configuration.AIP_STAGING, AIP_TYPE)
+
+    # Starts counters for tracking the script progress.
+    # Some steps are time-consuming, so this shows the script is not stuck.
+    CURRENT_AIP = 0
+    TOTAL_AIPS = len(metadata_rows)
+
+    # Saves the log of each AIP, for the summary of the time of each step at the end.
+    aip_logs = []
+
+    # Uses the AIP functions to create an AIP for each folder in the metadata CSV.
+    # The rest of the steps are skipped for the AIP if there is an error (see make_aip()).
+    for aip_row in metadata_rows:
+
+        # Makes an instance of the AIP class using metadata from the CSV and global variables.
+        aip = a.AIP(AIPS_DIRECTORY, aip_row.Department, WORKFLOW, aip_row.Collection, aip_row.Folder, AIP_TYPE,
+                    aip_row.AIP_ID, aip_row.Title, aip_row.Rights, aip_row.Version, ZIP)
+
+        # Updates the current AIP number and prints the script progress in the terminal.
+        CURRENT_AIP += 1
+        print(f'\n>>>Processing {aip.id} ({CURRENT_AIP} of {TOTAL_AIPS}).')
+
+        # Makes the AIP, running each step until every step is done or a step has an error.
+        a.make_aip(aip, configuration.AIP_STAGING)
+        aip_logs.append(aip.log)
+
+    # Prints the time of each step for the batch, to show which steps were slow.
+    # The time of each step for each AIP is in aip_log.csv.
+    step_times = a.step_time_summary(aip_logs)
+    if len(step_times) > 0:
+        print("\nTime of each step (seconds):")
+        print(f"   {'Step':<28}{'AIPs':>6}{'Total':>10}{'Median':>10}{'90th %':>10}{'Max':>10}")
+        for step, times in step_times.items():
+            print(f"   {step:<28}{times['AIPs']:>6}{times['Total']:>10.1f}{times['Median']:>10.1f}"
+                  f"{times['P90']:>10.1f}{times['Max']:>10.1f}")
+
+    print("\nScript is finished running.")
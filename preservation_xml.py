@@ -0,0 +1,488 @@
+"""Make the preservation.xml from FITS output with Python, as an alternative to Saxon
+
+Used by transform_fits() unless PRESERVATION_XML_ENGINE is "saxon" in configuration.py, so Java is not needed.
+The FITS for each file is simplified with the same rules as fits-cleanup.xsl into a compact record,
+in parallel for large AIPs since each file is independent (map). The AIP-level lists of formats,
+creating applications, and inhibitors are then made by grouping the records with dictionaries,
+with the same rules as fits-to-preservation.xsl (reduce).
+The records can be made from each FITS file (_fits.xml), or by streaming a combined-fits.xml with iterparse.
+
+The preservation.xml is written with the same element order and indentation as Saxon,
+so the output is identical to the stylesheets. Any change to the stylesheets must also be made here.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import xml.etree.ElementTree as et
+
+FITS_NS = '{http://hul.harvard.edu/ois/xml/ns/fits/fits_output}'
+
+# The FITS information used for the preservation.xml, for one file.
+# Elements that can repeat are tuples of strings, or of (value, toolname, toolversion) when the tool is needed.
+FileRecord = namedtuple('FileRecord', 'filepath sizes md5s identities applications inhibitors')
+
+# One format identification. Tools are (toolname, toolversion), with None for a missing attribute.
+# Version and puid are None if the identity does not have one.
+# Valid and well_formed are from the filestatus of the tools that identified the format.
+Identity = namedtuple('Identity', 'format tools version puid other_ids valid well_formed')
+
+# One tool's creating application (names, versions, dates) or inhibitor (types, targets) information.
+Application = namedtuple('Application', 'names versions dates')
+Inhibitor = namedtuple('Inhibitor', 'types targets')
+
+# Number of FITS files needed to clean them in parallel, since starting the worker processes takes time.
+PARALLEL_MINIMUM = 500
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def make_preservation_xml(input_path, output_path, aip, ns, cleaned=False):
+    """Make the preservation.xml from a combined-fits.xml, or a cleaned-fits.xml if cleaned is True
+
+    Parameters:
+        input_path : path to the combined-fits.xml (or cleaned-fits.xml)
+        output_path : path for saving the preservation.xml
+        aip : instance of the AIP class, used for collection_id, department, id, rights, title, and version
+        ns : namespace for the AIP identifiers (NAMESPACE from configuration.py)
+        cleaned : True if the input has already been through fits-cleanup.xsl
+
+    Returns: none
+    """
+    write_preservation_xml(list(read_fits(input_path, cleaned)), output_path, aip, ns)
+
+
+def write_preservation_xml(records, output_path, aip, ns):
+    """Make the preservation.xml from the records for every file in the AIP
+
+    Parameters:
+        records : list of FileRecord, in the order the files should be in the filelist
+        output_path : path for saving the preservation.xml
+        aip : instance of the AIP class, used for collection_id, department, id, rights, title, and version
+        ns : namespace for the AIP identifiers (NAMESPACE from configuration.py)
+
+    Returns: none
+    """
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as output:
+        output.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                     '<preservation xmlns:dc="http://purl.org/dc/terms/"\n'
+                     '              xmlns:premis="http://www.loc.gov/premis/v3">\n')
+        uri = f'{ns}/{aip.department}'
+        write_element(output, ('dc:title', aip.title), 1)
+        write_element(output, ('dc:rights', aip.rights), 1)
+        write_element(output, ('aip', [aip_object(records, aip, uri)]), 1)
+        write_element(output, ('filelist', [file_object(record, aip, uri) for record in records]), 1)
+        output.write('</preservation>\n')
+
+
+def read_fits(path, cleaned=False):
+    """Read the FITS for each file, one at a time, so only the compact records are kept in memory
+
+    Parameters:
+        path : path to the combined-fits.xml (or cleaned-fits.xml)
+        cleaned : True if the FITS has already been through fits-cleanup.xsl
+
+    Returns: a generator of FileRecord, in the same order as the FITS
+    """
+    make_record = read_cleaned_fits if cleaned else clean_fits
+    depth = 0
+    root = None
+    for event, element in et.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = element
+            continue
+        depth -= 1
+        # Each fits element (one file) is a child of the combined-fits element.
+        if depth == 1 and element.tag == f'{FITS_NS}fits':
+            yield make_record(element)
+            root.remove(element)
+
+
+def clean_fits_file(path):
+    """Make the record for one file from its FITS output (_fits.xml)"""
+    return clean_fits(et.parse(path).getroot())
+
+
+def clean_fits_files(paths, workers=None, minimum=PARALLEL_MINIMUM):
+    """Make the records for a list of FITS output files, using a process for each CPU if there are enough files
+
+    Parameters:
+        paths : list of paths to FITS output files (_fits.xml)
+        workers : number of processes to use (default is the number of CPUs)
+        minimum : number of files needed to use more than one process
+
+    Returns: a list of FileRecord, in the same order as paths
+    """
+    if len(paths) < minimum:
+        return [clean_fits_file(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(clean_fits_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def clean_fits(fits):
+    """Make the record for one file from FITS output, simplified with the same rules as fits-cleanup.xsl"""
+    identities = []
+    for identification, statuses in _identifications(fits):
+        for identity in identification.findall(f'{FITS_NS}identity'):
+            identities.extend(_clean_identity(identity, statuses))
+
+    filepaths, sizes, md5s, applications, inhibitors = [], [], [], [], []
+    for fileinfo in fits.findall(f'{FITS_NS}fileinfo'):
+        filepaths.extend(_text(path).replace('\\', '/') for path in fileinfo.findall(f'{FITS_NS}filepath')
+                         if _text(path))
+        sizes.extend(_text(size) for size in fileinfo.findall(f'{FITS_NS}size') if _text(size))
+        md5s.extend(_tool_value(md5) for md5 in fileinfo.findall(f'{FITS_NS}md5checksum') if _text(md5))
+
+        # One creating application per tool, leaving out empty values and 0.
+        for group in _group_by_tool(fileinfo, ('created', 'creatingApplicationName', 'creatingApplicationVersion')):
+            values = {name: tuple(value for value in group[name] if value and value != '0') for name in group}
+            if any(values.values()):
+                applications.append(Application(values['creatingApplicationName'],
+                                                values['creatingApplicationVersion'], values['created']))
+
+        # One inhibitor per tool, leaving out empty values.
+        for group in _group_by_tool(fileinfo, ('inhibitorType', 'inhibitorTarget')):
+            values = {name: tuple(value for value in group[name] if value) for name in group}
+            if any(values.values()):
+                inhibitors.append(Inhibitor(values['inhibitorType'], values['inhibitorTarget']))
+
+    return FileRecord(filepaths[0] if filepaths else None, tuple(sizes), tuple(md5s), tuple(identities),
+                      tuple(applications), tuple(inhibitors))
+
+
+def read_cleaned_fits(fits):
+    """Make the record for one file from FITS output that has already been through fits-cleanup.xsl"""
+    identities = []
+    for identification, statuses in _identifications(fits):
+        for identity in identification.findall(f'{FITS_NS}identity'):
+            tools = tuple((tool.get('toolname'), tool.get('toolversion'))
+                          for tool in identity.findall(f'{FITS_NS}tool'))
+            versions = [_text(version) for version in identity.findall(f'{FITS_NS}version')]
+            identifiers = identity.findall(f'{FITS_NS}externalIdentifier')
+            puids = [_text(identifier) for identifier in identifiers if identifier.get('type') == 'puid']
+            valid, well_formed = _tool_statuses(statuses, tools, keep_empty=True)
+            identities.append(Identity(identity.get('format', ''), tools,
+                                       ' '.join(versions) if versions else None,
+                                       ' '.join(puids) if puids else None,
+                                       any(identifier.get('type') != 'puid' for identifier in identifiers),
+                                       valid, well_formed))
+
+    filepaths, sizes, md5s, applications, inhibitors = [], [], [], [], []
+    for fileinfo in fits.findall(f'{FITS_NS}fileinfo'):
+        filepaths.extend(_text(path) for path in fileinfo.findall(f'{FITS_NS}filepath'))
+        sizes.extend(_text(size) for size in fileinfo.findall(f'{FITS_NS}size'))
+        md5s.extend(_tool_value(md5) for md5 in fileinfo.findall(f'{FITS_NS}md5checksum'))
+        for application in fileinfo.findall(f'{FITS_NS}creatingApplication'):
+            applications.append(Application(*(tuple(_text(child) for child in application.findall(FITS_NS + name))
+                                              for name in ('creatingApplicationName', 'creatingApplicationVersion',
+                                                           'created'))))
+        for inhibitor in fileinfo.findall(f'{FITS_NS}inhibitor'):
+            inhibitors.append(Inhibitor(*(tuple(_text(child) for child in inhibitor.findall(FITS_NS + name))
+                                          for name in ('inhibitorType', 'inhibitorTarget'))))
+
+    return FileRecord(filepaths[0] if filepaths else None, tuple(sizes), tuple(md5s), tuple(identities),
+                      tuple(applications), tuple(inhibitors))
+
+
+def aip_object(records, aip, uri):
+    """Make the premis:object for the AIP, with the size and unique lists of formats, applications, and inhibitors"""
+    # Groups formats by name, version, and PUID. For each group, keeps the first identity
+    # and the version of the last instance of each tool that identified the format.
+    formats = {}
+    for record in records:
+        for identity in record.identities:
+            key = identity.format + (identity.version or '') + (identity.puid or '')
+            first_identity, tools = formats.setdefault(key, (identity, {}))
+            for toolname, toolversion in identity.tools:
+                if toolname is not None:
+                    tools[toolname] = toolversion
+    characteristics = [('premis:size', _format_size(size for record in records for size in record.sizes))]
+    for key in sorted(formats):
+        identity, tools = formats[key]
+        notes = [('premis:formatNote', f'Format identified by {toolname} version {tools[toolname] or ""}')
+                 for toolname in sorted(tools)]
+        characteristics.append(_format(identity, notes))
+
+    # Groups creating applications by name and version, and inhibitors by type and target, keeping the first of each.
+    applications = {}
+    for application in (application for record in records for application in record.applications):
+        applications.setdefault(' '.join(application.names) + ' '.join(application.versions), application)
+    for key in sorted(applications):
+        application = applications[key]
+        if application.names:
+            content = [('premis:creatingApplicationName', ' '.join(application.names))]
+            if application.versions:
+                content.append(('premis:creatingApplicationVersion', ' '.join(application.versions)))
+            characteristics.append(('premis:creatingApplication', content))
+    inhibitors = {}
+    for inhibitor in (inhibitor for record in records for inhibitor in record.inhibitors):
+        inhibitors.setdefault(' '.join(inhibitor.types) + ' '.join(inhibitor.targets), inhibitor)
+    for key in sorted(inhibitors):
+        if inhibitors[key].types:
+            characteristics.append(_inhibitor(inhibitors[key]))
+
+    category = 'representation' if len(records) > 1 else 'file' if len(records) == 1 else ''
+    content = [_identifier(uri, aip.id),
+               _identifier(f'{uri}/{aip.id}', str(aip.version)),
+               ('premis:objectCategory', category),
+               ('premis:objectCharacteristics', characteristics)]
+    # Web archives without a related collection use a default id, which is not included.
+    if aip.collection_id not in ('harg-0000', 'magil-0000'):
+        content.append(_relationship(uri, aip.collection_id))
+    return 'premis:object', content
+
+
+def file_object(record, aip, uri):
+    """Make the premis:object for one file in the filelist section"""
+    characteristics = []
+    for md5, toolname, toolversion in record.md5s:
+        characteristics.append(('premis:fixity', [('premis:messageDigestAlgorithm', 'MD5'),
+                                                  ('premis:messageDigest', md5),
+                                                  ('premis:messageDigestOriginator',
+                                                   f'{toolname or ""} version {toolversion or ""}')]))
+    characteristics.extend(('premis:size', size) for size in record.sizes)
+    for identity in record.identities:
+        notes = [_status_note(status, 'valid') for status in identity.valid]
+        notes.extend(_status_note(status, 'well-formed') for status in identity.well_formed)
+        notes.extend(('premis:formatNote', f'Format identified by {toolname or ""} version {toolversion or ""}')
+                     for toolname, toolversion in identity.tools)
+        characteristics.append(_format(identity, notes, file_level=True))
+    for application in record.applications:
+        if ''.join(application.names + application.versions + application.dates):
+            content = []
+            if application.names:
+                content.append(('premis:creatingApplicationName', ' '.join(application.names)))
+            if application.versions:
+                content.append(('premis:creatingApplicationVersion', ' '.join(application.versions)))
+            for date in application.dates:
+                formatted_date = format_date(date)
+                if formatted_date is not None:
+                    content.append(('premis:dateCreatedByApplication', formatted_date))
+            characteristics.append(('premis:creatingApplication', content))
+    characteristics.extend(_inhibitor(inhibitor) for inhibitor in record.inhibitors if inhibitor.types)
+
+    # The file id starts after objects for BMAC, and at the AIP id for all other departments.
+    filepath = record.filepath or ''
+    if aip.department == 'bmac':
+        file_id = ''.join(match.group(1) for match in re.finditer(r'[\\|/]objects[\\|/](.*)', filepath))
+    else:
+        file_id = ''.join(match.group(0) for match in re.finditer(f'{aip.id}.*', filepath))
+
+    return 'premis:object', [_identifier(f'{uri}/{aip.id}', file_id),
+                             ('premis:objectCategory', 'file'),
+                             ('premis:objectCharacteristics', characteristics),
+                             _relationship(uri, aip.id)]
+
+
+def format_date(date):
+    """Reformat a creating application date to YYYY-MM-DD, with the same rules as fits-to-preservation.xsl
+
+    Parameter: date (string) - the date from FITS
+    Returns: the formatted date, None if it is not a real date (e.g. 0), or a message if it is a new format
+    """
+    if date in ('0', '0000:00:00 00:00:00') or re.search('0-00-00T', date) or re.search('^:', date):
+        return None
+
+    # Year:Month:Day Time and Year-Month-Day Time, e.g. 2018:01:02 01:02:33, or with T before the time.
+    if re.search(r'^\d{4}(:|-)\d{2}(:|-)\d{2} ', date):
+        return date.split(' ', 1)[0].replace(':', '-')
+    if re.search(r'^\d{4}(:|-)\d{2}(:|-)\d{2}T', date):
+        return date.split('T', 1)[0].replace(':', '-')
+
+    # D:YYYYMMDDtime, e.g. D:20070614142347-04'00
+    if re.search(r'^D:\d{8}', date):
+        return ''.join(f'{year}-{month}-{day}' for year, month, day in re.findall(r'D:(\d{4})(\d{2})(\d{2})', date))
+
+    # Year:Month:Day, e.g. 2018:01:02
+    if re.search(r'^\d{4}(:|-)\d{2}(:|-)\d{2}', date):
+        return date.replace(':', '-')
+
+    # Day.Month.Year(,) Time with all numbers, e.g. 23.07.98, 2:28 AM
+    pattern = r'(\d{1,2})\.(\d{1,2})\.(\d{2}),? \d{1,2}:\d{1,2} (AM|PM)'
+    if re.search(pattern, date):
+        return ''.join(f'{_century(year)}-{int(month):02d}-{int(day):02d}'
+                       for day, month, year, _ in re.findall(pattern, date))
+
+    # Day Month Year Time with month spelled out, e.g. 24 September 2002 11:26:49 AM
+    if re.search(r'\d{1,2} [a-zA-Z]+ \d{4} ', date):
+        return ''.join(f'{year}-{_month(month)}-{int(day):02d}'
+                       for day, month, year in re.findall(r'(\d{1,2}) ([a-zA-Z]+) (\d{4}) ', date))
+
+    # Year Month Day - day of weekTime with month spelled out, e.g. 2003 September 22 - Monday11:10:03 AM
+    if re.search(r'\d{4} [a-zA-Z]+ \d{1,2} -', date):
+        return ''.join(f'{year}-{_month(month)}-{int(day):02d}'
+                       for year, month, day in re.findall(r'(\d{4}) ([a-zA-Z]+) (\d{1,2}) ', date))
+
+    # Month/Day/Year Time with all numbers, e.g. 12/01/99 12:01 PM
+    if re.search(r'\d{1,2}/\d{1,2}/\d{2,4}', date):
+        return ''.join(f'{year if int(year) > 999 else _century(year)}-{int(month):02d}-{int(day):02d}'
+                       for month, day, year in re.findall(r'(\d{1,2})/(\d{1,2})/(\d{2,4})', date))
+
+    # (Day of Week) Month ( )Day(,) (Time) Year with month spelled out, e.g. Wed Mar 01 11:22:33 EST 2003
+    pattern = r'([a-zA-Z]+)  ?(\d{1,2}),? [0-9:A-Z ]*(\d{4})'
+    if re.search(pattern, date):
+        return ''.join(f'{year}-{_month(month)}-{int(day):02d}' for month, day, year in re.findall(pattern, date))
+
+    # day of week, Day month Year time with month spelled out, e.g. Monday, 05 June, 2000 09:33
+    if re.search(r'[a-zA-Z]+day, \d{2} [a-zA-Z]+, \d{4} ', date):
+        return ''.join(f'{year}-{_month(month)}-{day}'
+                       for day, month, year in re.findall(r', (\d{2}) ([a-zA-Z]+), (\d{4}) ', date))
+
+    # Makes an invalid date to catch new date formats during validation.
+    return f'New Date Format Identified: "{date}" Update Stylesheet'
+
+
+def write_element(output, element, depth):
+    """Write an element as (tag, text) or (tag, list of child elements), indented the same as Saxon"""
+    tag, content = element
+    indent = '   ' * depth
+    if not content:
+        output.write(f'{indent}<{tag}/>\n')
+    elif isinstance(content, str):
+        output.write(f'{indent}<{tag}>{_escape(content)}</{tag}>\n')
+    else:
+        output.write(f'{indent}<{tag}>\n')
+        for child in content:
+            write_element(output, child, depth + 1)
+        output.write(f'{indent}</{tag}>\n')
+
+
+def _century(year):
+    """Make a two-digit year four digits, assuming the 21st century if it is less than 50"""
+    return f'20{year}' if int(year) < 50 else f'19{year}'
+
+
+def _clean_identity(identity, statuses):
+    """Make one Identity per version from a FITS identity, or one if there is no version, as fits-cleanup.xsl"""
+    # Formats without a name are left out.
+    format_name = identity.get('format')
+    if not format_name:
+        return []
+    tools = tuple((tool.get('toolname'), tool.get('toolversion')) for tool in identity.findall(f'{FITS_NS}tool')
+                  if tool.get('toolname') != '')
+    identifiers = identity.findall(f'{FITS_NS}externalIdentifier')
+    puids = [_text(identifier) for identifier in identifiers if identifier.get('type') == 'puid' and _text(identifier)]
+    puid = ' '.join(puids) if puids else None
+    valid, well_formed = _tool_statuses(statuses, tools, keep_empty=False)
+
+    # The stylesheet does not copy identifiers that are not PUIDs when there is a version.
+    versions = [_text(version) for version in identity.findall(f'{FITS_NS}version') if _text(version)]
+    if versions:
+        return [Identity(format_name, tools, version, puid, False, valid, well_formed) for version in versions]
+    other_ids = any(identifier.get('type') != 'puid' and _text(identifier) for identifier in identifiers)
+    return [Identity(format_name, tools, None, puid, other_ids, valid, well_formed)]
+
+
+def _escape(text):
+    """Escape text the same as Saxon, including character references for carriage returns and control characters"""
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return re.sub('[\r\x7f-\x9f\u2028]', lambda match: f'&#x{ord(match.group()):X};', text)
+
+
+def _format(identity, notes, file_level=False):
+    """Make a premis:format from an identity and its format notes"""
+    designation = [('premis:formatName', identity.format)]
+    if identity.version is not None:
+        designation.append(('premis:formatVersion', identity.version))
+    content = [('premis:formatDesignation', designation)]
+    if identity.puid is not None:
+        content.append(('premis:formatRegistry', [('premis:formatRegistryName',
+                                                   'https://www.nationalarchives.gov.uk/PRONOM'),
+                                                  ('premis:formatRegistryKey', identity.puid),
+                                                  ('premis:formatRegistryRole', 'specification')]))
+    # Makes invalid elements to catch a new identifier type or missing tool during validation.
+    if file_level and identity.other_ids:
+        content.append(('premis:formatRegistry', ''))
+    content.extend(notes)
+    if not identity.tools:
+        content.append(('premis:formatNote', ''))
+    return 'premis:format', content
+
+
+def _format_size(sizes):
+    """Add the file sizes and format the total as a whole number, the same as format-number(sum(),'#')"""
+    total = sum(float(size) for size in sizes)
+    if total != total:
+        return 'NaN'
+    return f'{total:.0f}'
+
+
+def _group_by_tool(fileinfo, names):
+    """Group the text of fileinfo elements with these names by toolname, in the order each tool is first found"""
+    groups = {}
+    for child in fileinfo:
+        name = child.tag.replace(FITS_NS, '')
+        if name in names and child.get('toolname') is not None:
+            group = groups.setdefault(child.get('toolname'), {group_name: [] for group_name in names})
+            group[name].append(_text(child))
+    return groups.values()
+
+
+def _identifications(fits):
+    """Get each identification element in the FITS and the filestatus elements that follow it"""
+    children = list(fits)
+    for index, child in enumerate(children):
+        if child.tag == f'{FITS_NS}identification':
+            yield child, [status for status in children[index + 1:] if status.tag == f'{FITS_NS}filestatus']
+
+
+def _identifier(identifier_type, value):
+    """Make a premis:objectIdentifier"""
+    return 'premis:objectIdentifier', [('premis:objectIdentifierType', identifier_type),
+                                       ('premis:objectIdentifierValue', value)]
+
+
+def _inhibitor(inhibitor):
+    """Make a premis:inhibitors from an inhibitor with a type"""
+    content = [('premis:inhibitorType', ' '.join(inhibitor.types))]
+    if inhibitor.targets:
+        content.append(('premis:inhibitorTarget', ' '.join(inhibitor.targets)))
+    return 'premis:inhibitors', content
+
+
+def _month(month):
+    """Convert a month name or abbreviation to a two-digit number, or an empty string if it is not a month"""
+    return ''.join(f'{number:02d}' for number, name in enumerate(MONTHS, 1) if month.startswith(name))
+
+
+def _relationship(uri, value):
+    """Make a premis:relationship for being a member of the AIP or collection"""
+    return 'premis:relationship', [('premis:relationshipType', 'structural'),
+                                   ('premis:relationshipSubType', 'Is Member Of'),
+                                   ('premis:relatedObjectIdentifier', [('premis:relatedObjectIdentifierType', uri),
+                                                                       ('premis:relatedObjectIdentifierValue',
+                                                                        value)])]
+
+
+def _status_note(status, name):
+    """Make the format note for a valid or well-formed status, or an invalid empty note if it is not true or false"""
+    value, toolname, toolversion = status
+    if value not in ('true', 'false'):
+        return 'premis:formatNote', ''
+    prefix = '' if value == 'true' else 'not '
+    return 'premis:formatNote', f'Format identified as {prefix}{name} by {toolname or ""} version {toolversion or ""}'
+
+
+def _text(element):
+    """Get the text of an element, which is empty if it is only whitespace (xsl:strip-space)"""
+    text = ''.join(element.itertext())
+    return '' if not text.strip(' \t\r\n') else text
+
+
+def _tool_statuses(statuses, tools, keep_empty):
+    """Get the valid and well-formed statuses from the tools that identified a format"""
+    toolnames = {toolname for toolname, _ in tools if toolname is not None}
+    results = []
+    for name in ('valid', 'well-formed'):
+        results.append(tuple(_tool_value(element) for status in statuses
+                             for element in status.findall(FITS_NS + name)
+                             if element.get('toolname') in toolnames and (keep_empty or _text(element))))
+    return results
+
+
+def _tool_value(element):
+    """Get the text, toolname, and toolversion of an element"""
+    return _text(element), element.get('toolname'), element.get('toolversion')
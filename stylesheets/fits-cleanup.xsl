@@ -14,6 +14,11 @@
 <!--All elements are still within the FITS namespace.-->
 
     
+    <!--If any file is identified as a WARC, used to remove incorrect HTML identifications.-->
+    <!--Calculated once instead of searching the whole document for every identity.-->
+    <xsl:variable name="has-warc" select="exists(//identity[@format='WARC'])" />
+
+
     <!--Maintains the overall document structure. Copies directly if doesn't match another template.-->
     <xsl:template match="node()|@*">
         <xsl:copy><xsl:apply-templates select="node()|@*" /></xsl:copy>
@@ -37,7 +42,7 @@
             <!--Will not make an identity element if the format is known to be incorrect (using empty when element).-->
             <xsl:choose>
 				<!--When a file is a WARC based on identity and file extension, the HTML identification is incorrect.-->
-				<xsl:when test="@format='Hypertext Markup Language' and //identity[@format='WARC'] and $extension='warc'"/>
+				<xsl:when test="@format='Hypertext Markup Language' and $has-warc and $extension='warc'"/>
 				<xsl:otherwise>
                     <xsl:call-template name="identity-reorg" />
                 </xsl:otherwise>
@@ -0,0 +1,70 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<xsl:stylesheet xmlns:xsl="http://www.w3.org/1999/XSL/Transform" version="3.0"
+    xmlns:err="http://www.w3.org/2005/xqt-errors">
+    <xsl:output method="xml" indent="yes" />
+
+<!--Purpose: make the preservation.xml from the combined-fits.xml in a single Saxon run.-->
+<!--Runs fits-cleanup.xsl and then fits-to-preservation.xsl, passing the cleaned FITS between them in memory,
+    so it does not have to be saved and read again.-->
+<!--If there is an error, the message starts with the stylesheet that had the error.-->
+
+
+<!--..................................................................................................-->
+<!--PARAMETERS-->
+<!--..................................................................................................-->
+
+    <!--Passed to fits-to-preservation.xsl. See that stylesheet for details.-->
+    <xsl:param name="collection-id" required="yes" />
+    <xsl:param name="aip-id" required="yes" />
+    <xsl:param name="aip-title" required="yes" />
+    <xsl:param name="department" required="yes" />
+    <xsl:param name="rights" required="yes" />
+    <xsl:param name="version" required="yes" />
+    <xsl:param name="ns" required="yes" />
+
+    <!--Optional: URI for saving the cleaned FITS, for example to debug fits-to-preservation.xsl.-->
+    <xsl:param name="cleaned-fits" select="''" />
+
+
+<!--..................................................................................................-->
+<!--MAIN TEMPLATE-->
+<!--..................................................................................................-->
+
+    <xsl:template match="/">
+
+        <!--Runs fits-cleanup.xsl on the combined FITS.-->
+        <xsl:variable name="cleaned" as="document-node()">
+            <xsl:try>
+                <xsl:sequence select="transform(map{'stylesheet-location': 'fits-cleanup.xsl', 'source-node': .})?output" />
+                <xsl:catch>
+                    <xsl:message terminate="yes" select="'fits-cleanup.xsl error: ' || $err:description" />
+                </xsl:catch>
+            </xsl:try>
+        </xsl:variable>
+
+        <!--Saves the cleaned FITS, if a location for it is provided.-->
+        <xsl:if test="$cleaned-fits != ''">
+            <xsl:result-document href="{$cleaned-fits}" method="xml" indent="yes">
+                <xsl:sequence select="$cleaned" />
+            </xsl:result-document>
+        </xsl:if>
+
+        <!--Runs fits-to-preservation.xsl on the cleaned FITS, which is the output of this stylesheet.-->
+        <xsl:try>
+            <xsl:sequence select="transform(map{'stylesheet-location': 'fits-to-preservation.xsl',
+                                                'source-node': $cleaned,
+                                                'stylesheet-params': map{QName('', 'collection-id'): $collection-id,
+                                                                         QName('', 'aip-id'): $aip-id,
+                                                                         QName('', 'aip-title'): $aip-title,
+                                                                         QName('', 'department'): $department,
+                                                                         QName('', 'rights'): $rights,
+                                                                         QName('', 'version'): $version,
+                                                                         QName('', 'ns'): $ns}})?output" />
+            <xsl:catch>
+                <xsl:message terminate="yes" select="'fits-to-preservation.xsl error: ' || $err:description" />
+            </xsl:catch>
+        </xsl:try>
+
+    </xsl:template>
+
+</xsl:stylesheet>
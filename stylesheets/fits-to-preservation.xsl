@@ -80,6 +80,10 @@
         </xsl:choose>
     </xsl:template>
 
+    <!--Tools indexed by the format (name, version, and PUID) they identified, used to make the aip format list.-->
+    <!--The value is the same as the grouping key in aip-unique-formats-list, so a group's tools are found without searching the whole document.-->
+    <xsl:key name="tools-by-format" match="identity/tool" use="concat(../@format,following-sibling::version,following-sibling::externalIdentifier[@type='puid'])" />
+
     <!-- File count to use in testing when aips are treated differently if they have one or multiple files.-->
 	<xsl:variable name="file-count">
 		<xsl:value-of select="count(/combined-fits/fits)"/>
@@ -161,27 +165,20 @@
                 </xsl:if>
 
                 <!--Complete list of tools that identified the format.-->
-                <!--Uses absolute path (not current group) because different files of the same format may be identified by a different set of tools.-->
-                <xsl:for-each select="//identity/tool">
-                    <xsl:sort select="@toolname"/>
-
-                    <!--Equivalent of the grouping key so can match tool to group.-->
-                    <xsl:variable name="group" select="concat(../@format,following-sibling::version,following-sibling::externalIdentifier[@type='puid'])"/>
-
-                    <!--Used to identify duplicate tools by combining the tool name with the group.-->
-                    <xsl:variable name="dedup" select="concat(@toolname,$group)"/>
-
-                    <!--Makes a format note for a tool if it matches this group and isn't a duplicate.-->
-                    <!--Avoid duplicates by taking the last instance of a tool in the xml.-->  
-                    <xsl:if test="$group=current-grouping-key() and not(following::tool[concat(@toolname,../@format,following-sibling::version,following-sibling::externalIdentifier[@type='puid'])=$dedup])">
-                        <premis:formatNote>
-                            <xsl:text>Format identified by </xsl:text>
-                            <xsl:value-of select="@toolname" />
-                            <xsl:text> version </xsl:text>
-                            <xsl:value-of select="@toolversion" />
-                        </premis:formatNote>
-                    </xsl:if>
-                </xsl:for-each>
+                <!--Uses the tools-by-format key (not current group) because different files of the same format may be identified by a different set of tools.-->
+                <!--Groups by tool name so each tool is only included once.-->
+                <xsl:for-each-group select="key('tools-by-format', current-grouping-key())" group-by="@toolname">
+                    <xsl:sort select="current-grouping-key()"/>
+
+                    <!--Makes a format note for the tool.-->
+                    <!--Avoid duplicates by taking the last instance of a tool in the xml.-->
+                    <premis:formatNote>
+                        <xsl:text>Format identified by </xsl:text>
+                        <xsl:value-of select="current-grouping-key()" />
+                        <xsl:text> version </xsl:text>
+                        <xsl:value-of select="current-group()[last()]/@toolversion" />
+                    </premis:formatNote>
+                </xsl:for-each-group>
 
                 <!--Makes an invalid element to catch missing required information during validation.-->
                 <xsl:if test="not(tool)"><premis:formatNote /></xsl:if>
@@ -0,0 +1 @@
+FILE "Reel1-dpx.wav" WAVE
@@ -15,16 +15,16 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for a metadata.csv with the correct information"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'correct_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
-        # Verifies the df has the expected contents.
-        # Only checking the returned df when there are no errors, since any error will quit the script.
-        df_list = [metadata_df.columns.tolist()] + metadata_df.values.tolist()
+        # Verifies the rows have the expected contents.
+        # Only checking the returned rows when there are no errors, since any error will quit the script.
+        rows_list = [list(metadata_rows[0]._fields)] + [list(row) for row in metadata_rows]
         expected = [['Department', 'Collection', 'Folder', 'AIP_ID', 'Title', 'Rights', 'Version'],
                     ['test', 't-coll', 'aip-1', 'aip1', 'title-1', 'http://rightsstatements.org/vocab/InC/1.0/', '1'],
                     ['test', 't-coll', 'aip-2', 'aip2', 'title-2', 'http://rightsstatements.org/vocab/InC/1.0/', '1'],
                     ['test', 't-coll', 'aip-3', 'aip3', 'title-3', 'http://rightsstatements.org/vocab/InC/1.0/', '1']]
-        self.assertEqual(expected, df_list, "Problem with test for correct, df")
+        self.assertEqual(expected, rows_list, "Problem with test for correct, rows")
 
         # Verifies the errors list has the expected values.
         expected = []
@@ -34,7 +34,7 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for the column names in metadata.csv not matching the expected values"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_columns_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['The columns in the metadata.csv do not match the required values or order.',
@@ -47,7 +47,7 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for AIP folders that are only in the metadata.csv and not in the AIPs directory"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_csv_only_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['Folder(s) in metadata csv but not in aips_directory: aip-4.']
@@ -57,17 +57,27 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for AIP folders that are only in the AIPs directory and not the metadata.csv"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_directory_only_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['Folder(s) in aips_directory but not in metadata_csv: aip-1, aip-3.']
         self.assertEqual(expected, metadata_errors, "Problem with test for error_directory_only, errors list")
 
+    def test_error_folders_not_checked(self):
+        """Test for AIP folders that do not match the metadata.csv when folders are not checked (watch mode)"""
+        # Makes the variable needed for function parameters and runs the function.
+        aip_metadata_csv = os.path.join('check_metadata_csv', 'error_csv_only_metadata.csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv', check_folders=False)
+
+        # Verifies the rows and errors list have the expected values.
+        self.assertEqual(4, len(metadata_rows), "Problem with test for error_folders_not_checked, rows")
+        self.assertEqual([], metadata_errors, "Problem with test for error_folders_not_checked, errors list")
+
     def test_error_duplicate_folders(self):
         """Test for AIPs that are in the metadata.csv more than once"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_duplicate_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['Duplicate folder(s): aip-1, aip-2, aip-3.']
@@ -77,7 +87,7 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for departments in the metadata.csv which are not ARCHive groups (from the configuration file)"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_group_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['banana is not an ARCHive group.', 'Brown is not an ARCHive group.']
@@ -87,7 +97,7 @@ class TestCheckMetadataCSV(unittest.TestCase):
         """Test for rights in the metadata.csv that are not Creative Commons or RightsStatements.org"""
         # Makes the variable needed for function parameters and runs the function.
         aip_metadata_csv = os.path.join('check_metadata_csv', 'error_rights_metadata.csv')
-        metadata_df, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
+        metadata_rows, metadata_errors = check_metadata_csv(aip_metadata_csv, 'check_metadata_csv')
 
         # Verifies the errors list has the expected values.
         expected = ['InC is not Creative Commons or RightsStatement.org.',
@@ -0,0 +1,57 @@
+"""Testing for the function dpx_sample, which takes an AIP class instance, the folder FITS would run on,
+and the sample size as input and chooses a sample of frames from each DPX frame sequence for FITS."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, dpx_sample
+from test_script import make_directory_list
+
+
+class TestDpxSample(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP, which has a sequence of 10 frames, a sequence of 1 frame,
+        a DPX without a complete header, a text file in the DPX folder, and a cue file"""
+        self.aips_dir = os.path.join(os.getcwd(), 'dpx_sample')
+        shutil.copytree(os.path.join(self.aips_dir, 'aip-dpx_copy'), os.path.join(self.aips_dir, 'aip-dpx'))
+        self.aip = AIP(self.aips_dir, 'bmac', 'dpx', 'coll-1', 'folder', 'av', 'aip-dpx', 'title', 'InC', 1, True)
+        self.objects = os.path.join(self.aips_dir, 'aip-dpx', 'objects')
+        self.scan = os.path.join(self.objects, 'Reel1-dpx', 'Scan')
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        shutil.rmtree(os.path.join(self.aips_dir, 'aip-dpx'))
+
+    def test_sample(self):
+        """Test for a sample of 3 frames, which is smaller than one sequence"""
+        fits_input, derived = dpx_sample(self.aip, self.objects, 3)
+
+        # Test for the FITS input, which has the sample frames and the files that are not in a sequence.
+        expected = os.path.join(self.aips_dir, 'aip-dpx', 'fits-input')
+        self.assertEqual(expected, fits_input, "Problem with sample, fits_input")
+        result = make_directory_list(fits_input)
+        scan = os.path.join(fits_input, 'Reel1-dpx', 'Scan')
+        expected = [os.path.join(fits_input, 'Reel1-dpx'), scan, os.path.join(scan, 'Notes.txt'),
+                    os.path.join(scan, 'Reel1_0001.dpx'), os.path.join(scan, 'Reel1_0005.dpx'),
+                    os.path.join(scan, 'Reel1_0010.dpx'), os.path.join(scan, 'Reel1_0011.dpx'),
+                    os.path.join(scan, 'Reel1_0012.dpx'), os.path.join(fits_input, 'Reel1.cue')]
+        self.assertEqual(expected, result, "Problem with sample, fits-input folder")
+
+        # Test for the frames that use the sample, which use the sample frame before them.
+        frame = lambda number: os.path.join(self.scan, f'Reel1_{number:04d}.dpx')
+        expected = [(frame(2), frame(1)), (frame(3), frame(1)), (frame(4), frame(1)), (frame(6), frame(5)),
+                    (frame(7), frame(5)), (frame(8), frame(5)), (frame(9), frame(5))]
+        self.assertEqual(expected, derived, "Problem with sample, derived")
+
+    def test_sample_all(self):
+        """Test for a sample that is as big as the sequences, so FITS runs on everything"""
+        fits_input, derived = dpx_sample(self.aip, self.objects, 10)
+        self.assertEqual(self.objects, fits_input, "Problem with sample all, fits_input")
+        self.assertEqual([], derived, "Problem with sample all, derived")
+        self.assertEqual(False, os.path.exists(os.path.join(self.aips_dir, 'aip-dpx', 'fits-input')),
+                         "Problem with sample all, fits-input folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Testing for the function event, which takes an AIP instance, an event type, and details
+and adds a line to the JSON lines file of events for the AIP (aip.events), if there is one."""
+
+import json
+import os
+import unittest
+from aip_functions import AIP, event
+
+
+class TestEvent(unittest.TestCase):
+
+    def setUp(self):
+        """Makes an AIP instance, which is used in each test"""
+        self.aip = AIP(os.getcwd(), 'dept', None, 'coll-1', 'aip-folder', 'general', 'aip-1', 'title', 'InC', 1,
+                       to_zip=False)
+
+    def tearDown(self):
+        """Deletes the events file, if present"""
+        if os.path.exists('aip_events.jsonl'):
+            os.remove('aip_events.jsonl')
+
+    def test_events(self):
+        """Test for adding two events to the events file"""
+        self.aip.events = os.path.join(os.getcwd(), 'aip_events.jsonl')
+        event(self.aip, 'step_start', step='FITS')
+        event(self.aip, 'step_end', step='FITS', seconds=1.5, success=True, error=None)
+
+        # Test for the events file contents. The time varies, so it is only tested that it is present.
+        with open('aip_events.jsonl', encoding='utf-8') as events_file:
+            result = [json.loads(line) for line in events_file]
+        for line in result:
+            line['time'] = 'time' if line['time'] else 'no time'
+        expected = [{'time': 'time', 'aip': 'aip-1', 'event': 'step_start', 'step': 'FITS'},
+                    {'time': 'time', 'aip': 'aip-1', 'event': 'step_end', 'step': 'FITS', 'seconds': 1.5,
+                     'success': True, 'error': None}]
+        self.assertEqual(expected, result, "Problem with events")
+
+    def test_no_events_file(self):
+        """Test for an AIP without an events file, when a step is run on its own, so nothing is saved"""
+        event(self.aip, 'step_start', step='FITS')
+        self.assertFalse(os.path.exists('aip_events.jsonl'), "Problem with no events file")
+
+
+if __name__ == "__main__":
+    unittest.main()
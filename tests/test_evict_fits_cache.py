@@ -0,0 +1,68 @@
+"""Testing for the function evict_fits_cache, which takes the path to the FITS cache, the size of output added to it,
+and the size limit, and deletes the least recently used FITS output if the cache is over the limit."""
+
+import os
+import shutil
+import unittest
+import aip_functions
+from aip_functions import evict_fits_cache
+from test_script import make_directory_list
+
+
+class TestEvictFitsCache(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a FITS cache with three 100 byte files, from least to most recently used"""
+        self.cache_root = os.path.join(os.getcwd(), 'evict_fits_cache')
+        os.makedirs(os.path.join(self.cache_root, 'fits-key'))
+        for number in range(1, 4):
+            self.add_file(f'{number}_fits.xml', number)
+
+    def tearDown(self):
+        """Deletes the test cache and its saved size"""
+        shutil.rmtree(self.cache_root)
+        aip_functions.FITS_CACHE_SIZES.pop(self.cache_root, None)
+
+    def add_file(self, name, last_used):
+        """Makes a 100 byte file in the cache with the date modified (last used) in seconds"""
+        path = os.path.join(self.cache_root, 'fits-key', name)
+        with open(path, 'w') as new_file:
+            new_file.write('x' * 100)
+        os.utime(path, (last_used, last_used))
+
+    def test_under_limit(self):
+        """Test for a cache under the limit, where nothing is deleted and the size is saved"""
+        evict_fits_cache(self.cache_root, 0, 300)
+
+        result = [len(make_directory_list(self.cache_root)), aip_functions.FITS_CACHE_SIZES[self.cache_root]]
+        self.assertEqual([4, 300], result, "Problem with under limit")
+
+    def test_over_limit(self):
+        """Test for a cache over the limit, where the oldest output is deleted until it is 90% of the limit"""
+        evict_fits_cache(self.cache_root, 0, 250)
+
+        result = [make_directory_list(self.cache_root), aip_functions.FITS_CACHE_SIZES[self.cache_root]]
+        expected = [[os.path.join(self.cache_root, 'fits-key'),
+                     os.path.join(self.cache_root, 'fits-key', '2_fits.xml'),
+                     os.path.join(self.cache_root, 'fits-key', '3_fits.xml')], 200]
+        self.assertEqual(expected, result, "Problem with over limit")
+
+    def test_saved_size(self):
+        """Test for a cache with a saved size, which is not scanned again until the added output is over the limit"""
+        evict_fits_cache(self.cache_root, 0, 400)
+
+        # Output added by another program is not counted, so the cache is not scanned.
+        self.add_file('4_fits.xml', 4)
+        self.add_file('5_fits.xml', 5)
+        evict_fits_cache(self.cache_root, 50, 400)
+        result = [len(make_directory_list(self.cache_root)), aip_functions.FITS_CACHE_SIZES[self.cache_root]]
+        self.assertEqual([6, 350], result, "Problem with saved size, under limit")
+
+        # Once the added output is over the limit, the cache is scanned and the oldest are deleted.
+        evict_fits_cache(self.cache_root, 100, 400)
+        result = [len(make_directory_list(self.cache_root)), aip_functions.FITS_CACHE_SIZES[self.cache_root]]
+        self.assertEqual([4, 300], result, "Problem with saved size, over limit")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Testing for the function find_ready_aips, which takes the AIPs directory, metadata rows, the folders being watched,
+and the quiet period as input, and returns the rows for the folders that are done being copied (watch mode)."""
+
+import os
+import shutil
+import time
+import unittest
+from aip_functions import MetadataRow, find_ready_aips
+
+
+def make_row(folder):
+    """Make a MetadataRow for a test AIP, named with the folder"""
+    return MetadataRow('test', 'test-001', folder, f'test-001-er-{folder}', 'Title',
+                       'http://rightsstatements.org/vocab/InC/1.0/', '1')
+
+
+class TestFindReadyAips(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIPs directory and the rows for its folders and one folder that is not there yet"""
+        self.aips_dir = os.path.join(os.getcwd(), 'find_ready_aips', 'aips')
+        shutil.copytree(os.path.join(os.getcwd(), 'find_ready_aips', 'aips_copy'), self.aips_dir)
+        self.md_rows = [make_row('FD001'), make_row('FD002'), make_row('FD003')]
+
+    def tearDown(self):
+        """Deletes the copy of the test AIPs directory"""
+        if os.path.exists(self.aips_dir):
+            shutil.rmtree(self.aips_dir)
+
+    def test_quiet_period(self):
+        """Test for folders that have not changed for the quiet period, which are ready"""
+        watched = {}
+        ready = find_ready_aips(self.aips_dir, self.md_rows, watched, 0)
+
+        self.assertEqual(self.md_rows[:2], ready, "Problem with quiet period, ready")
+        self.assertEqual(['FD001', 'FD002'], sorted(watched), "Problem with quiet period, watched")
+
+    def test_first_check(self):
+        """Test for folders checked for the first time, which are not ready until the quiet period has passed"""
+        result = find_ready_aips(self.aips_dir, self.md_rows, {}, 600)
+        self.assertEqual([], result, "Problem with first check")
+
+    def test_complete_file(self):
+        """Test for a folder with a .complete file, which is ready without waiting for the quiet period"""
+        open(os.path.join(self.aips_dir, 'FD002.complete'), 'w').close()
+        result = find_ready_aips(self.aips_dir, self.md_rows, {}, 600)
+        self.assertEqual([self.md_rows[1]], result, "Problem with complete file")
+
+    def test_change(self):
+        """Test for folders that were unchanged for the quiet period, where one changes before the next check"""
+        watched = {}
+        find_ready_aips(self.aips_dir, self.md_rows, watched, 60)
+        for folder, (aip, last_change) in watched.items():
+            watched[folder] = (aip, time.time() - 120)
+        with open(os.path.join(self.aips_dir, 'FD001', 'new.txt'), 'w') as new_file:
+            new_file.write('Still copying')
+
+        result = find_ready_aips(self.aips_dir, self.md_rows, watched, 60)
+        self.assertEqual([self.md_rows[1]], result, "Problem with change")
+
+    def test_empty(self):
+        """Test for an empty folder, which is not ready even if it has a .complete file"""
+        os.mkdir(os.path.join(self.aips_dir, 'FD003'))
+        open(os.path.join(self.aips_dir, 'FD003.complete'), 'w').close()
+        result = find_ready_aips(self.aips_dir, [self.md_rows[2]], {}, 0)
+        self.assertEqual([], result, "Problem with empty")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Testing for the functions read_fits_cache and update_fits_cache, which take an AIP class instance as input
+and reuse FITS output from the FITS cache for files with the same content (MD5).
+The tests use a cache that is already populated, so FITS is not needed."""
+
+import json
+import os
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+from aip_functions import AIP, read_fits_cache, scan_aip, update_fits_cache
+from test_script import make_directory_list
+
+
+class TestFitsCache(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copies of the test AIPs"""
+        for aip_id in ('aip-hits', 'aip-mixed', 'empty-cache'):
+            aip_path = os.path.join(os.getcwd(), 'fits_cache', aip_id)
+            if os.path.exists(aip_path):
+                shutil.rmtree(aip_path)
+        if os.path.exists(os.path.join(os.getcwd(), 'fits_cache', 'aip_events.jsonl')):
+            os.remove(os.path.join(os.getcwd(), 'fits_cache', 'aip_events.jsonl'))
+
+    def test_read_all_cached(self):
+        """Test for an AIP where every file is in the cache, so FITS does not need to run"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-hits_copy'), os.path.join(aips_dir, 'aip-hits'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-hits', 'title', 'InC', 1, True)
+        cache_path = os.path.join(aips_dir, 'cache', 'fits-key')
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+
+        # Test for the FITS input (None, since FITS should not run).
+        self.assertEqual(None, fits_input, "Problem with read all cached, fits_input")
+
+        # Test for the cached files.
+        cached_fits = os.path.join(cache_path, 'dfee14c3ca5a537621c67ffba86333b7_fits.xml')
+        objects = os.path.join(aips_dir, 'aip-hits', 'objects')
+        expected = [(os.path.join(objects, 'Folder', 'Text.txt'), cached_fits),
+                    (os.path.join(objects, 'Text.txt'), cached_fits)]
+        self.assertEqual(expected, sorted(cached_files), "Problem with read all cached, cached_files")
+
+    def test_read_some_cached(self):
+        """Test for an AIP where some files are in the cache, so the rest are linked into fits-input"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-mixed_copy'), os.path.join(aips_dir, 'aip-mixed'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-mixed', 'title', 'InC', 1, True)
+        cache_path = os.path.join(aips_dir, 'cache', 'fits-key')
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+
+        # Test for the FITS input folder, which should only have the file not in the cache.
+        expected = os.path.join(aips_dir, 'aip-mixed', 'fits-input')
+        self.assertEqual(expected, fits_input, "Problem with read some cached, fits_input")
+        result = make_directory_list(fits_input)
+        self.assertEqual([os.path.join(fits_input, 'New.csv')], result, "Problem with read some cached, fits-input")
+
+        # Test for the cached files.
+        expected = [(os.path.join(aips_dir, 'aip-mixed', 'objects', 'Text.txt'),
+                     os.path.join(cache_path, 'dfee14c3ca5a537621c67ffba86333b7_fits.xml'))]
+        self.assertEqual(expected, cached_files, "Problem with read some cached, cached_files")
+
+    def test_read_empty_cache(self):
+        """Test for an empty cache folder, where FITS runs on the objects folder without getting any MD5"""
+        # Makes the test input and runs the function.
+        # The bag MD5 is not for the file, so the test fails if the function uses it.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-hits_copy'), os.path.join(aips_dir, 'aip-hits'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-hits', 'title', 'InC', 1, True)
+        cache_path = os.path.join(aips_dir, 'empty-cache')
+        os.mkdir(cache_path)
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+
+        # Test for the FITS input and cached files.
+        result = [fits_input, cached_files]
+        expected = [os.path.join(aips_dir, 'aip-hits', 'objects'), []]
+        self.assertEqual(expected, result, "Problem with read empty cache")
+
+    def test_read_known_md5(self):
+        """Test for files with a known MD5, which is used instead of reading the file"""
+        # Makes the test input and runs the function.
+        # The known MD5 of New.csv is the MD5 of Text.txt, so it only matches the cache if the known MD5 is used.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-mixed_copy'), os.path.join(aips_dir, 'aip-mixed'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-mixed', 'title', 'InC', 1, True)
+        scan_aip(aip, os.path.join(aips_dir, 'aip-mixed'))
+        aip.bag_md5s[aip.inventory[os.path.join('objects', 'New.csv')]] = 'dfee14c3ca5a537621c67ffba86333b7'
+        cache_path = os.path.join(aips_dir, 'cache', 'fits-key')
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+
+        # Test for the FITS input (None, since FITS should not run) and the cached files.
+        objects = os.path.join(aips_dir, 'aip-mixed', 'objects')
+        cached_fits = os.path.join(cache_path, 'dfee14c3ca5a537621c67ffba86333b7_fits.xml')
+        result = [fits_input, cached_files]
+        expected = [None, [(os.path.join(objects, 'New.csv'), cached_fits), (os.path.join(objects, 'Text.txt'), cached_fits)]]
+        self.assertEqual(expected, result, "Problem with read known md5")
+
+    def test_update_all_cached(self):
+        """Test for saving the cached FITS output to the metadata folder, including files with the same name"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-hits_copy'), os.path.join(aips_dir, 'aip-hits'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-hits', 'title', 'InC', 1, True)
+        cache_path = os.path.join(aips_dir, 'cache', 'fits-key')
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+        update_fits_cache(aip, cache_path, sorted(cached_files))
+
+        # Test for the contents of the metadata folder.
+        metadata = os.path.join(aips_dir, 'aip-hits', 'metadata')
+        result = make_directory_list(metadata)
+        expected = [os.path.join(metadata, 'Text.txt-1_fits.xml'), os.path.join(metadata, 'Text.txt_fits.xml')]
+        self.assertEqual(expected, result, "Problem with update all cached, metadata folder")
+
+        # Test for the file path in the FITS output, which is updated for the file in this AIP.
+        ns = {'fits': 'http://hul.harvard.edu/ois/xml/ns/fits/fits_output'}
+        result = []
+        for fits_xml in ('Text.txt_fits.xml', 'Text.txt-1_fits.xml'):
+            root = ET.parse(os.path.join(metadata, fits_xml)).getroot()
+            result.append(root.find('fits:fileinfo/fits:filepath', ns).text)
+        expected = [os.path.join(aips_dir, 'aip-hits', 'objects', 'Folder', 'Text.txt'),
+                    os.path.join(aips_dir, 'aip-hits', 'objects', 'Text.txt')]
+        self.assertEqual(expected, result, "Problem with update all cached, filepath")
+
+    def test_update_event(self):
+        """Test for the event with how much the cache was used, which is saved for each AIP"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'fits_cache')
+        shutil.copytree(os.path.join(aips_dir, 'aip-hits_copy'), os.path.join(aips_dir, 'aip-hits'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-hits', 'title', 'InC', 1, True)
+        aip.events = os.path.join(aips_dir, 'aip_events.jsonl')
+        cache_path = os.path.join(aips_dir, 'cache', 'fits-key')
+        fits_input, cached_files = read_fits_cache(aip, cache_path)
+        update_fits_cache(aip, cache_path, cached_files)
+
+        # Test for the event, without the time it was saved.
+        with open(aip.events) as events:
+            result = [json.loads(line) for line in events]
+        for event in result:
+            del event['time']
+        expected = [{'aip': 'aip-hits', 'event': 'fits_cache', 'files': 2, 'cached_files': 2, 'hit_rate': 1.0,
+                     'saved_seconds': 0.194}]
+        self.assertEqual(expected, result, "Problem with update event")
+
+
+if __name__ == "__main__":
+    unittest.main()
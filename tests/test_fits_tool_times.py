@@ -0,0 +1,41 @@
+"""Testing for the function fits_tool_times, which takes an AIP class instance and the FITS profile name as input
+and saves the time each FITS tool took to fits_tool_times.csv.
+The tests use FITS output that is already made, so FITS is not needed."""
+
+import os
+import pandas as pd
+import unittest
+from aip_functions import AIP, fits_tool_times
+
+
+class TestFitsToolTimes(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the tool times CSV, if made"""
+        times_csv = os.path.join(os.getcwd(), 'fits_tool_times', 'fits_tool_times.csv')
+        if os.path.exists(times_csv):
+            os.remove(times_csv)
+
+    def test_tool_times(self):
+        """Test for an AIP with two FITS files, one with a tool that did not run, and a file that is not FITS"""
+        # Makes the test input and runs the function twice, to test the header is only added once.
+        aips_dir = os.path.join(os.getcwd(), 'fits_tool_times')
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-times', 'title', 'InC', 1, True)
+        fits_tool_times(aip, 'general')
+        fits_tool_times(aip, 'web')
+
+        # Test for the contents of the CSV.
+        df = pd.read_csv(os.path.join(aips_dir, 'fits_tool_times.csv'), dtype=str)
+        result = [df.columns.to_list()] + df.values.tolist()
+        expected = [['AIP_ID', 'FITS_Profile', 'Tool', 'Files', 'Seconds'],
+                    ['aip-times', 'general', 'Droid', '2', '0.042'],
+                    ['aip-times', 'general', 'Jhove', '2', '1.398'],
+                    ['aip-times', 'general', 'OIS File Information', '2', '0.04'],
+                    ['aip-times', 'web', 'Droid', '2', '0.042'],
+                    ['aip-times', 'web', 'Jhove', '2', '1.398'],
+                    ['aip-times', 'web', 'OIS File Information', '2', '0.04']]
+        self.assertEqual(expected, result, "Problem with tool times")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""Testing for the function forget_listing, which takes an AIP class instance and the path to a folder as input
+and removes the saved listing of the folder, so the next scan_aip lists it again."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, forget_listing, scan_aip
+
+
+class TestForgetListing(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP (from the scan_aip test) and the AIP instance"""
+        self.aips_dir = os.path.join(os.getcwd(), 'scan_aip')
+        self.aip_path = os.path.join(self.aips_dir, 'aip-id')
+        shutil.copytree(os.path.join(self.aips_dir, 'aip-id_copy'), self.aip_path)
+        self.aip = AIP(self.aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-id', 'title', 'InC', 1, True)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        if os.path.exists(self.aip_path):
+            shutil.rmtree(self.aip_path)
+
+    def rewrite(self):
+        """Rewrites the file in the metadata folder in place with a different size,
+        keeping the folder date modified the same (old enough that the saved listing can be used)"""
+        metadata = os.path.join(self.aip_path, 'metadata')
+        os.utime(metadata, ns=(0, 0))
+        scan_aip(self.aip, self.aip_path)
+        with open(os.path.join(metadata, 'aip-id_files.csv'), 'w') as files_csv:
+            files_csv.write('Rewritten with more text')
+        os.utime(metadata, ns=(0, 0))
+        return metadata
+
+    def test_forget(self):
+        """Test for a folder with a rewritten file, which has the new size after the listing is forgotten"""
+        metadata = self.rewrite()
+        forget_listing(self.aip, metadata)
+        scan_aip(self.aip, self.aip_path)
+
+        result = self.aip.inventory[os.path.join('metadata', 'aip-id_files.csv')].size
+        self.assertEqual(24, result, "Problem with forget")
+
+    def test_not_forgotten(self):
+        """Test for a folder with a rewritten file, which still has the old size if the listing is not forgotten"""
+        self.rewrite()
+        scan_aip(self.aip, self.aip_path)
+
+        result = self.aip.inventory[os.path.join('metadata', 'aip-id_files.csv')].size
+        self.assertEqual(9, result, "Problem with not forgotten")
+
+    def test_missing_folder(self):
+        """Test for a folder that is not there, for example because the AIP is bagged, which does nothing"""
+        scan_aip(self.aip, self.aip_path)
+        listings = dict(self.aip.folder_listings)
+        forget_listing(self.aip, os.path.join(self.aip_path, 'data', 'metadata'))
+
+        self.assertEqual(listings, self.aip.folder_listings, "Problem with missing folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Testing for the function hash_objects, which takes the path to the objects folder and the checksums as input
+and returns the checksums of every file, saved by the FileInfo of the file."""
+
+import hashlib
+import os
+import shutil
+import unittest
+from aip_functions import AIP, hash_objects, scan_aip
+
+
+class TestHashObjects(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP (using the content of the bag from the read_bag_manifest test)"""
+        self.aip_path = os.path.join(os.getcwd(), 'read_bag_manifest', 'aip-hash')
+        self.objects = os.path.join(self.aip_path, 'objects')
+        shutil.copytree(os.path.join(os.getcwd(), 'read_bag_manifest', 'aip-bag_copy', 'data'), self.objects)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        if os.path.exists(self.aip_path):
+            shutil.rmtree(self.aip_path)
+
+    def test_checksums(self):
+        """Test for the checksums of every file, which match the FileInfo in the inventory of the AIP folder"""
+        object_checksums = hash_objects(self.objects, ['md5', 'sha256'])
+
+        # The FileInfo is the same as in the inventory, so make_bag() can match the files.
+        aip = AIP(os.getcwd(), 'dept', None, 'coll-1', 'folder', 'general', 'aip-hash', 'title', 'InC', 1, True)
+        scan_aip(aip, self.aip_path)
+        result = sorted((path, object_checksums[file_info]) for path, file_info in aip.inventory.items())
+        expected = []
+        for path in sorted(aip.inventory):
+            with open(os.path.join(self.aip_path, path), 'rb') as open_file:
+                content = open_file.read()
+            expected.append((path, {'md5': hashlib.md5(content).hexdigest(),
+                                    'sha256': hashlib.sha256(content).hexdigest()}))
+        self.assertEqual(expected, result, "Problem with checksums")
+
+    def test_known_md5s(self):
+        """Test for files with a known MD5 from a bag that was already made, which are only read for the other checksums"""
+        known_md5s = {file_info: checksums['md5'] for file_info, checksums in hash_objects(self.objects, ['md5']).items()}
+
+        # If the bag only has MD5, no files are read.
+        result = hash_objects(self.objects, ['md5'], known_md5s)
+        self.assertEqual({}, result, "Problem with known md5s, md5")
+
+        # If the bag also has SHA256, only the SHA256 is calculated.
+        object_checksums = hash_objects(self.objects, ['md5', 'sha256'], known_md5s)
+        result = [sorted(object_checksums) == sorted(known_md5s),
+                  all(list(checksums) == ['sha256'] for checksums in object_checksums.values())]
+        self.assertEqual([True, True], result, "Problem with known md5s, md5 and sha256")
+
+    def test_missing(self):
+        """Test for an objects folder that is not there, for example because the AIP was moved to an error folder"""
+        result = hash_objects(os.path.join(self.aip_path, 'missing'), ['md5'])
+        self.assertEqual({}, result, "Problem with missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
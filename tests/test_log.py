@@ -4,8 +4,10 @@ and adds a row to the aip log with the information.
 These tests are for if information is written to a CSV correctly.
 Tests for functions with error handling include testing if the correct information is saved to the log."""
 
+import csv
 from datetime import date
 import os
+import time
 import unittest
 from aip_functions import AIP, log
 from test_script import make_aip_log_list
@@ -91,6 +93,84 @@ class TestLog(unittest.TestCase):
                      'Success']]
         self.assertEqual(expected, result, "Problem with multiple aips")
 
+    def test_step_times(self):
+        """Test for the columns with the time of each step, the size, and the throughput"""
+        # Creates the log and adds values for an AIP that had an error during the Bag step,
+        # which is still running when the log is saved.
+        aips_dir = os.getcwd()
+        log('header', aips_dir)
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'aip-folder', 'general', 'aip-1', 'title', 'InC', 1, to_zip=False)
+        aip.log['StepTimes'] = {'Delete_Temp': 0.5, 'Structure': 1, 'FITS': 4, 'Combine_FITS': 0.25,
+                                'PreservationXML': 2, 'PreservationXML_Validation': 1.5, 'Organize_XML': 0.125}
+        aip.log['StepStart'] = ('Bag', time.perf_counter())
+        aip.log['Files'] = 10
+        aip.log['Bytes'] = 3000000
+        aip.log['Complete'] = 'Error during processing'
+        log(aip.log, aips_dir)
+
+        # Test for the log contents, which are read with csv since make_aip_log_list() removes these columns.
+        # The time of the Bag step is when the log was saved, so it is only tested that it is a number.
+        with open('aip_log.csv', newline='') as log_file:
+            rows = list(csv.reader(log_file))
+        result = [rows[0][14:31], rows[1][14:31]]
+        result[1][7] = float(result[1][7]) >= 0
+        expected = [['Delete_Temp_Seconds', 'Structure_Seconds', 'FITS_Seconds', 'Combine_FITS_Seconds',
+                     'PreservationXML_Seconds', 'PreservationXML_Validation_Seconds', 'Organize_XML_Seconds',
+                     'Bag_Seconds', 'Bag_Validation_Seconds', 'Package_Seconds', 'Manifest_Seconds', 'Files', 'Bytes',
+                     'FITS_Files_per_Second', 'Bag_MB_per_Second', 'Bag_Validation_MB_per_Second',
+                     'Package_MB_per_Second'],
+                    ['0.50', '1.00', '4.00', '0.25', '2.00', '1.50', '0.12', True, '', '', '', '10', '3000000',
+                     '2.50', rows[1][28], '', '']]
+        self.assertEqual(expected, result, "Problem with step times")
+
+    def test_old_header(self):
+        """Test for adding to a log started by a version of the script without the columns for the step times"""
+        # Makes a log with the header and one row from the version without the columns for the step times.
+        aips_dir = os.getcwd()
+        with open('aip_log.csv', 'w', newline='') as log_file:
+            log_writer = csv.writer(log_file)
+            log_writer.writerow(self.header)
+            log_writer.writerow(['2022-10-31 13:14:15.123456', 'aip-0', 'No', 'Success', 'Success', 'No', 'Success',
+                                 'Success', 'Valid on 2022-10-31 13:14:15.123456', 'Success',
+                                 'Valid on 2022-10-13 14:15:16.789123', 'Success', 'Success', 'Success'])
+
+        # Adds values for an AIP.
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'aip-folder', 'general', 'aip-1', 'title', 'InC', 1, to_zip=False)
+        aip.log['Deletions'] = 'No'
+        aip.log['ObjectsError'] = 'Objects folder already exists in original files'
+        aip.log['Complete'] = 'Error during processing'
+        aip.log['StepTimes'] = {'Delete_Temp': 0.5}
+        log(aip.log, aips_dir)
+
+        # Test for the log contents.
+        with open('aip_log.csv', newline='') as log_file:
+            rows = list(csv.reader(log_file))
+        result = [len(row) for row in rows] + [rows[0][14], rows[2][14]]
+        expected = [47, 14, 47, 'Delete_Temp_Seconds', '0.50']
+        self.assertEqual(expected, result, "Problem with old header")
+
+    def test_tool_usage(self):
+        """Test for the columns with the resource usage of the external tools"""
+        # Creates the log and adds values for an AIP that ran FITS and Saxon twice.
+        aips_dir = os.getcwd()
+        log('header', aips_dir)
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'aip-folder', 'general', 'aip-1', 'title', 'InC', 1, to_zip=False)
+        aip.log['ToolUsage'] = {'fits': {'CPU': 12.345, 'RSS': 1024.06, 'Read': 2000, 'Write': 300},
+                                'saxon': {'CPU': 3.5, 'RSS': 256.0, 'Read': 10, 'Write': 20}}
+        aip.log['Complete'] = 'Error during processing'
+        log(aip.log, aips_dir)
+
+        # Test for the log contents, which are read with csv since make_aip_log_list() removes these columns.
+        with open('aip_log.csv', newline='') as log_file:
+            rows = list(csv.reader(log_file))
+        result = [rows[0][31:], rows[1][31:]]
+        expected = [['FITS_CPU_Seconds', 'FITS_Peak_RSS_MB', 'Saxon_CPU_Seconds', 'Saxon_Peak_RSS_MB',
+                     'Xmllint_CPU_Seconds', 'Xmllint_Peak_RSS_MB', 'Md5deep_CPU_Seconds', 'Md5deep_Peak_RSS_MB',
+                     'Tar_CPU_Seconds', 'Tar_Peak_RSS_MB', 'Bzip2_CPU_Seconds', 'Bzip2_Peak_RSS_MB',
+                     '7Zip_CPU_Seconds', '7Zip_Peak_RSS_MB', 'Tools_Read_Blocks', 'Tools_Write_Blocks'],
+                    ['12.35', '1024.1', '3.50', '256.0', '', '', '', '', '', '', '', '', '', '', '2010', '320']]
+        self.assertEqual(expected, result, "Problem with tool usage")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,12 @@
 """Testing for the function make_bag, which takes an AIP class instance as input and makes it into a bag,
 with md5 and sha256 checksums. The bag folder is renamed with "_bag" suffix."""
 
+from concurrent.futures import Future
 from datetime import datetime
 import os
 import shutil
 import unittest
-from aip_functions import AIP, make_bag
+from aip_functions import AIP, FileInfo, make_bag
 from test_script import make_directory_list
 
 
@@ -92,6 +93,29 @@ class TestMakeBag(unittest.TestCase):
         # Verifies the log is updated for the bagging step.
         self.assertEqual('Success', aip.log['Bag'], "Problem with general, log")
 
+    def test_object_hashing(self):
+        """Test for making a bag out of an AIP folder with checksums calculated while FITS ran"""
+        # Makes the test input and runs the function.
+        # The checksums are not correct, to show they were used instead of being calculated.
+        aips_dir = os.path.join(os.getcwd(), 'make_bag')
+        aip = AIP(aips_dir, 'russell', None, 'rbrl_025', 'folder', 'general', 'rbrl_025_er_000001', 'title', 'InC', 1, True)
+        shutil.copytree(os.path.join(aips_dir, f'{aip.id}_copy'), os.path.join(aips_dir, aip.id))
+        file_stat = os.stat(os.path.join(aips_dir, aip.id, 'Placeholder for AIP content.txt'))
+        aip.object_hashing = Future()
+        aip.object_hashing.set_result({FileInfo(file_stat.st_size, file_stat.st_mtime, file_stat.st_ino):
+                                       {'md5': 'object-md5', 'sha256': 'object-sha256'}})
+        make_bag(aip)
+
+        # Verifies the manifests have the checksums from object_hashing.
+        result = []
+        for algorithm in ('md5', 'sha256'):
+            manifest_path = os.path.join(aips_dir, f'{aip.id}_bag', f'manifest-{algorithm}.txt')
+            with open(manifest_path, encoding='utf-8') as manifest:
+                result.append(manifest.read())
+        expected = ['object-md5  data/Placeholder for AIP content.txt\n',
+                    'object-sha256  data/Placeholder for AIP content.txt\n']
+        self.assertEqual(expected, result, "Problem with object hashing, manifests")
+
     def test_temp(self):
         """Test for making a bag out of an AIP folder that has temp files that should be deleted"""
         # Makes the test input and runs the function.
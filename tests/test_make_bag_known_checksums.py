@@ -0,0 +1,97 @@
+"""Testing for the function make_bag_known_checksums, which takes the path to an AIP folder, the checksums,
+and the checksums that are already known as input and bags the AIP folder without calculating the known checksums."""
+
+import os
+import shutil
+import unittest
+import bagit
+from aip_functions import make_bag_known_checksums
+
+
+class TestMakeBagKnownChecksums(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP (using the content of the bag from the read_bag_manifest test)"""
+        self.aip_path = os.path.join(os.getcwd(), 'read_bag_manifest', 'aip-known')
+        shutil.copytree(os.path.join(os.getcwd(), 'read_bag_manifest', 'aip-bag_copy', 'data'),
+                        os.path.join(self.aip_path, 'objects'))
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        if os.path.exists(self.aip_path):
+            shutil.rmtree(self.aip_path)
+
+    def read_manifest(self, algorithm):
+        """Returns the lines of a manifest in the bag"""
+        with open(os.path.join(self.aip_path, f'manifest-{algorithm}.txt'), 'r', encoding='utf-8') as manifest:
+            return manifest.read().splitlines()
+
+    def test_md5(self):
+        """Test for an md5 bag, where the known MD5s are used and the rest are calculated"""
+        # The known MD5 for audio.wav is not correct, to show it was not calculated.
+        known_checksums = {os.path.join('objects', 'audio.wav'): {'md5': 'known-md5'}}
+        make_bag_known_checksums(self.aip_path, ['md5'], known_checksums)
+
+        result = self.read_manifest('md5')
+        expected = ['known-md5  data/objects/audio.wav',
+                    '01c85b1ef9ffdbb7fb5e196644a63d1e  data/objects/Frames/frame_0001.txt',
+                    'b7bcfc2603a7cd9dc3a782f5d96538be  data/objects/Frames/frame_0002.txt']
+        self.assertEqual(expected, result, "Problem with md5, manifest")
+
+        bag = bagit.Bag(self.aip_path)
+        result = (bag.info['Payload-Oxum'], sorted(bag.tagfile_entries()))
+        expected = ('26.3', ['bag-info.txt', 'bagit.txt', 'manifest-md5.txt'])
+        self.assertEqual(expected, result, "Problem with md5, bag metadata")
+
+    def test_md5_sha256(self):
+        """Test for an md5 and sha256 bag, where the known MD5s are used and the sha256 is calculated for every file"""
+        frame_path = os.path.join('objects', 'Frames', 'frame_0001.txt')
+        known_checksums = {frame_path: {'md5': '01c85b1ef9ffdbb7fb5e196644a63d1e'},
+                           os.path.join('objects', 'audio.wav'): {'md5': '99cc5f0593d9103212d5684552c0dca9'}}
+        make_bag_known_checksums(self.aip_path, ['md5', 'sha256'], known_checksums)
+
+        result = len(self.read_manifest('sha256'))
+        self.assertEqual(3, result, "Problem with md5 and sha256, sha256 manifest")
+
+        result = bagit.Bag(self.aip_path).is_valid()
+        self.assertEqual(True, result, "Problem with md5 and sha256, valid")
+
+    def test_all_known(self):
+        """Test for a file with every checksum known, which is not calculated"""
+        # The known checksums for audio.wav are not correct, to show they were not calculated.
+        known_checksums = {os.path.join('objects', 'audio.wav'): {'md5': 'known-md5', 'sha256': 'known-sha256'}}
+        make_bag_known_checksums(self.aip_path, ['md5', 'sha256'], known_checksums)
+
+        result = (self.read_manifest('md5')[0], self.read_manifest('sha256')[0])
+        expected = ('known-md5  data/objects/audio.wav', 'known-sha256  data/objects/audio.wav')
+        self.assertEqual(expected, result, "Problem with all known, manifests")
+
+        result = bagit.Bag(self.aip_path).info['Payload-Oxum']
+        self.assertEqual('26.3', result, "Problem with all known, Payload-Oxum")
+
+    def test_encoded_paths(self):
+        """Test for file names with characters that bagit encodes or could read as encoded, which match bagit"""
+        # Adds the files to the test AIP and makes a copy of the AIP to bag with bagit.
+        # Line feeds are not allowed in Windows file names, so that file is only added on other operating systems.
+        names = ['100% done.txt', '%41.txt'] + (['line\nbreak.txt'] if os.name != 'nt' else [])
+        for name in names:
+            with open(os.path.join(self.aip_path, 'objects', name), 'w') as new_file:
+                new_file.write('text')
+        bagit_path = os.path.join(os.getcwd(), 'read_bag_manifest', 'aip-known-bagit')
+        shutil.copytree(self.aip_path, bagit_path)
+        make_bag_known_checksums(self.aip_path, ['md5'], {})
+        bagit.make_bag(bagit_path, checksums=['md5'])
+
+        # Test for the manifest, which is the same as the one made by bagit.
+        with open(os.path.join(bagit_path, 'manifest-md5.txt'), 'r', encoding='utf-8') as manifest:
+            expected = manifest.read().splitlines()
+        shutil.rmtree(bagit_path)
+        result = self.read_manifest('md5')
+        self.assertEqual(expected, result, "Problem with encoded paths, manifest")
+
+        result = bagit.Bag(self.aip_path).is_valid()
+        self.assertEqual(True, result, "Problem with encoded paths, valid")
+
+
+if __name__ == "__main__":
+    unittest.main()
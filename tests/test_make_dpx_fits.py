@@ -0,0 +1,95 @@
+"""Testing for the function make_dpx_fits, which takes an AIP class instance and the DPX frames that FITS
+did not run on as input and saves FITS output for them made from the FITS output for the sample frame."""
+
+import hashlib
+import os
+import platform
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+from aip_functions import AIP, make_dpx_fits, scan_aip
+from test_script import make_directory_list
+
+
+class TestMakeDpxFits(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        aip_path = os.path.join(os.getcwd(), 'make_dpx_fits', 'aip-dpx')
+        if os.path.exists(aip_path):
+            shutil.rmtree(aip_path)
+
+    def test_dpx_fits(self):
+        """Test for two frames with FITS output from the sample and one with no sample FITS output"""
+        # Makes the test input, with the sample FITS output updated to the path of the sample frame,
+        # and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'make_dpx_fits')
+        shutil.copytree(os.path.join(aips_dir, 'aip-dpx_copy'), os.path.join(aips_dir, 'aip-dpx'))
+        aip = AIP(aips_dir, 'bmac', 'dpx', 'coll-1', 'folder', 'av', 'aip-dpx', 'title', 'InC', 1, True)
+        scan = os.path.join(aips_dir, 'aip-dpx', 'objects', 'Reel1-dpx', 'Scan')
+        metadata = os.path.join(aips_dir, 'aip-dpx', 'metadata')
+        ns = {'fits': 'http://hul.harvard.edu/ois/xml/ns/fits/fits_output'}
+        ET.register_namespace('', ns['fits'])
+        tree = ET.parse(os.path.join(metadata, 'Reel1_0001.dpx_fits.xml'))
+        tree.getroot().find('fits:fileinfo/fits:filepath', ns).text = os.path.join(scan, 'Reel1_0001.dpx')
+        tree.write(os.path.join(metadata, 'Reel1_0001.dpx_fits.xml'), xml_declaration=True, encoding='UTF-8')
+        derived = [(os.path.join(scan, 'Reel1_0002.dpx'), os.path.join(scan, 'Reel1_0001.dpx')),
+                   (os.path.join(scan, 'Reel1_0003.dpx'), os.path.join(scan, 'Missing.dpx'))]
+        make_dpx_fits(aip, derived)
+
+        # Test for the contents of the metadata folder.
+        result = make_directory_list(metadata)
+        expected = [os.path.join(metadata, 'Reel1_0001.dpx_fits.xml'),
+                    os.path.join(metadata, 'Reel1_0002.dpx_fits.xml'),
+                    os.path.join(metadata, 'Reel1_0003.dpx_fits.xml')]
+        self.assertEqual(expected, result, "Problem with DPX FITS, metadata folder")
+
+        # Test for the frame with sample FITS output: same identification and creating application,
+        # file information for the frame, and no filestatus, metadata, or statistics.
+        root = ET.parse(os.path.join(metadata, 'Reel1_0002.dpx_fits.xml')).getroot()
+        result = [[child.tag.split('}')[1] for child in root],
+                  root.find('fits:identification/fits:identity', ns).get('format'),
+                  [(child.tag.split('}')[1], child.text, child.get('toolname'))
+                   for child in root.find('fits:fileinfo', ns) if child.tag.split('}')[1] != 'fslastmodified']]
+        expected = [['identification', 'fileinfo'], 'Digital Picture Exchange',
+                    [('filepath', os.path.join(scan, 'Reel1_0002.dpx'), None), ('filename', 'Reel1_0002.dpx', None),
+                     ('size', '1032', 'hashlib'), ('md5checksum', 'b9982c4b5d977fa78e83367672f0731f', 'hashlib'),
+                     ('creatingApplicationName', 'Film Scanner', 'Exiftool')]]
+        self.assertEqual(expected, result, "Problem with DPX FITS, frame with sample")
+        result = root.find('fits:fileinfo/fits:md5checksum', ns).get('toolversion')
+        self.assertEqual(platform.python_version(), result, "Problem with DPX FITS, MD5 tool version")
+
+        # Test for the frame without sample FITS output, which only has file information.
+        root = ET.parse(os.path.join(metadata, 'Reel1_0003.dpx_fits.xml')).getroot()
+        result = [[child.tag.split('}')[1] for child in root],
+                  [child.tag.split('}')[1] for child in root.find('fits:fileinfo', ns)]]
+        expected = [['fileinfo'], ['filepath', 'filename', 'size', 'md5checksum', 'fslastmodified']]
+        self.assertEqual(expected, result, "Problem with DPX FITS, frame without sample")
+
+    def test_bag_md5(self):
+        """Test for a frame with an MD5 from the bag it came in, which is used instead of reading the frame"""
+        # Makes the test input, with a bag MD5 for the frame that is not its real MD5, and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'make_dpx_fits')
+        shutil.copytree(os.path.join(aips_dir, 'aip-dpx_copy'), os.path.join(aips_dir, 'aip-dpx'))
+        aip = AIP(aips_dir, 'bmac', 'dpx', 'coll-1', 'folder', 'av', 'aip-dpx', 'title', 'InC', 1, True)
+        scan_aip(aip, os.path.join(aips_dir, 'aip-dpx'))
+        aip.bag_md5s[aip.inventory[os.path.join('objects', 'Reel1-dpx', 'Scan', 'Reel1_0002.dpx')]] = 'bag-md5'
+        scan = os.path.join(aips_dir, 'aip-dpx', 'objects', 'Reel1-dpx', 'Scan')
+        derived = [(os.path.join(scan, 'Reel1_0002.dpx'), os.path.join(scan, 'Missing.dpx')),
+                   (os.path.join(scan, 'Reel1_0003.dpx'), os.path.join(scan, 'Missing.dpx'))]
+        make_dpx_fits(aip, derived)
+
+        # Test for the MD5 of each frame, which is from the bag for Reel1_0002.dpx and calculated for Reel1_0003.dpx.
+        ns = {'fits': 'http://hul.harvard.edu/ois/xml/ns/fits/fits_output'}
+        metadata = os.path.join(aips_dir, 'aip-dpx', 'metadata')
+        result = []
+        for fits_xml in ('Reel1_0002.dpx_fits.xml', 'Reel1_0003.dpx_fits.xml'):
+            root = ET.parse(os.path.join(metadata, fits_xml)).getroot()
+            result.append(root.find('fits:fileinfo/fits:md5checksum', ns).text)
+        with open(os.path.join(scan, 'Reel1_0003.dpx'), 'rb') as frame:
+            expected = ['bag-md5', hashlib.md5(frame.read()).hexdigest()]
+        self.assertEqual(expected, result, "Problem with bag MD5")
+
+
+if __name__ == "__main__":
+    unittest.main()
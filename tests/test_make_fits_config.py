@@ -0,0 +1,51 @@
+"""Testing for the function make_fits_config, which takes the paths to fits.xml, a FITS profile, and the output
+and makes the FITS configuration for that profile.
+The tests use a small fits.xml, so FITS is not needed."""
+
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from aip_functions import make_fits_config
+
+
+class TestMakeFitsConfig(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the FITS configuration, if made"""
+        config_path = os.path.join(os.getcwd(), 'make_fits_config', 'fits_profile.xml')
+        if os.path.exists(config_path):
+            os.remove(config_path)
+
+    def test_profile(self):
+        """Test for a profile that removes tools and adds exclude-exts, including an extension already excluded"""
+        # Makes the test input and runs the function.
+        test_dir = os.path.join(os.getcwd(), 'make_fits_config')
+        config_path = os.path.join(test_dir, 'fits_profile.xml')
+        make_fits_config(os.path.join(test_dir, 'fits.xml'), os.path.join(test_dir, 'profile.xml'), config_path)
+
+        # Test for the tools in the FITS configuration.
+        root = ET.parse(config_path).getroot()
+        result = [[tool.get('class').split('.')[-1], tool.get('exclude-exts')] for tool in root.findall('tools/tool')]
+        expected = [['ADLTool', None], ['Droid', 'fmt'], ['Jhove', 'dng,mbx,arw,warc'],
+                    ['FileUtility', 'dng,warc'], ['Exiftool', 'txt'], ['FileInfo', 'warc']]
+        self.assertEqual(expected, result, "Problem with profile, tools")
+
+        # Test for the rest of the configuration, which is not changed.
+        result = root.find('output/report-conflicts').text
+        self.assertEqual('true', result, "Problem with profile, output")
+
+    def test_profiles_folder(self):
+        """Test for every profile in the repo, which should only name tools that are in FITS"""
+        profiles_dir = os.path.join('..', 'fits_profiles')
+        fits_tools = ('ADLTool', 'VTTTool', 'MediaInfo', 'Droid', 'Jhove', 'FileUtility', 'Exiftool',
+                      'MetadataExtractor', 'FileInfo', 'XmlMetadata', 'FFIdent', 'TikaTool')
+        result = []
+        for profile in os.listdir(profiles_dir):
+            for tool in ET.parse(os.path.join(profiles_dir, profile)).getroot().findall('tool'):
+                if tool.get('name') not in fits_tools:
+                    result.append(f"{profile}: {tool.get('name')}")
+        self.assertEqual([], result, "Problem with profiles folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -107,7 +107,9 @@ class TestMakePreservationXML(unittest.TestCase):
 
         # Verifies the log is created and has the expected values.
         # Output has a different line separator (\r\n or \n) depending on the OS the test is run on.
+        # The columns for the time of each step are removed, since they are different every time the test runs.
         log_df = pd.read_csv(os.path.join(aips_dir, 'aip_log.csv'))
+        log_df = log_df.loc[:, :'Processing_Complete']
         log_df = log_df.fillna('BLANK')
         result = [log_df.columns.tolist()] + log_df.values.tolist()
         expected = [[["Time_Started", "AIP_ID", "Files_Deleted", "Objects_Folder_Made", "Metadata_Folder_Made",
@@ -0,0 +1,60 @@
+"""Testing for the function make_signature_fits, which takes an AIP class instance and the files identified
+from their signature as input and saves minimal FITS output for those files to the metadata folder."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, make_signature_fits
+from format_signatures import Signature
+from preservation_xml import Application, Identity, clean_fits_file
+from test_script import make_directory_list
+
+
+class TestMakeSignatureFits(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        aip_path = os.path.join(os.getcwd(), 'make_signature_fits', 'aip-sig')
+        if os.path.exists(aip_path):
+            shutil.rmtree(aip_path)
+
+    def test_signature_fits(self):
+        """Test for two files, one with the same name as FITS output already in the metadata folder
+        and one with a creating application"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'make_signature_fits')
+        shutil.copytree(os.path.join(aips_dir, 'aip-sig_copy'), os.path.join(aips_dir, 'aip-sig'))
+        aip = AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-sig', 'title', 'InC', 1, True)
+        objects = os.path.join(aips_dir, 'aip-sig', 'objects')
+        warc = Signature('WARC', '1.0', 'fmt/289', 'application/warc', ('warc',))
+        mp3 = Signature('MPEG 1/2 Audio Layer 3', None, 'fmt/134', 'audio/mpeg', ('mp3',))
+        identified = [(os.path.join(objects, 'Folder', 'Crawl.warc'), warc, 56, '7bf6b8996a1a9c705568d919979dfafb',
+                       ('Heritrix', '3.4.0')),
+                      (os.path.join(objects, 'Document.docx'), mp3, 449, '9a4615b081e799571bbe78d27d57f8f7', None)]
+        make_signature_fits(aip, identified, ('Signature identification', '1.0'))
+
+        # Test for the contents of the metadata folder.
+        metadata = os.path.join(aips_dir, 'aip-sig', 'metadata')
+        result = make_directory_list(metadata)
+        expected = [os.path.join(metadata, 'Crawl.warc-1_fits.xml'), os.path.join(metadata, 'Crawl.warc_fits.xml'),
+                    os.path.join(metadata, 'Document.docx_fits.xml')]
+        self.assertEqual(expected, result, "Problem with signature FITS, metadata folder")
+
+        # Test for the information used for the preservation.xml, read the same as FITS output.
+        tool = (('Signature identification', '1.0'),)
+        result = [clean_fits_file(os.path.join(metadata, 'Crawl.warc-1_fits.xml')),
+                  clean_fits_file(os.path.join(metadata, 'Document.docx_fits.xml'))]
+        self.assertEqual(os.path.join(objects, 'Folder', 'Crawl.warc'), result[0].filepath,
+                         "Problem with signature FITS, filepath")
+        self.assertEqual([('56',), ('7bf6b8996a1a9c705568d919979dfafb', 'Signature identification', '1.0')],
+                         [result[0].sizes, result[0].md5s[0]], "Problem with signature FITS, size and MD5")
+        self.assertEqual((Application(('Heritrix',), ('3.4.0',), ()),), result[0].applications,
+                         "Problem with signature FITS, creating application")
+        expected = [Identity('WARC', tool, '1.0', 'fmt/289', False, (), ()),
+                    Identity('MPEG 1/2 Audio Layer 3', tool, None, 'fmt/134', False, (), ())]
+        self.assertEqual(expected, [result[0].identities[0], result[1].identities[0]],
+                         "Problem with signature FITS, identities")
+
+
+if __name__ == "__main__":
+    unittest.main()
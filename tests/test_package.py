@@ -9,7 +9,7 @@ import os
 import shutil
 import tarfile
 import unittest
-from aip_functions import AIP, log, package
+from aip_functions import AIP, StepResult, log, package
 from test_script import make_aip_log_list
 
 
@@ -168,7 +168,11 @@ class TestPackage(unittest.TestCase):
                    'PresXML': 'Success', 'PresValid': 'Valid', 'Bag': 'Success', 'BagValid': 'Valid', 'Package': 'n/a',
                    'Manifest': 'n/a', 'Complete': 'n/a'}
         log('header', aips_dir)
-        package(aip, aip_staging)
+        step_result = package(aip, aip_staging)
+
+        # Test for the step result.
+        expected = StepResult(False, 'bag_not_found')
+        self.assertEqual(expected, step_result, "Problem with error, step result")
 
         # Test for the AIP log.
         result = make_aip_log_list(os.path.join(os.getcwd(), 'package', 'aip_log.csv'))
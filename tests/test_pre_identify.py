@@ -0,0 +1,83 @@
+"""Testing for the function pre_identify, which takes an AIP class instance, the folder FITS would run on,
+and the formats which always get full FITS as input and identifies the rest of the files from their signature."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, pre_identify
+from test_script import make_directory_list
+
+
+class TestPreIdentify(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copies of the test AIPs"""
+        for aip_id in ('aip-all', 'aip-input', 'aip-pre'):
+            aip_path = os.path.join(os.getcwd(), 'pre_identify', aip_id)
+            if os.path.exists(aip_path):
+                shutil.rmtree(aip_path)
+
+    def make_aip(self, aip_id):
+        """Makes a copy of the test AIP and returns an AIP instance for it"""
+        aips_dir = os.path.join(os.getcwd(), 'pre_identify')
+        shutil.copytree(os.path.join(aips_dir, f'{aip_id}_copy'), os.path.join(aips_dir, aip_id))
+        return AIP(aips_dir, 'dept', None, 'coll-1', 'folder', 'general', aip_id, 'title', 'InC', 1, True)
+
+    def test_all_identified(self):
+        """Test for an AIP where every file is identified, so FITS does not need to run"""
+        aip = self.make_aip('aip-all')
+        objects = os.path.join(aip.directory, 'aip-all', 'objects')
+        fits_input, identified = pre_identify(aip, objects, [])
+
+        # Test for the FITS input (None, since FITS should not run).
+        self.assertEqual(None, fits_input, "Problem with all identified, fits_input")
+        self.assertEqual(False, os.path.exists(os.path.join(aip.directory, 'aip-all', 'fits-input')),
+                         "Problem with all identified, fits-input folder")
+
+        # Test for the identified files.
+        result = sorted([(path, signature.format, signature.puid, size) for path, signature, size, md5, application in identified])
+        expected = [(os.path.join(objects, 'Crawl.warc'), 'WARC', 'fmt/289', 56),
+                    (os.path.join(objects, 'Document.docx'), 'Microsoft Word for Windows', 'fmt/412', 449)]
+        self.assertEqual(expected, result, "Problem with all identified, identified")
+
+    def test_fits_input(self):
+        """Test for an AIP where the FITS cache already made a fits-input folder"""
+        aip = self.make_aip('aip-input')
+        fits_input = os.path.join(aip.directory, 'aip-input', 'fits-input')
+        result_input, identified = pre_identify(aip, fits_input, [])
+
+        # Test for the FITS input, which should only have the file that was not identified.
+        self.assertEqual(fits_input, result_input, "Problem with fits-input, fits_input")
+        result = make_directory_list(fits_input)
+        self.assertEqual([os.path.join(fits_input, 'Text.txt')], result, "Problem with fits-input, fits-input folder")
+
+        # Test for the identified file, which has the path in the objects folder.
+        result = [(path, signature.version, md5) for path, signature, size, md5, application in identified]
+        expected = [(os.path.join(aip.directory, 'aip-input', 'objects', 'Crawl.warc'), '1.0',
+                     '7bf6b8996a1a9c705568d919979dfafb')]
+        self.assertEqual(expected, result, "Problem with fits-input, identified")
+
+    def test_full_fits(self):
+        """Test for an AIP with files that are not identified (empty, misnamed, text) or have a full FITS format"""
+        aip = self.make_aip('aip-pre')
+        objects = os.path.join(aip.directory, 'aip-pre', 'objects')
+        fits_input, identified = pre_identify(aip, objects, ['Graphics Interchange Format'])
+
+        # Test for the FITS input, which should have the files that were not identified.
+        expected_input = os.path.join(aip.directory, 'aip-pre', 'fits-input')
+        self.assertEqual(expected_input, fits_input, "Problem with full FITS, fits_input")
+        result = make_directory_list(fits_input)
+        expected = [os.path.join(fits_input, 'Empty.gif'), os.path.join(fits_input, 'Image.gif'),
+                    os.path.join(fits_input, 'Misnamed.txt'), os.path.join(fits_input, 'Text.txt')]
+        self.assertEqual(expected, result, "Problem with full FITS, fits-input folder")
+
+        # Test for the identified files.
+        result = sorted([(path, signature.format, signature.version) for path, signature, size, md5, application in identified])
+        expected = [(os.path.join(objects, 'Crawl.warc'), 'WARC', '1.0'),
+                    (os.path.join(objects, 'Document.docx'), 'Microsoft Word for Windows', '2007 onwards'),
+                    (os.path.join(objects, 'Folder', 'Sound.mp3'), 'MPEG 1/2 Audio Layer 3', None)]
+        self.assertEqual(expected, result, "Problem with full FITS, identified")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Testing for the function preflight, which takes the AIPs directory, AIP type, workflow, metadata rows,
+and the limits for the number of files and size as input, and returns the problems found with each AIP folder."""
+
+import csv
+import os
+import shutil
+import unittest
+from aip_functions import MetadataRow, preflight
+
+
+def make_row(folder, aip_id):
+    """Make a MetadataRow for a test AIP, with the same values as the test metadata.csv files except folder and AIP ID"""
+    return MetadataRow('test', 'test-001', folder, aip_id, 'Title', 'http://rightsstatements.org/vocab/InC/1.0/', '1')
+
+
+class TestPreflight(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIPs directory"""
+        self.aips_dir = os.path.join(os.getcwd(), 'preflight', 'aips')
+        shutil.copytree(os.path.join(os.getcwd(), 'preflight', 'aips_copy'), self.aips_dir)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIPs directory"""
+        if os.path.exists(self.aips_dir):
+            os.chmod(os.path.join(self.aips_dir, 'Folder Two', 'a.txt'), 0o644)
+            shutil.rmtree(self.aips_dir)
+
+    def test_no_issues(self):
+        """Test for AIP folders with no problems, which are not in the result and do not make preflight_issues.csv"""
+        md_rows = [make_row('test-001-er-000001', 'test-001-er-000001'), make_row('Folder Two', 'test-001-er-000003')]
+        issues = preflight(self.aips_dir, 'general', None, md_rows, None, None)
+
+        self.assertEqual({}, issues, "Problem with no issues, result")
+        result = os.path.exists(os.path.join(self.aips_dir, 'preflight_issues.csv'))
+        self.assertEqual(False, result, "Problem with no issues, preflight_issues.csv")
+
+    def test_issues(self):
+        """Test for AIP folders with every problem that does not depend on the operating system or user"""
+        os.mkdir(os.path.join(self.aips_dir, 'test-001-er-000004'))
+        os.mkdir(os.path.join(self.aips_dir, 'test-001-er-000005'))
+        with open(os.path.join(self.aips_dir, 'Folder Two', 'Dir', 'what?.txt'), 'w') as new_file:
+            new_file.write('Test file')
+        md_rows = [make_row('test-001-er-000001', 'test-001-er-000001'),
+                   make_row('test-001-er-000002', 'test-001-er-000002'),
+                   make_row('Folder Two', 'test-001-er-000004'),
+                   make_row('test-001-er-000005', 'test-001-er-000005')]
+        issues = preflight(self.aips_dir, 'general', None, md_rows, 2, None)
+
+        # Test for the returned issues, which only has AIPs with problems.
+        expected = {'test-001-er-000002': ['The AIP folder already has a folder named objects',
+                                           'The AIP folder already has a folder named metadata'],
+                    'test-001-er-000004': ['The AIPs directory already has a folder named with the AIP ID',
+                                           f"Name has characters not allowed in ARCHive: "
+                                           f"{ascii(os.path.join('Dir', 'what?.txt'))}",
+                                           'The AIP has 3 files, which is over the limit of 2'],
+                    'test-001-er-000005': ['The AIP folder has no files']}
+        self.assertEqual(expected, issues, "Problem with issues, result")
+
+        # Test for preflight_issues.csv, which has one row per problem.
+        with open(os.path.join(self.aips_dir, 'preflight_issues.csv'), newline='', encoding='utf-8') as issues_csv:
+            result = list(csv.reader(issues_csv))
+        expected = [['AIP_ID', 'Issue']] + [[aip_id, issue] for aip_id in expected for issue in expected[aip_id]]
+        self.assertEqual(expected, result, "Problem with issues, preflight_issues.csv")
+
+    def test_append(self):
+        """Test for adding the problems to preflight_issues.csv from an earlier check, as watch_aips.py does"""
+        preflight(self.aips_dir, 'general', None, [make_row('test-001-er-000002', 'test-001-er-000002')], None, None)
+        preflight(self.aips_dir, 'general', None, [make_row('Folder Two', 'test-001-er-000003')], None, 15,
+                  append=True)
+
+        with open(os.path.join(self.aips_dir, 'preflight_issues.csv'), newline='', encoding='utf-8') as issues_csv:
+            result = list(csv.reader(issues_csv))
+        expected = [['AIP_ID', 'Issue'],
+                    ['test-001-er-000002', 'The AIP folder already has a folder named objects'],
+                    ['test-001-er-000002', 'The AIP folder already has a folder named metadata'],
+                    ['test-001-er-000003', 'The AIP is 20 bytes, which is over the limit of 15']]
+        self.assertEqual(expected, result, "Problem with append")
+
+    def test_size_limit(self):
+        """Test for an AIP over the size limit"""
+        md_rows = [make_row('Folder Two', 'test-001-er-000003')]
+        issues = preflight(self.aips_dir, 'general', None, md_rows, None, 15)
+
+        expected = {'test-001-er-000003': ['The AIP is 20 bytes, which is over the limit of 15']}
+        self.assertEqual(expected, issues, "Problem with size limit")
+
+    def test_size_limit_av(self):
+        """Test for an AV AIP over the limits, which is not split, so it is made and has no issues"""
+        md_rows = [make_row('Folder Two', 'test-001-er-000003')]
+        issues = preflight(self.aips_dir, 'av', None, md_rows, 1, 15)
+        self.assertEqual({}, issues, "Problem with size limit av")
+
+    def test_web(self):
+        """Test for a web AIP, where the objects and metadata folders are made in the AIP folder after it is renamed"""
+        md_rows = [make_row('test-001-er-000002', 'test-001-web-000002'), make_row('Folder Two', 'test-001-web-000003')]
+        issues = preflight(self.aips_dir, 'web', None, md_rows, None, None)
+
+        expected = {'test-001-web-000002': ['The AIP folder already has a folder named objects',
+                                            'The AIP folder already has a folder named metadata']}
+        self.assertEqual(expected, issues, "Problem with web")
+
+    def test_dpx(self):
+        """Test for the dpx workflow, where the AIP folder must be a bag"""
+        md_rows = [make_row('test-001-er-000001', 'test-001-er-000001')]
+        issues = preflight(self.aips_dir, 'av', 'dpx', md_rows, None, None)
+
+        expected = {'test-001-er-000001': ['The AIP folder is not a bag (no data folder), '
+                                           'which is required for the dpx workflow']}
+        self.assertEqual(expected, issues, "Problem with dpx")
+
+    @unittest.skipIf(os.name == 'nt' or os.geteuid() == 0, "File permissions do not stop an administrator or root")
+    def test_unreadable(self):
+        """Test for a file that cannot be opened"""
+        os.chmod(os.path.join(self.aips_dir, 'Folder Two', 'a.txt'), 0)
+        md_rows = [make_row('Folder Two', 'test-001-er-000003')]
+        issues = preflight(self.aips_dir, 'general', None, md_rows, None, None)
+
+        expected = {'test-001-er-000003': ['File cannot be opened (Permission denied): a.txt']}
+        self.assertEqual(expected, issues, "Problem with unreadable file")
+
+
+if __name__ == '__main__':
+    unittest.main()
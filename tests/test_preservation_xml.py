@@ -0,0 +1,94 @@
+"""Testing for the preservation_xml module, which makes the preservation.xml with Python instead of Saxon.
+The results are compared to the output of the stylesheets (fits-cleanup.xsl and fits-to-preservation.xsl)
+for copies of the same test AIPs used for testing make_cleaned_fits_xml and make_preservation_xml,
+so the tests check that the two ways of making the preservation.xml produce identical output."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP
+from preservation_xml import clean_fits_files, format_date, make_preservation_xml, read_fits
+from test_make_preservation_xml import read_xml
+
+
+class TestPreservationXML(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIPs, which are also used by other tests that move them to error folders"""
+        self.test_dir = os.path.join(os.getcwd(), 'preservation_xml')
+        self.aips_dir = os.path.join(self.test_dir, 'aips')
+        shutil.copytree(os.path.join(self.test_dir, 'aips_copy'), self.aips_dir)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIPs, including the preservation.xml made by the tests"""
+        if os.path.exists(self.aips_dir):
+            shutil.rmtree(self.aips_dir)
+
+    def compare(self, aip):
+        """Makes the preservation.xml from the cleaned-fits.xml for a test AIP
+        and compares it to the expected preservation.xml, which was made by Saxon"""
+        input_path = os.path.join(aip.directory, aip.id, 'metadata', f'{aip.id}_cleaned-fits.xml')
+        output_path = os.path.join(aip.directory, 'python_preservation.xml')
+        make_preservation_xml(input_path, output_path, aip, 'http://uri', cleaned=True)
+        result = read_xml(output_path)
+        expected = read_xml(os.path.join(self.test_dir, 'expected_preservation_xml', f'{aip.id}_preservation.xml'))
+        self.assertEqual(expected, result, f"Problem with {aip.id}")
+
+    def test_bmac(self):
+        """Test for an AIP from BMAC, which calculates file id differently"""
+        self.compare(AIP(self.aips_dir, 'bmac', 'mp4', 'rabbitbox', 'folder', 'av', 'rabbitbox_0003', 'rabbitbox_0003',
+                         'http://rightsstatements.org/vocab/InC/1.0/', 1, True))
+
+    def test_dates(self):
+        """Test for every date format encountered so far, as well as a new date format"""
+        self.compare(AIP(self.aips_dir, 'test', None, 'dates', 'folder', 'general', 'test-dates-er-1', 'All Date Formats',
+                         'http://rightsstatements.org/vocab/InC/1.0/', 1, True))
+
+    def test_format_dup(self):
+        """Test for an AIP with multiple files of the same format"""
+        self.compare(AIP(self.aips_dir, 'russell', None, 'rbrl-025', 'folder', 'general', 'rbrl-025-er-000003', 'Dups',
+                         'https://creativecommons.org/licenses/by-sa/4.0/', 1, True))
+
+    def test_multi_file(self):
+        """Test for an AIP with multiple files of different formats"""
+        self.compare(AIP(self.aips_dir, 'russell', None, 'rbrl-025', 'folder', 'general', 'rbrl-025-er-000002', 'Multi',
+                         'http://rightsstatements.org/vocab/InC/1.0/', 1, True))
+
+    def test_one_file(self):
+        """Test for an AIP with one file"""
+        self.compare(AIP(self.aips_dir, 'russell', None, 'rbrl-025', 'folder', 'general', 'rbrl-025-er-000001', 'Single',
+                         'http://rightsstatements.org/vocab/InC/1.0/', 1, True))
+
+    def test_web_hargrett(self):
+        """Test for a Hargrett web AIP without a related collection"""
+        self.compare(AIP(self.aips_dir, 'hargrett', None, 'harg-0000', 'folder', 'web', 'harg-0000-web-202108-0001',
+                         'Hargrett Web without Collection', 'https://creativecommons.org/licenses/by-sa/4.0/', 1, True))
+
+    def test_web_magil(self):
+        """Test for a MAGIL web AIP without a related collection"""
+        self.compare(AIP(self.aips_dir, 'magil', None, 'magil-0000', 'folder', 'web', 'magil-ggp-2529686-2025-08',
+                         'Georgia State Government Website', 'http://rightsstatements.org/vocab/InC/1.0/', 1, True))
+
+    def test_cleanup(self):
+        """Test that simplifying the combined-fits.xml in Python gives the same result as fits-cleanup.xsl"""
+        result = list(read_fits(os.path.join(self.aips_dir, 'aip1', 'metadata', 'aip1_combined-fits.xml')))
+        expected = list(read_fits(os.path.join(self.test_dir, 'aip1_cleaned-fits_expected.xml'), cleaned=True))
+        self.assertEqual(expected, result, "Problem with cleanup")
+
+    def test_cleanup_files(self):
+        """Test that cleaning each FITS file, in one process and in parallel, gives the same result as the combined FITS"""
+        metadata = os.path.join(self.aips_dir, 'aip1', 'metadata')
+        # Sorted to match the combined-fits.xml, which was made on Windows (alphabetical order).
+        fits_paths = sorted(os.path.join(metadata, doc) for doc in os.listdir(metadata) if doc.endswith('_fits.xml'))
+        expected = list(read_fits(os.path.join(metadata, 'aip1_combined-fits.xml')))
+        self.assertEqual(expected, clean_fits_files(fits_paths), "Problem with cleanup files, one process")
+        self.assertEqual(expected, clean_fits_files(fits_paths, workers=2, minimum=0), "Problem with cleanup files, parallel")
+
+    def test_format_date(self):
+        """Test for dates that are not included, since they are not real dates"""
+        result = [format_date(date) for date in ('0', '0000:00:00 00:00:00', '0000-00-00T00:00:00', ':2020')]
+        self.assertEqual([None, None, None, None], result, "Problem with format_date, not dates")
+
+
+if __name__ == "__main__":
+    unittest.main()
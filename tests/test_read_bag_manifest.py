@@ -0,0 +1,63 @@
+"""Testing for the function read_bag_manifest, which takes an AIP class instance and the path to the AIP folder
+as input and saves the MD5s from the manifest of a bag in the AIP folder, if the bag is complete."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, read_bag_manifest
+
+
+class TestReadBagManifest(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP, which is a bag, and the AIP instance"""
+        self.aips_dir = os.path.join(os.getcwd(), 'read_bag_manifest')
+        self.aip_path = os.path.join(self.aips_dir, 'aip-bag')
+        shutil.copytree(os.path.join(self.aips_dir, 'aip-bag_copy'), self.aip_path)
+        self.aip = AIP(self.aips_dir, 'bmac', 'dpx', 'coll-1', 'folder', 'av', 'aip-bag', 'title', 'InC', 1, True)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        if os.path.exists(self.aip_path):
+            shutil.rmtree(self.aip_path)
+
+    def test_complete(self):
+        """Test for a complete bag, where the MD5s are saved"""
+        read_bag_manifest(self.aip, self.aip_path)
+
+        result = sorted((path, self.aip.bag_md5s[file_info]) for path, file_info in self.aip.inventory.items()
+                        if file_info in self.aip.bag_md5s)
+        expected = [(os.path.join('data', 'Frames', 'frame_0001.txt'), '01c85b1ef9ffdbb7fb5e196644a63d1e'),
+                    (os.path.join('data', 'Frames', 'frame_0002.txt'), 'b7bcfc2603a7cd9dc3a782f5d96538be'),
+                    (os.path.join('data', 'audio.wav'), '99cc5f0593d9103212d5684552c0dca9')]
+        self.assertEqual(expected, result, "Problem with complete")
+
+    def test_in_folder(self):
+        """Test for a bag in a folder within the AIP folder, where the MD5s are saved"""
+        os.mkdir(os.path.join(self.aips_dir, 'aip-folder'))
+        os.replace(self.aip_path, os.path.join(self.aips_dir, 'aip-folder', 'aip-bag'))
+        os.replace(os.path.join(self.aips_dir, 'aip-folder'), self.aip_path)
+        read_bag_manifest(self.aip, self.aip_path)
+
+        result = len(self.aip.bag_md5s)
+        self.assertEqual(3, result, "Problem with in folder")
+
+    def test_incomplete(self):
+        """Test for a bag that is missing a file, so the Payload-Oxum does not match and the MD5s are not saved"""
+        os.remove(os.path.join(self.aip_path, 'data', 'audio.wav'))
+        read_bag_manifest(self.aip, self.aip_path)
+
+        result = self.aip.bag_md5s
+        self.assertEqual({}, result, "Problem with incomplete")
+
+    def test_not_bag(self):
+        """Test for an AIP folder that is not a bag, so no MD5s are saved"""
+        os.remove(os.path.join(self.aip_path, 'bagit.txt'))
+        read_bag_manifest(self.aip, self.aip_path)
+
+        result = self.aip.bag_md5s
+        self.assertEqual({}, result, "Problem with not bag")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Testing for the function run_tool, which takes an AIP instance, tool name, and command,
+runs the command, and adds an event with the exit code, size of the error output, time, and resource usage,
+which is also added to the total for the tool in the log."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from aip_functions import AIP, run_tool
+
+
+class TestRunTool(unittest.TestCase):
+
+    def setUp(self):
+        """Makes an AIP instance with an events file, which is used in each test"""
+        self.aip = AIP(os.getcwd(), 'dept', None, 'coll-1', 'aip-folder', 'general', 'aip-1', 'title', 'InC', 1,
+                       to_zip=False)
+        self.aip.events = os.path.join(os.getcwd(), 'aip_events.jsonl')
+
+    def tearDown(self):
+        """Deletes the events file, if present"""
+        if os.path.exists('aip_events.jsonl'):
+            os.remove('aip_events.jsonl')
+
+    def read_event(self):
+        """Returns the event from the events file, without the time, and with the seconds and resource usage,
+        which vary, replaced by if they are a number"""
+        with open('aip_events.jsonl', encoding='utf-8') as events_file:
+            result = [json.loads(line) for line in events_file]
+        for line in result:
+            del line['time']
+            for key in ('seconds', 'user_seconds', 'system_seconds', 'peak_rss_mb', 'read_blocks', 'write_blocks'):
+                if key in line:
+                    line[key] = line[key] >= 0
+        return result
+
+    def test_error(self):
+        """Test for a tool with an exit code and error output"""
+        output = run_tool(self.aip, 'python', [sys.executable, '-c', 'import sys; sys.exit("error!")'],
+                          stderr=subprocess.PIPE)
+        self.assertEqual(1, output.returncode, "Problem with error, output")
+
+        result = self.read_event()
+        expected = [{'aip': 'aip-1', 'event': 'tool', 'tool': 'python', 'exit_code': 1,
+                     'stderr_bytes': len(os.linesep) + 6, 'seconds': True}]
+        if hasattr(os, 'wait4'):
+            expected[0].update({'user_seconds': True, 'system_seconds': True, 'peak_rss_mb': True,
+                                'read_blocks': True, 'write_blocks': True})
+        self.assertEqual(expected, result, "Problem with error, event")
+
+    def test_no_stderr(self):
+        """Test for a tool where the error output is not saved, so its size is not known"""
+        output = run_tool(self.aip, 'python', [sys.executable, '-c', 'print("success")'], stdout=subprocess.PIPE)
+        self.assertEqual(b'success', output.stdout.strip(), "Problem with no stderr, output")
+
+        result = self.read_event()
+        expected = [{'aip': 'aip-1', 'event': 'tool', 'tool': 'python', 'exit_code': 0, 'stderr_bytes': None,
+                     'seconds': True}]
+        if hasattr(os, 'wait4'):
+            expected[0].update({'user_seconds': True, 'system_seconds': True, 'peak_rss_mb': True,
+                                'read_blocks': True, 'write_blocks': True})
+        self.assertEqual(expected, result, "Problem with no stderr, event")
+
+    @unittest.skipUnless(hasattr(os, 'wait4'), 'Resource usage is not available on Windows')
+    def test_tool_usage(self):
+        """Test for adding the resource usage of two runs of a tool to the total for the tool in the log"""
+        run_tool(self.aip, 'python', [sys.executable, '-c', 'x = bytearray(50000000)'])
+        first_run = dict(self.aip.log['ToolUsage']['python'])
+        run_tool(self.aip, 'python', [sys.executable, '-c', 'pass'])
+        total = self.aip.log['ToolUsage']['python']
+
+        # The usage varies, so it tests that the peak memory is at least the memory used and that the totals grew.
+        result = [first_run['RSS'] >= 50, total['RSS'] == first_run['RSS'], total['CPU'] > first_run['CPU'],
+                  total['Read'] >= first_run['Read'], total['Write'] >= first_run['Write']]
+        self.assertEqual([True, True, True, True, True], result, "Problem with tool usage")
+
+
+    @unittest.skipUnless(hasattr(os, 'wait4'), 'Resource usage is not available on Windows')
+    def test_log_without_tool_usage(self):
+        """Test for an AIP whose log was made without the ToolUsage key, like the logs made by other tests"""
+        self.aip.log = {'Started': '2025-08-13 2:15PM', 'AIP': 'aip-1', 'Complete': 'n/a'}
+        run_tool(self.aip, 'python', [sys.executable, '-c', 'pass'])
+        result = sorted(self.aip.log['ToolUsage']['python'])
+        self.assertEqual(['CPU', 'RSS', 'Read', 'Write'], result, "Problem with log without tool usage")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Testing for the function run_with_rusage, which takes a command and the same arguments as subprocess.run(),
+runs the command, and returns the CompletedProcess and the resources used by the command and its child processes."""
+
+import os
+import subprocess
+import sys
+import unittest
+from aip_functions import run_with_rusage
+
+
+class TestRunWithRusage(unittest.TestCase):
+
+    def test_input_output(self):
+        """Test for a command with input, output, and error output, which are larger than the pipe buffer"""
+        script = 'import sys; data = sys.stdin.buffer.read(); sys.stdout.buffer.write(data); ' \
+                 'sys.stderr.buffer.write(data[:10]); sys.exit(3)'
+        output, usage = run_with_rusage([sys.executable, '-c', script], input=b'x' * 1000000,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        result = [output.returncode, len(output.stdout), output.stderr]
+        expected = [3, 1000000, b'xxxxxxxxxx']
+        self.assertEqual(expected, result, "Problem with input output")
+
+    def test_no_pipes(self):
+        """Test for a command where the output is not saved, like running bzip2"""
+        output, usage = run_with_rusage(f'"{sys.executable}" -c "pass"', shell=True)
+        result = [output.returncode, output.stdout, output.stderr]
+        expected = [0, None, None]
+        self.assertEqual(expected, result, "Problem with no pipes")
+
+    @unittest.skipUnless(hasattr(os, 'wait4'), 'Resource usage is not available on Windows')
+    def test_usage(self):
+        """Test for the resource usage including a process started by the command (the shell runs Python),
+        which is tested with the peak memory, since the other usage varies"""
+        output, usage = run_with_rusage(f'"{sys.executable}" -c "x = bytearray(100000000)"; exit 0', shell=True)
+        result = [sorted(usage), usage['peak_rss_mb'] >= 100, usage['user_seconds'] + usage['system_seconds'] > 0]
+        expected = [['peak_rss_mb', 'read_blocks', 'system_seconds', 'user_seconds', 'write_blocks'], True, True]
+        self.assertEqual(expected, result, "Problem with usage")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Testing for the function scan_aip, which takes an AIP class instance and the path to the AIP folder as input
+and makes or updates the inventory of every file in the AIP folder."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, FileInfo, scan_aip
+
+
+class TestScanAip(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIP and the AIP instance"""
+        self.aips_dir = os.path.join(os.getcwd(), 'scan_aip')
+        self.aip_path = os.path.join(self.aips_dir, 'aip-id')
+        shutil.copytree(os.path.join(self.aips_dir, 'aip-id_copy'), self.aip_path)
+        self.aip = AIP(self.aips_dir, 'dept', None, 'coll-1', 'folder', 'general', 'aip-id', 'title', 'InC', 1, True)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        if os.path.exists(self.aip_path):
+            shutil.rmtree(self.aip_path)
+
+    def test_first_scan(self):
+        """Test for making the inventory"""
+        scan_aip(self.aip, self.aip_path)
+
+        result = sorted((path, info.size) for path, info in self.aip.inventory.items())
+        expected = [(os.path.join('metadata', 'aip-id_files.csv'), 9),
+                    (os.path.join('objects', 'Folder', 'Folder Text.txt'), 17),
+                    (os.path.join('objects', 'Text.txt'), 10)]
+        self.assertEqual(expected, result, "Problem with first scan, inventory")
+
+        text_path = os.path.join(self.aip_path, 'objects', 'Text.txt')
+        result = self.aip.inventory[os.path.join('objects', 'Text.txt')]
+        expected = FileInfo(10, os.path.getmtime(text_path), os.stat(text_path).st_ino)
+        self.assertEqual(expected, result, "Problem with first scan, file information")
+
+    def test_update(self):
+        """Test for updating the inventory after files are added, deleted, and moved"""
+        scan_aip(self.aip, self.aip_path)
+        os.remove(os.path.join(self.aip_path, 'objects', 'Text.txt'))
+        with open(os.path.join(self.aip_path, 'objects', 'Folder', 'New.txt'), 'w') as new_file:
+            new_file.write('New')
+        os.makedirs(os.path.join(self.aip_path, 'data'))
+        os.replace(os.path.join(self.aip_path, 'objects'), os.path.join(self.aip_path, 'data', 'objects'))
+        scan_aip(self.aip, self.aip_path)
+
+        result = sorted((path, info.size) for path, info in self.aip.inventory.items())
+        expected = [(os.path.join('data', 'objects', 'Folder', 'Folder Text.txt'), 17),
+                    (os.path.join('data', 'objects', 'Folder', 'New.txt'), 3),
+                    (os.path.join('metadata', 'aip-id_files.csv'), 9)]
+        self.assertEqual(expected, result, "Problem with update, inventory")
+
+    def test_unchanged_folder(self):
+        """Test that the saved listing is used for a folder that has not changed since it was last scanned"""
+        metadata = os.path.join(self.aip_path, 'metadata')
+        os.utime(metadata, ns=(0, 0))
+        scan_aip(self.aip, self.aip_path)
+
+        # Replaces the saved listing with a different file, which is in the inventory if the saved listing is reused.
+        folder_stat = os.stat(metadata)
+        key = (folder_stat.st_dev, folder_stat.st_ino)
+        self.aip.folder_listings[key] = (0, [('Saved.csv', FileInfo(1, 0, 0))])
+        scan_aip(self.aip, self.aip_path)
+
+        result = self.aip.inventory.get(os.path.join('metadata', 'Saved.csv'))
+        expected = FileInfo(1, 0, 0)
+        self.assertEqual(expected, result, "Problem with unchanged folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
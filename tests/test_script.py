@@ -19,6 +19,11 @@ def make_aip_log_list(log_path):
     with normalization for inconsistent data."""
     df = pd.read_csv(log_path, dtype=str)
 
+    # Remove the columns for the time of each step and the size of the AIP (Delete_Temp_Seconds to the end),
+    # which are different every time the test runs.
+    if 'Delete_Temp_Seconds' in df.columns:
+        df = df.loc[:, :'Processing_Complete']
+
     # Remove time stamps, which are the last 16 characters, and leaves just the day to allow comparison,
     # as long as the column is from a correct validation (may also be blank or a validation error).
     df['Time_Started'] = df['Time_Started'].str[:-16]
@@ -37,6 +42,12 @@ def make_aip_log_list(log_path):
     return log_list
 
 
+def remove_step_times(printed):
+    """Removes the summary of the time of each step from what the script printed,
+    since the times are different every time the test runs."""
+    return re.sub(r'\nTime of each step \(seconds\):\n(   .*\n)+', '', printed)
+
+
 def make_deletion_log_list(log_path):
     """Reads the deletion log and returns a list of lists, where each list is a row in the log
     The time in the Date Last Modified is removed, leaving just the date, so it is predictable for comparison."""
@@ -58,6 +69,9 @@ def make_directory_list(dir_path):
             # The size in the zipped AIP filenames varies each time.
             if root.endswith("aips-ready-to-ingest") and file.endswith(".tar.bz2"):
                 file = re.sub(r"_bag.\d+.", "_bag.1000.", file)
+            # Skips the FITS configurations, which are named with the MD5 of fits.xml in the local FITS installation.
+            if root.endswith("fits-configs"):
+                continue
             # Skips the FITS tool error log because it is not consistently made and the placeholder files for GitHub.
             if file.endswith("_fits-tool-errors_fitserr.txt") or file == 'Explanation.txt' or file.lower() == 'placeholder.txt':
                 continue
@@ -83,6 +97,16 @@ class TestFullScript(unittest.TestCase):
                 if not file == 'placeholder.txt':
                     os.remove(os.path.join(output_path, file))
 
+        # Deletes the FITS configurations, if made.
+        configs_dir = os.path.join(os.getcwd(), 'staging_for_tests', 'fits-configs')
+        if os.path.exists(configs_dir):
+            shutil.rmtree(configs_dir)
+
+        # Deletes the events file, if made.
+        events_path = os.path.join(os.getcwd(), 'staging_for_tests', 'aip_events.jsonl')
+        if os.path.exists(events_path):
+            os.remove(events_path)
+
         # Deletes the aips-with-errors folder and its contents, if made.
         errors_dir = os.path.join(os.getcwd(), 'staging_for_tests', 'aips-with-errors')
         if os.path.exists(errors_dir):
@@ -100,7 +124,7 @@ class TestFullScript(unittest.TestCase):
                                  shell=True, capture_output=True, text=True)
 
         # Test for the script print statements.
-        result = printed.stdout
+        result = remove_step_times(printed.stdout)
         expected = ('\n>>>Processing test-001-er-000001 (1 of 3).\n'
                     '\n>>>Processing test-001-er-000002 (2 of 3).\n'
                     '\n>>>Processing test-001-er-000003 (3 of 3).\n'
@@ -114,6 +138,7 @@ class TestFullScript(unittest.TestCase):
         bag_two = os.path.join(aips_dir, 'test-001-er-000002_bag')
         bag_three = os.path.join(aips_dir, 'test-001-er-000003_bag')
         expected = [os.path.join(aips_dir, 'aip_log.csv'),
+                    os.path.join(aips_dir, 'fits_tool_times.csv'),
                     os.path.join(aips_dir, 'metadata.csv'),
                     bag_one,
                     os.path.join(bag_one, 'bag-info.txt'),
@@ -169,12 +194,14 @@ class TestFullScript(unittest.TestCase):
         # Test for the contents of the staging directory.
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         result = make_directory_list(staging_dir)
-        expected = [os.path.join(staging_dir, 'aips-already-on-ingest-server'),
+        expected = [os.path.join(staging_dir, 'aip_events.jsonl'),
+                    os.path.join(staging_dir, 'aips-already-on-ingest-server'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', f'manifest_aips_dir_test_{today}.txt'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'test-001-er-000001_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'test-001-er-000002_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'test-001-er-000003_bag.1000.tar.bz2'),
+                    os.path.join(staging_dir, 'fits-configs'),
                     os.path.join(staging_dir, 'fits-xmls'),
                     os.path.join(staging_dir, 'fits-xmls', 'test-001-er-000001_combined-fits.xml'),
                     os.path.join(staging_dir, 'fits-xmls', 'test-001-er-000002_combined-fits.xml'),
@@ -226,7 +253,7 @@ class TestFullScript(unittest.TestCase):
                                  shell=True, capture_output=True, text=True)
 
         # Test for the script print statements.
-        result = printed.stdout
+        result = remove_step_times(printed.stdout)
         expected = ('\n>>>Processing harg-0000-web-202605-0001 (1 of 2).\n'
                     '\n>>>Processing harg-ms1234-web-202605-0003 (2 of 2).\n'
                     '\nScript is finished running.\n')
@@ -237,6 +264,7 @@ class TestFullScript(unittest.TestCase):
         bag_one = os.path.join(aips_dir, 'harg-0000-web-202605-0001_bag')
         bag_two = os.path.join(aips_dir, 'harg-ms1234-web-202605-0003_bag')
         expected = [os.path.join(aips_dir, 'aip_log.csv'),
+                    os.path.join(aips_dir, 'fits_tool_times.csv'),
                     bag_one,
                     os.path.join(bag_one, 'bag-info.txt'),
                     os.path.join(bag_one, 'bagit.txt'),
@@ -288,12 +316,14 @@ class TestFullScript(unittest.TestCase):
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         today = datetime.date.today().strftime('%Y-%m-%d')
         result = make_directory_list(staging_dir)
-        expected = [os.path.join(staging_dir, 'aips-already-on-ingest-server'),
+        expected = [os.path.join(staging_dir, 'aip_events.jsonl'),
+                    os.path.join(staging_dir, 'aips-already-on-ingest-server'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'harg-0000-web-202605-0001_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'harg-ms1234-web-202605-0003_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest',
                                  f'manifest_aips_dir_hargrett_{today}.txt'),
+                    os.path.join(staging_dir, 'fits-configs'),
                     os.path.join(staging_dir, 'fits-xmls'),
                     os.path.join(staging_dir, 'fits-xmls', 'harg-0000-web-202605-0001_combined-fits.xml'),
                     os.path.join(staging_dir, 'fits-xmls', 'harg-ms1234-web-202605-0003_combined-fits.xml'),
@@ -326,7 +356,7 @@ class TestFullScript(unittest.TestCase):
                                  shell=True, capture_output=True, text=True)
 
         # Test for the script print statements.
-        result = printed.stdout
+        result = remove_step_times(printed.stdout)
         expected = ('\n>>>Processing magil-ggp-2472041-2026-05 (1 of 2).\n'
                     '\n>>>Processing magil-ggp-4607530-2026-05 (2 of 2).\n'
                     '\nScript is finished running.\n')
@@ -337,6 +367,7 @@ class TestFullScript(unittest.TestCase):
         bag_one = os.path.join(aips_dir, 'magil-ggp-2472041-2026-05_bag')
         bag_two = os.path.join(aips_dir, 'magil-ggp-4607530-2026-05_bag')
         expected = [os.path.join(aips_dir, 'aip_log.csv'),
+                    os.path.join(aips_dir, 'fits_tool_times.csv'),
                     bag_one,
                     os.path.join(bag_one, 'bag-info.txt'),
                     os.path.join(bag_one, 'bagit.txt'),
@@ -386,12 +417,14 @@ class TestFullScript(unittest.TestCase):
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         today = datetime.date.today().strftime('%Y-%m-%d')
         result = make_directory_list(staging_dir)
-        expected = [os.path.join(staging_dir, 'aips-already-on-ingest-server'),
+        expected = [os.path.join(staging_dir, 'aip_events.jsonl'),
+                    os.path.join(staging_dir, 'aips-already-on-ingest-server'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'magil-ggp-2472041-2026-05_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'magil-ggp-4607530-2026-05_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest',
                                  f'manifest_aips_dir_magil_{today}.txt'),
+                    os.path.join(staging_dir, 'fits-configs'),
                     os.path.join(staging_dir, 'fits-xmls'),
                     os.path.join(staging_dir, 'fits-xmls', 'magil-ggp-2472041-2026-05_combined-fits.xml'),
                     os.path.join(staging_dir, 'fits-xmls', 'magil-ggp-4607530-2026-05_combined-fits.xml'),
@@ -421,7 +454,7 @@ class TestFullScript(unittest.TestCase):
                                  shell=True, capture_output=True, text=True)
 
         # Test for the script print statements.
-        result = printed.stdout
+        result = remove_step_times(printed.stdout)
         expected = ('\nProblems detected with the provided script arguments:\n'
                     f'   * Provided aips_directory "{aips_dir}" is not a valid directory.\n'
                     '   * Provided aip_type "type_error" is not an expected value (av, general, web).\n'
@@ -429,7 +462,9 @@ class TestFullScript(unittest.TestCase):
         self.assertEqual(expected, result, "Problem with test for error_check")
 
     def test_error_move(self):
-        """Test for there is an error during one AIP's creation and the script skips the rest of the steps for it"""
+        """Test for there is an error during one AIP's creation and the script skips the rest of the steps for it.
+        The error is a date in the PDF metadata that the preservation.xml cannot use, which the preflight check
+        does not look for, so the AIP is moved to an error folder partway through the workflow."""
         # Makes a copy of the test files stored in the script repo, since the test will alter the files.
         aips_dir = os.path.join(os.getcwd(), 'script', 'aips_dir')
         shutil.copytree(os.path.join(os.getcwd(), 'script', 'error_move'), aips_dir)
@@ -440,9 +475,9 @@ class TestFullScript(unittest.TestCase):
                                  shell=True, capture_output=True, text=True)
 
         # Test for the script print statements.
-        result = printed.stdout
+        result = remove_step_times(printed.stdout)
         expected = ('\n>>>Processing test-001-er-000001 (1 of 2).\n'
-                    'Moved to error folder objects_folder_exists\n'
+                    'Moved to error folder preservationxml_not_valid\n'
                     '\n>>>Processing test-001-er-000002 (2 of 2).\n'
                     '\nScript is finished running.\n')
         self.assertEqual(expected, result, "Problem with test for error_move, print statements")
@@ -452,6 +487,7 @@ class TestFullScript(unittest.TestCase):
         result = make_directory_list(aips_dir)
         bag_two = os.path.join(aips_dir, 'test-001-er-000002_bag')
         expected = [os.path.join(aips_dir, 'aip_log.csv'),
+                    os.path.join(aips_dir, 'fits_tool_times.csv'),
                     os.path.join(aips_dir, 'metadata.csv'),
                     bag_two,
                     os.path.join(bag_two, 'bag-info.txt'),
@@ -474,33 +510,116 @@ class TestFullScript(unittest.TestCase):
         # Test for the contents of the staging directory.
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         result = make_directory_list(staging_dir)
-        objects_folder_exists = os.path.join(staging_dir, 'aips-with-errors', 'objects_folder_exists')
-        expected = [os.path.join(staging_dir, 'aips-already-on-ingest-server'),
+        not_valid = os.path.join(staging_dir, 'aips-with-errors', 'preservationxml_not_valid')
+        aip_one = os.path.join(not_valid, 'test-001-er-000001')
+        expected = [os.path.join(staging_dir, 'aip_events.jsonl'),
+                    os.path.join(staging_dir, 'aips-already-on-ingest-server'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', f'manifest_aips_dir_test_{today}.txt'),
                     os.path.join(staging_dir, 'aips-ready-to-ingest', 'test-001-er-000002_bag.1000.tar.bz2'),
                     os.path.join(staging_dir, 'aips-with-errors'),
-                    objects_folder_exists,
-                    os.path.join(objects_folder_exists, 'test-001-er-000001'),
-                    os.path.join(objects_folder_exists, 'test-001-er-000001', 'objects'),
-                    os.path.join(objects_folder_exists, 'test-001-er-000001', 'objects', 'Flower2.JPG'),
+                    not_valid,
+                    aip_one,
+                    os.path.join(aip_one, 'metadata'),
+                    os.path.join(aip_one, 'metadata', 'test-001-er-000001_combined-fits.xml'),
+                    os.path.join(aip_one, 'metadata', 'test-001-er-000001_preservation.xml'),
+                    os.path.join(aip_one, 'metadata', 'Undated.pdf_fits.xml'),
+                    os.path.join(aip_one, 'objects'),
+                    os.path.join(aip_one, 'objects', 'FD001_Dates'),
+                    os.path.join(aip_one, 'objects', 'FD001_Dates', 'Undated.pdf'),
+                    os.path.join(not_valid, 'test-001-er-000001_presxml_validation.txt'),
+                    os.path.join(staging_dir, 'fits-configs'),
+                    os.path.join(staging_dir, 'fits-xmls'),
+                    os.path.join(staging_dir, 'fits-xmls', 'test-001-er-000002_combined-fits.xml'),
+                    os.path.join(staging_dir, 'movs-to-bag'),
+                    os.path.join(staging_dir, 'preservation-xmls'),
+                    os.path.join(staging_dir, 'preservation-xmls', 'test-001-er-000002_preservation.xml')]
+        self.assertEqual(expected, result, 'Problem with test for error_move, staging directory')
+
+        # Test for the contents of the aip_log.csv file.
+        result = make_aip_log_list(os.path.join(aips_dir, 'aip_log.csv'))
+        expected = [['Time_Started', 'AIP_ID', 'Files_Deleted', 'Objects_Folder_Made', 'Metadata_Folder_Made',
+                     'FITS_Tool_Errors', 'FITS_Combination_Errors', 'PreservationXML_Made', 'PreservationXML_Valid',
+                     'Bag_Made', 'Bag_Valid', 'Package_Errors', 'Manifest_Errors', 'Processing_Complete'],
+                    [today, 'test-001-er-000001', 'No', 'Success', 'Success', 'No', 'Success', 'Success',
+                     'Preservation.xml is not valid (see log in error folder)', 'BLANK', 'BLANK', 'BLANK', 'BLANK',
+                     'Error during processing'],
+                    [today, 'test-001-er-000002', 'No', 'Success', 'Success', 'No', 'Success', 'Success',
+                     f'Valid on {today}', 'Success', f'Valid on {today}', 'Success', 'Success', 'Success']]
+        self.assertEqual(expected, result, "Problem with test for error_move, aip log")
+
+    def test_preflight_skip(self):
+        """Test for there is a problem with one AIP folder, which the preflight check finds and the script skips"""
+        # Makes a copy of the test files stored in the script repo, since the test will alter the files.
+        aips_dir = os.path.join(os.getcwd(), 'script', 'aips_dir')
+        shutil.copytree(os.path.join(os.getcwd(), 'script', 'preflight_skip'), aips_dir)
+
+        # Runs the script.
+        script_path = os.path.join('..', 'general_aip.py')
+        printed = subprocess.run(f'python "{script_path}" "{aips_dir}" general tar-bz2',
+                                 shell=True, capture_output=True, text=True)
+
+        # Test for the script print statements.
+        result = remove_step_times(printed.stdout)
+        expected = ('\nProblems detected with the AIP folders, which will be skipped (saved to preflight_issues.csv):\n'
+                    '   * test-001-er-000001\n'
+                    '      - The AIP folder already has a folder named objects\n'
+                    '\n>>>Processing test-001-er-000002 (1 of 1).\n'
+                    '\nScript is finished running.\n')
+        self.assertEqual(expected, result, "Problem with test for preflight_skip, print statements")
+
+        # Test for the contents of the AIP directory.
+        today = datetime.date.today().strftime('%Y-%m-%d')
+        result = make_directory_list(aips_dir)
+        bag_two = os.path.join(aips_dir, 'test-001-er-000002_bag')
+        expected = [os.path.join(aips_dir, 'aip_log.csv'),
+                    os.path.join(aips_dir, 'fits_tool_times.csv'),
+                    os.path.join(aips_dir, 'metadata.csv'),
+                    os.path.join(aips_dir, 'objects'),
+                    os.path.join(aips_dir, 'objects', 'Flower2.JPG'),
+                    os.path.join(aips_dir, 'preflight_issues.csv'),
+                    bag_two,
+                    os.path.join(bag_two, 'bag-info.txt'),
+                    os.path.join(bag_two, 'bagit.txt'),
+                    os.path.join(bag_two, 'data'),
+                    os.path.join(bag_two, 'data', 'metadata'),
+                    os.path.join(bag_two, 'data', 'metadata', 'Test PDF.pdf_fits.xml'),
+                    os.path.join(bag_two, 'data', 'metadata', 'test-001-er-000002_preservation.xml'),
+                    os.path.join(bag_two, 'data', 'metadata', 'Worksheet.csv_fits.xml'),
+                    os.path.join(bag_two, 'data', 'objects'),
+                    os.path.join(bag_two, 'data', 'objects', 'FD001_Text'),
+                    os.path.join(bag_two, 'data', 'objects', 'FD001_Text', 'Test PDF.pdf'),
+                    os.path.join(bag_two, 'data', 'objects', 'FD001_Text', 'Worksheet.csv'),
+                    os.path.join(bag_two, 'manifest-md5.txt'),
+                    os.path.join(bag_two, 'manifest-sha256.txt'),
+                    os.path.join(bag_two, 'tagmanifest-md5.txt'),
+                    os.path.join(bag_two, 'tagmanifest-sha256.txt')]
+        self.assertEqual(expected, result, "Problem with test for preflight_skip, aip directory")
+
+        # Test for the contents of the staging directory.
+        staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
+        result = make_directory_list(staging_dir)
+        expected = [os.path.join(staging_dir, 'aip_events.jsonl'),
+                    os.path.join(staging_dir, 'aips-already-on-ingest-server'),
+                    os.path.join(staging_dir, 'aips-ready-to-ingest'),
+                    os.path.join(staging_dir, 'aips-ready-to-ingest', f'manifest_aips_dir_test_{today}.txt'),
+                    os.path.join(staging_dir, 'aips-ready-to-ingest', 'test-001-er-000002_bag.1000.tar.bz2'),
+                    os.path.join(staging_dir, 'fits-configs'),
                     os.path.join(staging_dir, 'fits-xmls'),
                     os.path.join(staging_dir, 'fits-xmls', 'test-001-er-000002_combined-fits.xml'),
                     os.path.join(staging_dir, 'movs-to-bag'),
                     os.path.join(staging_dir, 'preservation-xmls'),
                     os.path.join(staging_dir, 'preservation-xmls', 'test-001-er-000002_preservation.xml')]
-        self.assertEqual(expected, result, 'Problem with test for move_error, staging directory')
+        self.assertEqual(expected, result, 'Problem with test for preflight_skip, staging directory')
 
         # Test for the contents of the aip_log.csv file.
         result = make_aip_log_list(os.path.join(aips_dir, 'aip_log.csv'))
         expected = [['Time_Started', 'AIP_ID', 'Files_Deleted', 'Objects_Folder_Made', 'Metadata_Folder_Made',
                      'FITS_Tool_Errors', 'FITS_Combination_Errors', 'PreservationXML_Made', 'PreservationXML_Valid',
                      'Bag_Made', 'Bag_Valid', 'Package_Errors', 'Manifest_Errors', 'Processing_Complete'],
-                    [today, 'test-001-er-000001', 'No', 'Objects folder already exists in original files', 'BLANK',
-                     'BLANK', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'BLANK', 'Error during processing'],
                     [today, 'test-001-er-000002', 'No', 'Success', 'Success', 'No', 'Success', 'Success',
                      f'Valid on {today}', 'Success', f'Valid on {today}', 'Success', 'Success', 'Success']]
-        self.assertEqual(expected, result, "Problem with test for move_error, aip log")
+        self.assertEqual(expected, result, "Problem with test for preflight_skip, aip log")
 
 
 if __name__ == "__main__":
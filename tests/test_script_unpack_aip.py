@@ -0,0 +1,74 @@
+"""Testing for the script unpack_aip.py, which unpacks a packaged AIP and validates the bag while unpacking"""
+
+import bagit
+import os
+import shutil
+import subprocess
+import unittest
+
+
+class MyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the folder with the unpacked bags"""
+        output_path = os.path.join(os.getcwd(), 'script_unpack_aip', 'output')
+        if os.path.exists(output_path):
+            shutil.rmtree(output_path)
+
+    def test_exists(self):
+        """Test for when the bag is already in the output folder"""
+        # Makes the output folder with a bag folder already present and runs the script.
+        output_path = os.path.join(os.getcwd(), 'script_unpack_aip', 'output')
+        os.makedirs(os.path.join(output_path, 'test-100-er-000001_bag'))
+        script_path = os.path.join('..', 'unpack_aip.py')
+        package_path = os.path.join('script_unpack_aip', 'test-100-er-000001_bag.1234.tar.bz2')
+        printed = subprocess.run(f'python {script_path} {package_path} {output_path}',
+                                 shell=True, capture_output=True, text=True)
+
+        # Verifies the script printed the error and exited with an error.
+        expected = '\nCannot unpack the AIP:\n   * Bag "test-100-er-000001_bag" is already in the output folder.\n'
+        self.assertEqual(expected, printed.stdout, "Problem with test for exists, printed")
+        self.assertEqual(1, printed.returncode, "Problem with test for exists, exit code")
+
+    def test_not_valid(self):
+        """Test for a package with a file that was edited after it was bagged"""
+        # Makes the output folder and runs the script.
+        output_path = os.path.join(os.getcwd(), 'script_unpack_aip', 'output')
+        os.mkdir(output_path)
+        script_path = os.path.join('..', 'unpack_aip.py')
+        package_path = os.path.join('script_unpack_aip', 'test-100-er-000002_bag.1234.tar.bz2')
+        printed = subprocess.run(f'python {script_path} {package_path} {output_path}',
+                                 shell=True, capture_output=True, text=True)
+
+        # Verifies the script printed the validation errors and exited with an error.
+        expected = ('\nBag is not valid:\n'
+                    '   * data/objects/Text.txt md5 validation failed: '
+                    'expected="ebf0a715c9238357ef12b3fdc5e0cae4" found="889341a1b0df94f0cf4894ba1f3eff70"\n'
+                    '   * data/objects/Text.txt sha256 validation failed: '
+                    'expected="5e4ed6db0b6031fb606abda93d2a98fb45b10e2bc8f3b71cb1d5d459f65c0b5e" '
+                    'found="99148c9e912144639a403fdda474ffcf014a75aa4801636f16c98551ea077d7b"\n'
+                    '   * Payload-Oxum validation failed: expected 49.3, found 42.3\n')
+        self.assertEqual(expected, printed.stdout, "Problem with test for not_valid, printed")
+        self.assertEqual(1, printed.returncode, "Problem with test for not_valid, exit code")
+
+    def test_valid(self):
+        """Test for a package that unpacks to a valid bag"""
+        # Makes the output folder and runs the script.
+        output_path = os.path.join(os.getcwd(), 'script_unpack_aip', 'output')
+        os.mkdir(output_path)
+        script_path = os.path.join('..', 'unpack_aip.py')
+        package_path = os.path.join('script_unpack_aip', 'test-100-er-000001_bag.1234.tar.bz2')
+        printed = subprocess.run(f'python {script_path} {package_path} {output_path}',
+                                 shell=True, capture_output=True, text=True)
+
+        # Verifies the script printed the bag is valid.
+        bag_path = os.path.join(output_path, 'test-100-er-000001_bag')
+        self.assertEqual(f'\nBag is valid: {bag_path}\n', printed.stdout, "Problem with test for valid, printed")
+
+        # Verifies bagit also finds the unpacked bag is valid, so it is ready for finish_aip.py.
+        result = bagit.Bag(bag_path).is_valid()
+        self.assertEqual(True, result, "Problem with test for valid, bagit validation")
+
+
+if __name__ == '__main__':
+    unittest.main()
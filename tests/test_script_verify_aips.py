@@ -0,0 +1,117 @@
+"""Testing for the script verify_aips.py, which compares the packaged AIPs in a folder to the manifests
+and saves the results to verification_results.csv"""
+
+import csv
+import os
+import shutil
+import subprocess
+import unittest
+
+
+def results_to_list(results_path):
+    """Return a list with the package name and result from each row in verification_results.csv
+    The MD5, size, and time columns are not included because they vary each time the test is run.
+    """
+    with open(results_path, 'r', newline='') as results_file:
+        return [[row['Package'], row['Manifest'], row['Result']] for row in csv.DictReader(results_file)]
+
+
+class MyTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copy of files used for testing"""
+        test_data = os.path.join(os.getcwd(), 'script_verify_aips', 'aips_ready')
+        if os.path.exists(test_data):
+            shutil.rmtree(test_data)
+
+    def test_arguments(self):
+        """Test for missing and incorrect script arguments, which are printed and end the script with an error"""
+        script_path = os.path.join('..', 'verify_aips.py')
+        usage = '\nTo run: python verify_aips.py aips_ready_path [manifests_path]\n'
+
+        # No arguments.
+        printed = subprocess.run(f'python {script_path}', shell=True, capture_output=True, text=True)
+        expected = ('\nProblems detected with the provided script arguments:\n'
+                    '   * Required argument is missing: aips_ready_path.\n' + usage, 1)
+        self.assertEqual(expected, (printed.stdout, printed.returncode), "Problem with test for arguments, missing")
+
+        # Paths that are not valid and too many arguments.
+        printed = subprocess.run(f'python {script_path} missing-aips missing-manifests extra',
+                                 shell=True, capture_output=True, text=True)
+        expected = ('\nProblems detected with the provided script arguments:\n'
+                    '   * Provided aips_ready_path "missing-aips" is not a valid directory.\n'
+                    '   * Provided manifests_path "missing-manifests" is not a valid directory.\n'
+                    '   * Too many script arguments. The maximum expected is 2.\n' + usage, 1)
+        self.assertEqual(expected, (printed.stdout, printed.returncode), "Problem with test for arguments, not valid")
+
+    def test_errors(self):
+        """Test for AIPs that are missing, extra, or do not match the manifest"""
+        # Makes a copy of the test data, since the script adds the results file.
+        test_data = os.path.join(os.getcwd(), 'script_verify_aips', 'aips_ready')
+        shutil.copytree(os.path.join(os.getcwd(), 'script_verify_aips', 'errors'), test_data)
+
+        # Runs the script.
+        script_path = os.path.join('..', 'verify_aips.py')
+        printed = subprocess.run(f'python {script_path} {test_data}', shell=True, capture_output=True, text=True)
+
+        # Verifies the script printed the problems and exited with an error.
+        expected = ('\nMissing:\n   * test-001-er-000005_bag.5000.tar.bz2\n'
+                    '\nExtra:\n   * test-001-er-000004_bag.4000.tar.bz2\n'
+                    '\nMismatch:\n   * test-001-er-000003_bag.3000.tar\n'
+                    '\nVerified 0 of 3 AIPs.\n')
+        self.assertEqual(expected, printed.stdout, "Problem with test for errors, printed")
+        self.assertEqual(1, printed.returncode, "Problem with test for errors, exit code")
+
+        # Verifies the contents of verification_results.csv.
+        result = results_to_list(os.path.join(test_data, 'verification_results.csv'))
+        expected = [['test-001-er-000003_bag.3000.tar', 'manifest_aips_dept_2026-10-19.txt', 'Mismatch'],
+                    ['test-001-er-000004_bag.4000.tar.bz2', '', 'Extra'],
+                    ['test-001-er-000005_bag.5000.tar.bz2', 'manifest_aips_dept_2026-10-19.txt', 'Missing']]
+        self.assertEqual(expected, result, "Problem with test for errors, verification_results.csv")
+
+    def test_rerun(self):
+        """Test for running the script a second time, when only AIPs that changed are hashed again"""
+        # Makes a copy of the test data and runs the script the first time.
+        test_data = os.path.join(os.getcwd(), 'script_verify_aips', 'aips_ready')
+        shutil.copytree(os.path.join(os.getcwd(), 'script_verify_aips', 'valid'), test_data)
+        script_path = os.path.join('..', 'verify_aips.py')
+        subprocess.run(f'python {script_path} {test_data}', shell=True, capture_output=True)
+        with open(os.path.join(test_data, 'verification_results.csv'), 'r', newline='') as results_file:
+            first_run = {row['Package']: row['Time_Verified'] for row in csv.DictReader(results_file)}
+
+        # Changes one AIP and runs the script again.
+        with open(os.path.join(test_data, 'test-001-er-000002_bag.2000.tar.bz2'), 'a') as changed:
+            changed.write('Changed after the first verification')
+        subprocess.run(f'python {script_path} {test_data}', shell=True, capture_output=True)
+        with open(os.path.join(test_data, 'verification_results.csv'), 'r', newline='') as results_file:
+            second_run = {row['Package']: (row['Time_Verified'], row['Result']) for row in csv.DictReader(results_file)}
+
+        # Verifies the unchanged AIP kept the result from the first run and the changed AIP was hashed again.
+        result = second_run['test-001-er-000001_bag.1000.tar.bz2']
+        expected = (first_run['test-001-er-000001_bag.1000.tar.bz2'], 'Valid')
+        self.assertEqual(expected, result, "Problem with test for rerun, unchanged AIP")
+        result = second_run['test-001-er-000002_bag.2000.tar.bz2'][1]
+        self.assertEqual('Mismatch', result, "Problem with test for rerun, changed AIP")
+
+    def test_valid(self):
+        """Test for AIPs that all match the manifest"""
+        # Makes a copy of the test data, since the script adds the results file.
+        test_data = os.path.join(os.getcwd(), 'script_verify_aips', 'aips_ready')
+        shutil.copytree(os.path.join(os.getcwd(), 'script_verify_aips', 'valid'), test_data)
+
+        # Runs the script.
+        script_path = os.path.join('..', 'verify_aips.py')
+        printed = subprocess.run(f'python {script_path} {test_data}', shell=True, capture_output=True, text=True)
+
+        # Verifies the script printed the summary.
+        self.assertEqual('\nVerified 2 of 2 AIPs.\n', printed.stdout, "Problem with test for valid, printed")
+
+        # Verifies the contents of verification_results.csv.
+        result = results_to_list(os.path.join(test_data, 'verification_results.csv'))
+        expected = [['test-001-er-000001_bag.1000.tar.bz2', 'manifest_aips_test_2026-10-19.txt', 'Valid'],
+                    ['test-001-er-000002_bag.2000.tar.bz2', 'manifest_aips_test_2026-10-19.txt', 'Valid']]
+        self.assertEqual(expected, result, "Problem with test for valid, verification_results.csv")
+
+
+if __name__ == '__main__':
+    unittest.main()
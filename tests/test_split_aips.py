@@ -0,0 +1,113 @@
+"""Testing for the function split_aips, which takes the AIPs directory, AIP type, metadata.csv, metadata rows,
+and the limits for the number of files and size as input, and splits any AIP folder over a limit into multiple AIPs."""
+
+import os
+import shutil
+import unittest
+from aip_functions import check_metadata_csv, split_aips
+from test_script import make_directory_list
+
+
+class TestSplitAips(unittest.TestCase):
+
+    def setUp(self):
+        """Makes a copy of the test AIPs directory and reads its metadata.csv"""
+        self.aips_dir = os.path.join(os.getcwd(), 'split_aips', 'aips')
+        shutil.copytree(os.path.join(os.getcwd(), 'split_aips', 'aips_copy'), self.aips_dir)
+        self.md_csv = os.path.join(self.aips_dir, 'metadata.csv')
+        self.md_rows, errors = check_metadata_csv(self.md_csv, self.aips_dir)
+
+    def tearDown(self):
+        """Deletes the copy of the test AIPs directory"""
+        if os.path.exists(self.aips_dir):
+            shutil.rmtree(self.aips_dir)
+
+    def test_files_limit(self):
+        """Test for an AIP over the file limit, which is split into balanced parts keeping the original folder"""
+        md_rows = split_aips(self.aips_dir, 'general', self.md_csv, self.md_rows, 2, None)
+
+        # Test for the AIPs directory.
+        result = make_directory_list(self.aips_dir)
+        part_1 = os.path.join(self.aips_dir, 'test-001-er-000001-01', 'Big Folder')
+        part_2 = os.path.join(self.aips_dir, 'test-001-er-000001-02', 'Big Folder')
+        part_3 = os.path.join(self.aips_dir, 'test-001-er-000001-03', 'Big Folder')
+        expected = [os.path.join(self.aips_dir, 'metadata.csv'),
+                    os.path.join(self.aips_dir, 'metadata_before_split.csv'),
+                    os.path.join(self.aips_dir, 'test-001-er-000001-01'),
+                    part_1,
+                    os.path.join(part_1, 'Dir A'),
+                    os.path.join(part_1, 'Dir A', 'a1.txt'),
+                    os.path.join(part_1, 'Dir A', 'a2.txt'),
+                    os.path.join(self.aips_dir, 'test-001-er-000001-02'),
+                    part_2,
+                    os.path.join(part_2, 'Dir B'),
+                    os.path.join(part_2, 'Dir B', 'b1.txt'),
+                    os.path.join(part_2, 'Dir B', 'b2.txt'),
+                    os.path.join(self.aips_dir, 'test-001-er-000001-03'),
+                    part_3,
+                    os.path.join(part_3, 'top.txt'),
+                    os.path.join(self.aips_dir, 'test-001-er-000002'),
+                    os.path.join(self.aips_dir, 'test-001-er-000002', 'file.txt')]
+        self.assertEqual(expected, result, "Problem with files limit, AIPs directory")
+
+        # Test for the returned rows and the updated metadata.csv, which should be the same.
+        rights = 'http://rightsstatements.org/vocab/InC/1.0/'
+        expected = [['test', 'test-001', 'test-001-er-000001-01', 'test-001-er-000001-01', 'Big Part 1 of 3', rights, '1'],
+                    ['test', 'test-001', 'test-001-er-000001-02', 'test-001-er-000001-02', 'Big Part 2 of 3', rights, '1'],
+                    ['test', 'test-001', 'test-001-er-000001-03', 'test-001-er-000001-03', 'Big Part 3 of 3', rights, '1'],
+                    ['test', 'test-001', 'test-001-er-000002', 'test-001-er-000002', 'Small', rights, '1']]
+        self.assertEqual(expected, [list(row) for row in md_rows], "Problem with files limit, rows")
+        csv_rows, errors = check_metadata_csv(self.md_csv, self.aips_dir)
+        self.assertEqual((expected, []), ([list(row) for row in csv_rows], errors),
+                         "Problem with files limit, metadata.csv")
+
+    def test_size_limit(self):
+        """Test for an AIP over the size limit, which is split into parts of about the same size"""
+        md_rows = split_aips(self.aips_dir, 'general', self.md_csv, self.md_rows, None, 30)
+
+        result = make_directory_list(self.aips_dir)
+        part_1 = os.path.join(self.aips_dir, 'test-001-er-000001-01', 'Big Folder')
+        part_2 = os.path.join(self.aips_dir, 'test-001-er-000001-02', 'Big Folder')
+        expected = [os.path.join(self.aips_dir, 'metadata.csv'),
+                    os.path.join(self.aips_dir, 'metadata_before_split.csv'),
+                    os.path.join(self.aips_dir, 'test-001-er-000001-01'),
+                    part_1,
+                    os.path.join(part_1, 'Dir A'),
+                    os.path.join(part_1, 'Dir A', 'a1.txt'),
+                    os.path.join(part_1, 'Dir A', 'a2.txt'),
+                    os.path.join(self.aips_dir, 'test-001-er-000001-02'),
+                    part_2,
+                    os.path.join(part_2, 'Dir B'),
+                    os.path.join(part_2, 'Dir B', 'b1.txt'),
+                    os.path.join(part_2, 'Dir B', 'b2.txt'),
+                    os.path.join(part_2, 'top.txt'),
+                    os.path.join(self.aips_dir, 'test-001-er-000002'),
+                    os.path.join(self.aips_dir, 'test-001-er-000002', 'file.txt')]
+        self.assertEqual(expected, result, "Problem with size limit, AIPs directory")
+
+        result = [row.AIP_ID for row in md_rows]
+        expected = ['test-001-er-000001-01', 'test-001-er-000001-02', 'test-001-er-000002']
+        self.assertEqual(expected, result, "Problem with size limit, rows")
+
+    def test_one_file(self):
+        """Test for an AIP folder named with the AIP ID that is one file over the size limit, so it is not split"""
+        md_rows = split_aips(self.aips_dir, 'general', self.md_csv, self.md_rows, None, 3)
+
+        result = [row.AIP_ID for row in md_rows]
+        expected = ['test-001-er-000001-01', 'test-001-er-000001-02', 'test-001-er-000001-03',
+                    'test-001-er-000001-04', 'test-001-er-000001-05', 'test-001-er-000002']
+        self.assertEqual(expected, result, "Problem with one file, rows")
+        result = os.path.exists(os.path.join(self.aips_dir, 'test-001-er-000002', 'file.txt'))
+        self.assertEqual(True, result, "Problem with one file, AIP folder")
+
+    def test_not_general(self):
+        """Test for an AIP over the limit that is not a general AIP, so it is not split"""
+        md_rows = split_aips(self.aips_dir, 'av', self.md_csv, self.md_rows, 2, None)
+
+        self.assertEqual(self.md_rows, md_rows, "Problem with not general, rows")
+        result = os.path.exists(os.path.join(self.aips_dir, 'metadata_before_split.csv'))
+        self.assertEqual(False, result, "Problem with not general, metadata.csv")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""Testing for the function step_time_summary, which takes the logs of the AIPs made in a batch
+and returns the number of AIPs and the total, median, 90th percentile, and maximum seconds for each step."""
+
+import unittest
+from aip_functions import step_time_summary
+
+
+class TestStepTimeSummary(unittest.TestCase):
+
+    def test_one_aip(self):
+        """Test for a batch with one AIP, which had an error during the FITS step"""
+        aip_logs = [{'StepTimes': {'Delete_Temp': 0.5, 'Structure': 1.0, 'FITS': 4.0}}]
+        result = step_time_summary(aip_logs)
+        expected = {'Delete_Temp': {'AIPs': 1, 'Total': 0.5, 'Median': 0.5, 'P90': 0.5, 'Max': 0.5},
+                    'Structure': {'AIPs': 1, 'Total': 1.0, 'Median': 1.0, 'P90': 1.0, 'Max': 1.0},
+                    'FITS': {'AIPs': 1, 'Total': 4.0, 'Median': 4.0, 'P90': 4.0, 'Max': 4.0}}
+        self.assertEqual(expected, result, "Problem with one aip")
+
+    def test_multiple_aips(self):
+        """Test for a batch with ten AIPs, where one did not run the FITS step"""
+        aip_logs = [{'StepTimes': {'Delete_Temp': 1.0, 'FITS': float(number)}} for number in range(1, 10)]
+        aip_logs.append({'StepTimes': {'Delete_Temp': 1.0}})
+        result = step_time_summary(aip_logs)
+        expected = {'Delete_Temp': {'AIPs': 10, 'Total': 10.0, 'Median': 1.0, 'P90': 1.0, 'Max': 1.0},
+                    'FITS': {'AIPs': 9, 'Total': 45.0, 'Median': 5.0, 'P90': 9.0, 'Max': 9.0}}
+        self.assertEqual(expected, result, "Problem with multiple aips")
+
+    def test_no_aips(self):
+        """Test for a batch where no AIPs were made"""
+        result = step_time_summary([])
+        self.assertEqual({}, result, "Problem with no aips")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Testing for the function stream_warcs, which takes an AIP class instance and the folder FITS would run on
+as input and characterizes the WARCs by reading their records, so FITS does not need to run on them."""
+
+import os
+import shutil
+import unittest
+from aip_functions import AIP, stream_warcs
+from format_signatures import Signature
+from test_script import make_directory_list
+
+
+class TestStreamWarcs(unittest.TestCase):
+
+    def tearDown(self):
+        """Deletes the copy of the test AIP"""
+        aip_path = os.path.join(os.getcwd(), 'stream_warcs', 'aip-web')
+        if os.path.exists(aip_path):
+            shutil.rmtree(aip_path)
+
+    def test_warcs(self):
+        """Test for an AIP with a WARC, a damaged WARC, and a text file"""
+        # Makes the test input and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'stream_warcs')
+        shutil.copytree(os.path.join(aips_dir, 'aip-web_copy'), os.path.join(aips_dir, 'aip-web'))
+        aip = AIP(aips_dir, 'magil', None, 'coll-1', 'folder', 'web', 'aip-web', 'title', 'InC', 1, True)
+        objects = os.path.join(aips_dir, 'aip-web', 'objects')
+        fits_input, warcs = stream_warcs(aip, objects)
+
+        # Test for the FITS input, which should have the files that are not a readable WARC.
+        expected_input = os.path.join(aips_dir, 'aip-web', 'fits-input')
+        self.assertEqual(expected_input, fits_input, "Problem with WARCs, fits_input")
+        result = make_directory_list(fits_input)
+        expected = [os.path.join(fits_input, 'Crawl.warc.txt'), os.path.join(fits_input, 'Damaged.warc')]
+        self.assertEqual(expected, result, "Problem with WARCs, fits-input folder")
+
+        # Test for the WARC information.
+        signature = Signature('WARC', '1.0', 'fmt/289', 'application/warc', ('warc',))
+        expected = [(os.path.join(objects, 'Crawl.warc'), signature, 281, '891437d64a09d8c63814be0b548a4c2d',
+                     ('Heritrix', '3.4.0-20200304'))]
+        self.assertEqual(expected, warcs, "Problem with WARCs, warcs")
+
+
+if __name__ == "__main__":
+    unittest.main()
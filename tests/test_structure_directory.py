@@ -6,10 +6,11 @@ There are a few files that are sorted into metadata and everything else goes int
 KNOWN ISSUE: permissions error for copying web, so that test isn't working.
 """
 
+import csv
 import os
 import shutil
 import unittest
-from aip_functions import AIP, structure_directory
+from aip_functions import AIP, StepResult, structure_directory
 from test_script import make_directory_list
 
 
@@ -35,6 +36,11 @@ class TestStructureDirectory(unittest.TestCase):
             if os.path.exists(aip_folder_path):
                 shutil.rmtree(aip_folder_path)
 
+        # Deletes the DPX journal from aips_directory, if a test did not finish.
+        journal_path = os.path.join(os.getcwd(), 'structure_directory', 'av-aip-2_dpx-moves.csv')
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
         # Deletes files copied to movs-to-bag:
         mov_folder = os.path.join(os.getcwd(), 'staging_for_tests', 'movs-to-bag')
         for file in os.listdir(mov_folder):
@@ -48,7 +54,11 @@ class TestStructureDirectory(unittest.TestCase):
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         aip = AIP(aips_dir, 'dept', None, 'coll-error', 'folder', 'general', 'error-aip-1', 'title', 'InC', 1, True)
         shutil.copytree(os.path.join(aips_dir, 'error-aip-1_copy'), os.path.join(aips_dir, 'error-aip-1'))
-        structure_directory(aip, staging_dir)
+        step_result = structure_directory(aip, staging_dir)
+
+        # Test for the step result.
+        expected = StepResult(False, 'objects_folder_exists')
+        self.assertEqual(expected, step_result, "Problem with error - objects exists, step result")
 
         # Test for the contents of the AIP folder.
         aip_path = os.path.join(staging_dir, 'aips-with-errors', 'objects_folder_exists', 'error-aip-1')
@@ -157,7 +167,11 @@ class TestStructureDirectory(unittest.TestCase):
         staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
         aip = AIP(aips_dir, 'bmac', 'wav', 'coll-bmac', 'folder', 'av', 'av-aip-1', 'title', 'InC', 1, True)
         shutil.copytree(os.path.join(aips_dir, 'av-aip-1_copy'), os.path.join(aips_dir, 'av-aip-1'))
-        structure_directory(aip, staging_dir)
+        step_result = structure_directory(aip, staging_dir)
+
+        # Test for the step result.
+        expected = StepResult(True, None)
+        self.assertEqual(expected, step_result, "Problem with sort_av, step result")
 
         # Test for the contents of the AIP folder.
         aip_path = os.path.join(staging_dir, aips_dir, aip.id)
@@ -219,6 +233,112 @@ class TestStructureDirectory(unittest.TestCase):
         expected = 'Success'
         self.assertEqual(expected, result, "Problem with sort_av_dpx, log: MetadataError")
 
+    def test_sort_av_dpx_resume(self):
+        """Test for an AV AIP from workflow dpx where the script stopped after moving the frame folder"""
+        # Makes test input, with the journal and the frame folder already moved, and runs the function being tested.
+        aips_dir = os.path.join(os.getcwd(), 'structure_directory')
+        staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
+        aip = AIP(aips_dir, 'bmac', 'dpx', 'coll-bmac', 'folder', 'av', 'av-aip-2', 'title', 'InC', 1, True)
+        aip_path = os.path.join(aips_dir, aip.id)
+        shutil.copytree(os.path.join(aips_dir, 'av-aip-2_copy'), aip_path)
+        data = os.path.join(aip_path, 'data')
+        objects = os.path.join(aip_path, 'objects')
+        moves = [['move', os.path.join(data, 'av-aip-2'), os.path.join(objects, 'av-aip-2-dpx')],
+                 ['move', os.path.join(data, 'placeholder.cue'), os.path.join(objects, 'placeholder.cue')],
+                 ['copy', os.path.join(data, 'placeholder.mov'),
+                  os.path.join(staging_dir, 'movs-to-bag', 'placeholder.mov')],
+                 ['move', os.path.join(data, 'placeholder.mov'), os.path.join(objects, 'placeholder.mov')],
+                 ['move', os.path.join(data, 'placeholder.wav'), os.path.join(objects, 'placeholder-dpx.wav')]]
+        with open(os.path.join(aips_dir, 'av-aip-2_dpx-moves.csv'), 'w', newline='') as journal:
+            csv.writer(journal).writerows(moves)
+        os.mkdir(objects)
+        os.mkdir(os.path.join(aip_path, 'metadata'))
+        os.replace(os.path.join(data, 'av-aip-2'), os.path.join(objects, 'av-aip-2-dpx'))
+        step_result = structure_directory(aip, staging_dir)
+
+        # Test for the step result.
+        expected = StepResult(True, None)
+        self.assertEqual(expected, step_result, "Problem with sort_av_dpx_resume, step result")
+
+        # Test for the contents of the AIP folder.
+        # Files not in the journal are left in the data folder and deleted with it.
+        result = make_directory_list(aip_path)
+        expected = [os.path.join(aip_path, 'metadata'),
+                    os.path.join(aip_path, 'objects'),
+                    os.path.join(aip_path, 'objects', 'av-aip-2-dpx'),
+                    os.path.join(aip_path, 'objects', 'av-aip-2-dpx', 'av-placeholder1.txt'),
+                    os.path.join(aip_path, 'objects', 'av-aip-2-dpx', 'av-placeholder2.txt'),
+                    os.path.join(aip_path, 'objects', 'av-aip-2-dpx', 'av-placeholder3.txt'),
+                    os.path.join(aip_path, 'objects', 'placeholder-dpx.wav'),
+                    os.path.join(aip_path, 'objects', 'placeholder.cue'),
+                    os.path.join(aip_path, 'objects', 'placeholder.mov')]
+        self.assertEqual(expected, result, "Problem with sort_av_dpx_resume, AIP folder")
+
+        # Test for contents of the movs-to-bag folder on staging.
+        movs_path = os.path.join(staging_dir, 'movs-to-bag')
+        result = make_directory_list(movs_path)
+        expected = [os.path.join(movs_path, 'placeholder.mov')]
+        self.assertEqual(expected, result, "Problem with sort_av_dpx_resume, MOVs folder")
+
+        # Test the journal was deleted.
+        result = os.path.exists(os.path.join(aips_dir, 'av-aip-2_dpx-moves.csv'))
+        self.assertEqual(False, result, "Problem with sort_av_dpx_resume, journal")
+
+    def test_sort_av_dpx_undo(self):
+        """Test for an AV AIP from workflow dpx where a move has an error, so the moves are undone"""
+        # Makes test input, with a folder in objects named the same as a file to be moved, and runs the function.
+        aips_dir = os.path.join(os.getcwd(), 'structure_directory')
+        staging_dir = os.path.join(os.getcwd(), 'staging_for_tests')
+        aip = AIP(aips_dir, 'bmac', 'dpx', 'coll-bmac', 'folder', 'av', 'av-aip-2', 'title', 'InC', 1, True)
+        aip_path = os.path.join(aips_dir, aip.id)
+        shutil.copytree(os.path.join(aips_dir, 'av-aip-2_copy'), aip_path)
+        data = os.path.join(aip_path, 'data')
+        objects = os.path.join(aip_path, 'objects')
+        moves = [['move', os.path.join(data, 'av-aip-2'), os.path.join(objects, 'av-aip-2-dpx')],
+                 ['copy', os.path.join(data, 'placeholder.mov'),
+                  os.path.join(staging_dir, 'movs-to-bag', 'placeholder.mov')],
+                 ['move', os.path.join(data, 'placeholder.mov'), os.path.join(objects, 'placeholder.mov')],
+                 ['move', os.path.join(data, 'placeholder.cue'), os.path.join(objects, 'placeholder.cue')]]
+        with open(os.path.join(aips_dir, 'av-aip-2_dpx-moves.csv'), 'w', newline='') as journal:
+            csv.writer(journal).writerows(moves)
+        os.makedirs(os.path.join(objects, 'placeholder.cue', 'Blocking Folder'))
+        step_result = structure_directory(aip, staging_dir)
+
+        # Test for the step result.
+        expected = StepResult(False, 'dpx_move_error')
+        self.assertEqual(expected, step_result, "Problem with sort_av_dpx_undo, step result")
+
+        # Test for the contents of the AIP folder, which has everything back in the data folder.
+        aip_path = os.path.join(staging_dir, 'aips-with-errors', 'dpx_move_error', aip.id)
+        result = make_directory_list(aip_path)
+        expected = [os.path.join(aip_path, 'bag-info.txt'),
+                    os.path.join(aip_path, 'bagit.txt'),
+                    os.path.join(aip_path, 'data'),
+                    os.path.join(aip_path, 'data', 'av-aip-2'),
+                    os.path.join(aip_path, 'data', 'av-aip-2', 'av-placeholder1.txt'),
+                    os.path.join(aip_path, 'data', 'av-aip-2', 'av-placeholder2.txt'),
+                    os.path.join(aip_path, 'data', 'av-aip-2', 'av-placeholder3.txt'),
+                    os.path.join(aip_path, 'data', 'placeholder.cue'),
+                    os.path.join(aip_path, 'data', 'placeholder.mov'),
+                    os.path.join(aip_path, 'data', 'placeholder.wav'),
+                    os.path.join(aip_path, 'data', 'placeholder2.mov'),
+                    os.path.join(aip_path, 'data', 'placeholder2.wav'),
+                    os.path.join(aip_path, 'manifest-md5.txt'),
+                    os.path.join(aip_path, 'objects'),
+                    os.path.join(aip_path, 'objects', 'placeholder.cue'),
+                    os.path.join(aip_path, 'objects', 'placeholder.cue', 'Blocking Folder'),
+                    os.path.join(aip_path, 'tagmanifest-md5.txt')]
+        self.assertEqual(expected, result, "Problem with sort_av_dpx_undo, AIP folder")
+
+        # Test for contents of the movs-to-bag folder on staging, which should not have the copy.
+        movs_path = os.path.join(staging_dir, 'movs-to-bag')
+        result = make_directory_list(movs_path)
+        self.assertEqual([], result, "Problem with sort_av_dpx_undo, MOVs folder")
+
+        # Test the journal was deleted.
+        result = os.path.exists(os.path.join(aips_dir, 'av-aip-2_dpx-moves.csv'))
+        self.assertEqual(False, result, "Problem with sort_av_dpx_undo, journal")
+
     def test_sort_av_metadata(self):
         """Test for an AV AIP which contains files that go in the metadata subfolder"""
         # Makes test input (AIP instance and AIP directory with files) and runs the function being tested.
@@ -0,0 +1,117 @@
+"""Testing for the function transform_fits, which takes an AIP class instance as input and
+makes the preservation.xml from the FITS output already in the metadata folder.
+For Saxon (PRESERVATION_XML_ENGINE is "saxon"), the result is compared to running the two stylesheets separately
+(make_cleaned_fits_xml and make_preservation_xml). The Python result is tested in test_preservation_xml.py.
+There is error handling for the XML transformation."""
+import os
+import shutil
+import unittest
+import configuration as c
+from aip_functions import AIP, make_cleaned_fits_xml, make_preservation_xml, transform_fits
+from test_combine_metadata import read_xml
+
+
+class TestTransformFits(unittest.TestCase):
+
+    def setUp(self):
+        """Uses Saxon to make the preservation.xml, saving the engine in the configuration to restore after the test"""
+        self.engine = getattr(c, 'PRESERVATION_XML_ENGINE', None)
+        c.PRESERVATION_XML_ENGINE = 'saxon'
+
+    def tearDown(self):
+        """If they are present, deletes the script outputs."""
+        # Restores the engine in the configuration.
+        if self.engine is None:
+            del c.PRESERVATION_XML_ENGINE
+        else:
+            c.PRESERVATION_XML_ENGINE = self.engine
+
+        # Deletes the folders with copies of the test AIPs.
+        for folder in ('pipeline', 'steps'):
+            folder_path = os.path.join(os.getcwd(), 'transform_fits', folder)
+            if os.path.exists(folder_path):
+                shutil.rmtree(folder_path)
+
+        # Deletes the errors folder from the error test.
+        errors_path = os.path.join(os.getcwd(), 'staging', 'aips-with-errors')
+        if os.path.exists(errors_path):
+            shutil.rmtree(errors_path)
+
+    def test_correct(self):
+        """Test for making the same preservation.xml as running each stylesheet separately, without a cleaned-fits.xml"""
+        # Makes one copy of the AIP for each way of making the preservation.xml and runs the functions.
+        test_dir = os.path.join(os.getcwd(), 'transform_fits')
+        staging_dir = os.path.join(os.getcwd(), 'staging')
+        aips = {}
+        for folder in ('pipeline', 'steps'):
+            shutil.copytree(os.path.join(test_dir, 'aip1_copy'), os.path.join(test_dir, folder, 'aip1'))
+            aips[folder] = AIP(os.path.join(test_dir, folder), 'dept', None, 'coll-1', 'aip_folder', 'general',
+                               'aip1', 'title', 'InC', '1', 'zip')
+        transform_fits(aips['pipeline'], staging_dir)
+        make_cleaned_fits_xml(aips['steps'], staging_dir)
+        make_preservation_xml(aips['steps'], staging_dir)
+
+        # Compares the preservation.xml files made each way.
+        result = read_xml(os.path.join(test_dir, 'pipeline', 'aip1', 'metadata', 'aip1_preservation.xml'))
+        expected = read_xml(os.path.join(test_dir, 'steps', 'aip1', 'metadata', 'aip1_preservation.xml'))
+        self.assertEqual(expected, result, "Problem with correct, preservation.xml")
+
+        # Tests the cleaned-fits.xml was not saved.
+        result = os.path.exists(os.path.join(test_dir, 'pipeline', 'aip1', 'metadata', 'aip1_cleaned-fits.xml'))
+        self.assertEqual(False, result, "Problem with correct, cleaned-fits.xml")
+
+    def test_error(self):
+        """Test for error handling (no combined-fits.xml present), which is logged as an error with the cleaned FITS"""
+        # Makes the input variables and runs the function being tested.
+        test_dir = os.path.join(os.getcwd(), 'transform_fits')
+        staging_dir = os.path.join(os.getcwd(), 'staging')
+        shutil.copytree(os.path.join(test_dir, 'aip0_copy'), os.path.join(test_dir, 'pipeline', 'aip0'))
+        aip = AIP(os.path.join(test_dir, 'pipeline'), 'dept', None, 'coll-1', 'aip_folder', 'general', 'aip0',
+                  'title', 'InC', '1', 'zip')
+        transform_fits(aip, staging_dir)
+
+        # Test for if the folder is moved (in error folder and not in aips directory).
+        result = (os.path.exists(os.path.join(staging_dir, 'aips-with-errors', 'cleaned_fits_saxon_error', 'aip0')),
+                  os.path.exists(os.path.join(test_dir, 'pipeline', 'aip0')))
+        expected = (True, False)
+        self.assertEqual(expected, result, "Problem with error handling, move to error folder")
+
+        # Test for the AIP log, PresXML.
+        # Output has a different line separator (\r\n or \n) depending on the OS the test is run on.
+        combined_fits = os.path.join(test_dir, 'pipeline', 'aip0', 'metadata', 'aip0_combined-fits.xml')
+        result = aip.log['PresXML']
+        expected = [f'Issue when creating cleaned-fits.xml. Saxon error: Source file {combined_fits} does not exist\r\n',
+                    f'Issue when creating cleaned-fits.xml. Saxon error: Source file {combined_fits} does not exist\n']
+        self.assertIn(result, expected, "Problem with error handling, log: PresXML")
+
+        # Test for the AIP log, Complete.
+        result = aip.log['Complete']
+        expected = 'Error during processing'
+        self.assertEqual(expected, result, "Problem with error handling, log: Complete")
+
+    def test_error_python(self):
+        """Test for error handling with Python (FITS with a size that is not a number), which moves the AIP"""
+        # Makes the input variables and runs the function being tested.
+        c.PRESERVATION_XML_ENGINE = 'python'
+        test_dir = os.path.join(os.getcwd(), 'transform_fits')
+        staging_dir = os.path.join(os.getcwd(), 'staging')
+        shutil.copytree(os.path.join(test_dir, 'aip2_copy'), os.path.join(test_dir, 'pipeline', 'aip2'))
+        aip = AIP(os.path.join(test_dir, 'pipeline'), 'dept', None, 'coll-1', 'aip_folder', 'general', 'aip2',
+                  'title', 'InC', '1', 'zip')
+        transform_fits(aip, staging_dir)
+
+        # Test for if the folder is moved (in error folder and not in aips directory).
+        result = (os.path.exists(os.path.join(staging_dir, 'aips-with-errors', 'pres_xml_python_error', 'aip2')),
+                  os.path.exists(os.path.join(test_dir, 'pipeline', 'aip2')))
+        expected = (True, False)
+        self.assertEqual(expected, result, "Problem with error handling python, move to error folder")
+
+        # Test for the AIP log.
+        result = [aip.log['PresXML'], aip.log['Complete']]
+        expected = ["Issue when creating preservation.xml. Python error: ValueError: "
+                    "could not convert string to float: 'unknown'", 'Error during processing']
+        self.assertEqual(expected, result, "Problem with error handling python, log")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+"""Unpack a packaged AIP retrieved from ARCHive and validate the bag in a single pass
+
+The packaged AIP is named {aip_id}_bag.{size}.tar.bz2 (or .tar if it was not zipped), the same as made by package().
+Before unpacking, the script checks there is enough free space for the size in the filename.
+The bz2 decompression runs in a separate process so it happens at the same time as the untar,
+and the checksums of every file are calculated while it is written, so the data is only read once.
+
+The result is a validated bag, which can be edited and then finished with finish_aip.py.
+
+Parameters:
+    package_path (required): path to the packaged AIP
+    output_path (optional): folder to save the bag to, if not the same folder as the packaged AIP
+
+Returns:
+    The bag, named {aip_id}_bag, in the output folder
+    Prints the result of the validation to the terminal
+"""
+import hashlib
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+
+# Checksum algorithms calculated while unpacking, which are the ones used by make_bag().
+ALGORITHMS = ('md5', 'sha256')
+
+
+def check_space(package_path, output_path):
+    """Get the bag name and size from the package filename and verify there is enough free space to unpack it
+
+    Parameters:
+        package_path (string) - path to the packaged AIP
+        output_path (string) - folder to save the bag to
+
+    Returns:
+        bag_name (string) - the name of the bag folder, or None if the filename is not the expected format
+        errors_list (list) - a list of errors, or an empty list if there were no errors
+    """
+    match = re.match(r'(.+_bag)\.(\d+)\.tar(\.bz2)?$', os.path.basename(package_path))
+    if not match:
+        return None, [f'Package name "{os.path.basename(package_path)}" is not the expected format '
+                      f'(aip-id_bag.size.tar or aip-id_bag.size.tar.bz2).']
+    bag_name, size = match.group(1), int(match.group(2))
+
+    if not os.path.isdir(output_path):
+        return bag_name, [f'Output folder "{output_path}" is not a valid directory.']
+    errors_list = []
+    if os.path.exists(os.path.join(output_path, bag_name)):
+        errors_list.append(f'Bag "{bag_name}" is already in the output folder.')
+    free_space = shutil.disk_usage(output_path).free
+    if free_space < size:
+        errors_list.append(f'Not enough free space to unpack: {size} bytes needed and {free_space} available.')
+    return bag_name, errors_list
+
+
+def decode_manifest_path(path):
+    """Reverse the percent encoding bagit uses for line breaks and % in manifest file paths"""
+    return re.sub(r'%0D', '\r', re.sub(r'%0A', '\n', path, flags=re.I), flags=re.I).replace('%25', '%')
+
+
+def open_package(package_path):
+    """Open the packaged AIP as a stream of tar members
+
+    For tar.bz2, the decompression is done by bzip2 (Mac/Linux) or 7-Zip (Windows) in a separate process,
+    which streams the tar to this script as it is decompressed.
+
+    Parameter: package_path (string) - path to the packaged AIP
+    Returns:
+        tar (tarfile.TarFile) - the tar, opened for reading in order
+        process (subprocess.Popen) - the decompression process, or None if the package is not zipped
+    """
+    if not package_path.endswith('.bz2'):
+        return tarfile.open(package_path, mode='r|'), None
+    if platform.system() == 'Windows':
+        command = f'"C:/Program Files/7-Zip/7z.exe" e -tbzip2 -so "{package_path}"'
+    else:
+        command = f'bzip2 -dc "{package_path}"'
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+    return tarfile.open(fileobj=process.stdout, mode='r|'), process
+
+
+def unpack(package_path, bag_path):
+    """Untar every file into the bag folder, calculating its checksums and size while it is written
+
+    package() makes tars with "./" at the start of each path (Mac/Linux) or the bag name (Windows),
+    so either is removed to get the path within the bag.
+
+    Parameters:
+        package_path (string) - path to the packaged AIP
+        bag_path (string) - path to the bag folder to make
+
+    Returns:
+        digests (dictionary) - path within the bag as key and a dictionary of algorithm: checksum as value
+        errors_list (list) - a list of errors, or an empty list if there were no errors
+    """
+    digests = {}
+    errors_list = []
+    bag_name = os.path.basename(bag_path)
+    tar, process = open_package(package_path)
+    with tar:
+        for member in tar:
+            # Calculates the path within the bag and skips anything that would be saved outside the bag.
+            parts = [part for part in member.name.split('/') if part not in ('', '.')]
+            if parts and parts[0] == bag_name:
+                parts = parts[1:]
+            if '..' in parts or os.path.isabs(member.name):
+                errors_list.append(f'Skipped path outside of the bag: {member.name}')
+                continue
+            path = os.path.join(bag_path, *parts)
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+            elif member.isfile():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                hashes = {algorithm: hashlib.new(algorithm) for algorithm in ALGORITHMS}
+                with tar.extractfile(member) as source, open(path, 'wb') as destination:
+                    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                        destination.write(chunk)
+                        for algorithm_hash in hashes.values():
+                            algorithm_hash.update(chunk)
+                digests['/'.join(parts)] = {algorithm: hashes[algorithm].hexdigest() for algorithm in hashes}
+                os.utime(path, (member.mtime, member.mtime))
+    if process:
+        process.wait()
+        if process.returncode != 0:
+            errors_list.append(f'Could not decompress: {process.stderr.read().decode("utf-8")}')
+    return digests, errors_list
+
+
+def validate(bag_path, digests):
+    """Validate the bag using the checksums calculated while unpacking, instead of reading every file again
+
+    Checks that every file in the manifests and tag manifests was unpacked with the same checksum,
+    every payload file is in the manifests, and the payload matches the Payload-Oxum in bag-info.txt.
+
+    Parameters:
+        bag_path (string) - path to the bag folder
+        digests (dictionary) - path within the bag as key and a dictionary of algorithm: checksum as value
+
+    Returns: errors_list (list) - a list of errors, or an empty list if the bag is valid
+    """
+    errors_list = []
+    manifests = [item for item in os.listdir(bag_path) if re.match(r'(tag)?manifest-\w+\.txt$', item)]
+    if not any(manifest_name.startswith('manifest-') for manifest_name in manifests):
+        return ['Bag has no payload manifest.']
+
+    payload_in_manifest = set()
+    for manifest_name in sorted(manifests):
+        algorithm = re.match(r'(?:tag)?manifest-(\w+)\.txt', manifest_name).group(1)
+        with open(os.path.join(bag_path, manifest_name), 'r', encoding='utf-8') as manifest_file:
+            for line in manifest_file:
+                if not line.strip():
+                    continue
+                expected, path = line.rstrip('\r\n').split(maxsplit=1)
+                path = decode_manifest_path(path)
+                if manifest_name.startswith('manifest-'):
+                    payload_in_manifest.add(path)
+                if path not in digests:
+                    errors_list.append(f'{path} exists in manifest but was not found in the package.')
+                elif algorithm not in digests[path]:
+                    errors_list.append(f'{path} uses {algorithm}, which was not calculated while unpacking.')
+                elif digests[path][algorithm] != expected.lower():
+                    errors_list.append(f'{path} {algorithm} validation failed: '
+                                       f'expected="{expected}" found="{digests[path][algorithm]}"')
+
+    payload = [path for path in digests if path.startswith('data/')]
+    for path in sorted(set(payload) - payload_in_manifest):
+        errors_list.append(f'{path} exists in the package but is not in the manifest.')
+
+    # Compares the size and number of payload files to the Payload-Oxum, if bag-info.txt has one.
+    if not os.path.exists(os.path.join(bag_path, 'bag-info.txt')):
+        return errors_list
+    with open(os.path.join(bag_path, 'bag-info.txt'), 'r', encoding='utf-8') as bag_info:
+        for line in bag_info:
+            if line.startswith('Payload-Oxum'):
+                oxum = line.split(':', 1)[1].strip()
+                size = sum(os.path.getsize(os.path.join(bag_path, *path.split('/'))) for path in payload)
+                if oxum != f'{size}.{len(payload)}':
+                    errors_list.append(f'Payload-Oxum validation failed: expected {oxum}, found {size}.{len(payload)}')
+    return errors_list
+
+
+if __name__ == '__main__':
+
+    # Gets the paths from the script arguments. The bag is saved next to the package unless a folder is given.
+    package_location = sys.argv[1]
+    output_folder = sys.argv[2] if len(sys.argv) > 2 else os.path.dirname(os.path.abspath(package_location))
+
+    # Verifies there is enough space to unpack the AIP. If not, exits the script.
+    bag_folder, space_errors = check_space(package_location, output_folder)
+    if space_errors:
+        print('\nCannot unpack the AIP:')
+        for error in space_errors:
+            print('   * ' + error)
+        sys.exit(1)
+
+    # Unpacks and validates the bag. If the bag is not valid, exits the script with an error.
+    bag_location = os.path.join(output_folder, bag_folder)
+    file_digests, unpack_errors = unpack(package_location, bag_location)
+    bag_errors = unpack_errors + validate(bag_location, file_digests)
+    if bag_errors:
+        print('\nBag is not valid:')
+        for error in bag_errors:
+            print('   * ' + error)
+        sys.exit(1)
+    print(f'\nBag is valid: {bag_location}')
@@ -0,0 +1,237 @@
+"""Verify the packaged AIPs in a folder against the MD5 manifests before they are ingested into ARCHive
+
+Every manifest_*.txt in the folder is read, and the MD5 of every packaged AIP is calculated in parallel.
+The number of AIPs hashed at the same time is limited per storage device,
+so AIPs on different drives are read simultaneously without overloading a single drive.
+
+The results are saved to verification_results.csv in the folder.
+If the script is run again, AIPs that were already valid and have not changed since (same size and date modified)
+are not hashed again.
+
+Parameters:
+    aips_ready_path (required): path to the aips-ready-to-ingest folder with the packaged AIPs
+    manifests_path (optional): path to the folder with the manifests, if not the same as aips_ready_path
+        For the av AIP type, this is the md5-manifests-for-aips folder
+
+Returns:
+    verification_results.csv in aips_ready_path with the result for every AIP
+    Prints a summary of missing, extra and mismatched AIPs to the terminal
+"""
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import os
+import sys
+
+# Number of AIPs from the same storage device which are hashed at the same time.
+WORKERS_PER_DEVICE = 2
+
+
+def check_arguments(arguments):
+    """Verify the script arguments are correct
+
+    Parameter: arguments (list) - sys.argv list of script arguments
+    Returns: aips_ready_path (string or None), manifests_path (string or None),
+             and a list of errors, which is empty if there were no errors
+    """
+    errors_list = []
+    aips_ready_path = None
+    manifests_path = None
+
+    # Checks the required argument (aips_ready_path) is present and a valid path.
+    if len(arguments) == 1:
+        errors_list.append('Required argument is missing: aips_ready_path.')
+    elif os.path.isdir(arguments[1]):
+        aips_ready_path = arguments[1]
+    else:
+        errors_list.append(f'Provided aips_ready_path "{arguments[1]}" is not a valid directory.')
+
+    # Checks the optional argument (manifests_path), if present, is a valid path.
+    # The manifests are in the same folder as the AIPs unless it is given.
+    if len(arguments) > 2:
+        if os.path.isdir(arguments[2]):
+            manifests_path = arguments[2]
+        else:
+            errors_list.append(f'Provided manifests_path "{arguments[2]}" is not a valid directory.')
+    else:
+        manifests_path = aips_ready_path
+
+    # Checks if there are too many arguments.
+    if len(arguments) > 3:
+        errors_list.append('Too many script arguments. The maximum expected is 2.')
+
+    return aips_ready_path, manifests_path, errors_list
+
+
+def check_results(previous_results, aip_path, manifest_md5):
+    """Check if an AIP was verified by a previous run of this script and has not changed since
+
+    Parameters:
+        previous_results (dictionary) - package name as key and a dictionary of the row from the last run as value
+        aip_path (string) - path to the packaged AIP
+        manifest_md5 (string) - MD5 for the AIP from the manifest
+
+    Returns: True if the AIP does not need to be hashed again, False if it does
+    """
+    previous = previous_results.get(os.path.basename(aip_path))
+    if previous is None or previous['Result'] != 'Valid' or previous['Manifest_MD5'] != manifest_md5:
+        return False
+    stats = os.stat(aip_path)
+    return previous['Size'] == str(stats.st_size) and previous['Date_Modified'] == str(stats.st_mtime_ns)
+
+
+def get_md5(aip_path):
+    """Calculate the MD5 of a packaged AIP
+
+    Reads the file in large chunks, since packaged AIPs may be many GB.
+
+    Parameter: aip_path (string) - path to the packaged AIP
+    Returns: the MD5 (string)
+    """
+    md5 = hashlib.md5()
+    with open(aip_path, 'rb') as aip_file:
+        for chunk in iter(lambda: aip_file.read(1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def hash_by_device(aip_paths):
+    """Calculate the MD5 of each AIP, hashing AIPs on different storage devices in parallel
+
+    Parameter: aip_paths (list) - paths to the packaged AIPs to hash
+    Returns: md5_dict (dictionary) - path to the packaged AIP as key and MD5 as value
+    """
+    # Groups the AIPs by the storage device they are saved on.
+    devices = {}
+    for aip_path in aip_paths:
+        devices.setdefault(os.stat(aip_path).st_dev, []).append(aip_path)
+
+    # Starts a pool of workers for each device, so the limit applies to each device separately.
+    executors = []
+    futures = {}
+    for device_paths in devices.values():
+        executor = ThreadPoolExecutor(max_workers=WORKERS_PER_DEVICE)
+        executors.append(executor)
+        for aip_path in device_paths:
+            futures[aip_path] = executor.submit(get_md5, aip_path)
+
+    md5_dict = {aip_path: future.result() for aip_path, future in futures.items()}
+    for executor in executors:
+        executor.shutdown()
+    return md5_dict
+
+
+def read_manifests(manifests_path):
+    """Read every manifest in a folder
+
+    The manifest has one line per AIP, formatted md5_value  filename.ext
+
+    Parameter: manifests_path (string) - path to the folder with the manifests
+    Returns: manifest_dict (dictionary) - package name as key and a tuple of MD5 and manifest name as value
+    """
+    manifest_dict = {}
+    for manifest_name in sorted(os.listdir(manifests_path)):
+        if manifest_name.startswith('manifest') and manifest_name.endswith('.txt'):
+            with open(os.path.join(manifests_path, manifest_name), 'r', encoding='utf-8') as manifest_file:
+                for line in manifest_file:
+                    if line.strip():
+                        md5, package_name = line.strip().split(maxsplit=1)
+                        manifest_dict[package_name] = (md5, manifest_name)
+    return manifest_dict
+
+
+def read_results(results_path):
+    """Read the results from a previous run of this script, if any
+
+    Parameter: results_path (string) - path to verification_results.csv
+    Returns: results (dictionary) - package name as key and a dictionary of the row as value
+    """
+    results = {}
+    if os.path.exists(results_path):
+        with open(results_path, 'r', newline='', encoding='utf-8') as results_file:
+            for row in csv.DictReader(results_file):
+                results[row['Package']] = row
+    return results
+
+
+def verify(aips_ready_path, manifests_path):
+    """Compare the packaged AIPs in a folder to the manifests and save the results
+
+    Parameters:
+        aips_ready_path (string) - path to the folder with the packaged AIPs
+        manifests_path (string) - path to the folder with the manifests
+
+    Returns: rows (list) - one dictionary per AIP, with the same keys as the columns of verification_results.csv
+    """
+    results_path = os.path.join(aips_ready_path, 'verification_results.csv')
+    previous_results = read_results(results_path)
+    manifest_dict = read_manifests(manifests_path)
+    packages = [item for item in os.listdir(aips_ready_path) if item.endswith(('.tar', '.tar.bz2'))]
+
+    # Finds which AIPs must be hashed: in a manifest and the folder, and not already verified.
+    to_hash = []
+    for package_name in packages:
+        if package_name in manifest_dict:
+            aip_path = os.path.join(aips_ready_path, package_name)
+            if not check_results(previous_results, aip_path, manifest_dict[package_name][0]):
+                to_hash.append(aip_path)
+    md5_dict = hash_by_device(to_hash)
+
+    # Makes the result for every AIP in the manifests or the folder.
+    rows = []
+    for package_name in sorted(set(manifest_dict) | set(packages)):
+        manifest_md5, manifest_name = manifest_dict.get(package_name, ('', ''))
+        aip_path = os.path.join(aips_ready_path, package_name)
+        row = {'Package': package_name, 'Manifest': manifest_name, 'Manifest_MD5': manifest_md5,
+               'Package_MD5': '', 'Size': '', 'Date_Modified': '', 'Result': '', 'Time_Verified': ''}
+        if package_name not in packages:
+            row['Result'] = 'Missing'
+        elif package_name not in manifest_dict:
+            row['Result'] = 'Extra'
+        elif aip_path not in md5_dict:
+            row = previous_results[package_name]
+        else:
+            stats = os.stat(aip_path)
+            row['Package_MD5'] = md5_dict[aip_path]
+            row['Size'] = str(stats.st_size)
+            row['Date_Modified'] = str(stats.st_mtime_ns)
+            row['Result'] = 'Valid' if md5_dict[aip_path] == manifest_md5 else 'Mismatch'
+            row['Time_Verified'] = str(datetime.now())
+        rows.append(row)
+
+    # Saves the results, replacing results from any previous run.
+    with open(results_path, 'w', newline='', encoding='utf-8') as results_file:
+        results_writer = csv.DictWriter(results_file, fieldnames=['Package', 'Manifest', 'Manifest_MD5',
+                                                                  'Package_MD5', 'Size', 'Date_Modified', 'Result',
+                                                                  'Time_Verified'])
+        results_writer.writeheader()
+        results_writer.writerows(rows)
+
+    return rows
+
+
+if __name__ == '__main__':
+
+    # Gets the paths from the script arguments. The manifests are in the same folder unless a second path is given.
+    # If there are errors, ends the script.
+    aips_ready_folder, manifests_folder, argument_errors = check_arguments(sys.argv)
+    if argument_errors:
+        print('\nProblems detected with the provided script arguments:')
+        for error in argument_errors:
+            print('   * ' + error)
+        print('\nTo run: python verify_aips.py aips_ready_path [manifests_path]')
+        sys.exit(1)
+
+    # Verifies the AIPs and prints any problems. Exits with an error if any AIP is not valid.
+    verification_rows = verify(aips_ready_folder, manifests_folder)
+    problems = [row for row in verification_rows if row['Result'] != 'Valid']
+    for result_type in ('Missing', 'Extra', 'Mismatch'):
+        packages_list = [row['Package'] for row in problems if row['Result'] == result_type]
+        if packages_list:
+            print(f'\n{result_type}:')
+            for package in packages_list:
+                print(f'   * {package}')
+    print(f'\nVerified {len(verification_rows) - len(problems)} of {len(verification_rows)} AIPs.')
+    if problems:
+        sys.exit(1)
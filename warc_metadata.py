@@ -0,0 +1,112 @@
+"""Get the format, size, MD5, and crawl software of a WARC by streaming it once, without FITS
+
+Used by stream_warcs() in aip_functions.py for web AIPs when WARC_STREAMING is True in configuration.py.
+The header of each record is read line by line and the record content is read in chunks,
+so memory use does not depend on the size of the WARC, and the MD5 is calculated from the same reads.
+The crawl software is from the first warcinfo record, which Heritrix (used by Archive-It) puts at the start of each WARC.
+Compressed WARCs (.warc.gz) are not read and get FITS.
+"""
+from collections import namedtuple
+import hashlib
+import re
+
+# The information about one WARC used for its FITS output.
+# Software is a tuple of (name, version), or None if the WARC does not have a warcinfo record with the software.
+WarcInfo = namedtuple('WarcInfo', 'version size md5 software records')
+
+# Tool name and version for the FITS output made from the WARC.
+TOOL_NAME = 'WARC streaming'
+TOOL_VERSION = '1.0'
+
+# PRONOM identifiers for each WARC version.
+VERSIONS = {'1.0': 'fmt/289', '1.1': 'fmt/1355'}
+
+# Longest header line read. A longer line means the file is not a WARC or the record is damaged.
+MAX_LINE = 65536
+
+
+def characterize(path):
+    """Read every record in a WARC to get its version, size, MD5, crawl software, and number of records
+
+    Parameters:
+        path : path to the WARC
+
+    Returns:
+        warc_info : WarcInfo, or None if the file is not an uncompressed WARC that can be read to the end
+    """
+    md5 = hashlib.md5()
+    size = 0
+    version = None
+    software = None
+    records = 0
+    with open(path, 'rb') as warc:
+        while True:
+            line = warc.readline(MAX_LINE)
+            md5.update(line)
+            size += len(line)
+            if not line:
+                break
+            # Records are separated by two blank lines.
+            if line in (b'\r\n', b'\n'):
+                continue
+            version_line = re.match(rb'WARC/(\d\.\d)\r?\n$', line)
+            if not version_line or version_line.group(1).decode() not in VERSIONS:
+                return None
+            version = version or version_line.group(1).decode()
+
+            # Reads the record headers, which end with a blank line.
+            headers = {}
+            while True:
+                line = warc.readline(MAX_LINE)
+                md5.update(line)
+                size += len(line)
+                if not line.endswith(b'\n'):
+                    return None
+                if line in (b'\r\n', b'\n'):
+                    break
+                name, separator, value = line.decode('utf-8', errors='replace').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            try:
+                remaining = int(headers['content-length'])
+            except (KeyError, ValueError):
+                return None
+
+            # Reads the record content. Only the first warcinfo record is kept, to get the crawl software.
+            keep = headers.get('warc-type') == 'warcinfo' and software is None
+            content = b''
+            while remaining:
+                chunk = warc.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    return None
+                md5.update(chunk)
+                size += len(chunk)
+                remaining -= len(chunk)
+                if keep and len(content) < MAX_LINE:
+                    content += chunk
+            if keep:
+                software = crawl_software(content)
+            records += 1
+
+    if version is None:
+        return None
+    return WarcInfo(version, size, md5.hexdigest(), software, records)
+
+
+def crawl_software(warcinfo):
+    """Get the name and version of the crawl software from the content of a warcinfo record
+
+    The software field is formatted name/version, followed by an optional URL, for example
+    "software: Heritrix/3.4.0-20200304 http://crawler.archive.org"
+
+    Parameters:
+        warcinfo : content of the warcinfo record (bytes)
+
+    Returns:
+        software : tuple of (name, version), or None if there is no software field
+    """
+    for line in warcinfo.decode('utf-8', errors='replace').splitlines():
+        name, separator, value = line.partition(':')
+        if name.strip().lower() == 'software' and value.strip():
+            software_name, separator, software_version = value.split()[0].partition('/')
+            return software_name, software_version or None
+    return None
@@ -0,0 +1,125 @@
+"""Watches the AIPs directory and makes AIPs from folders as soon as they are done being copied into it
+
+Instead of waiting for a whole batch to be copied and the metadata.csv to be finished before running general_aip.py,
+this keeps running and makes each AIP as soon as its folder is ready, using the same steps, aip_log.csv, and manifests.
+Rows can be added to the end of metadata.csv at any time, before or after the folder is copied.
+A folder is ready when it has a row in metadata.csv and either a file named with the folder name and ".complete"
+is made in the AIPs directory (for example, "FD001_Text.complete"), or nothing in it has changed for QUIET_PERIOD.
+See find_ready_aips() in aip_functions.py. The AIPs directory is checked every POLL_INTERVAL seconds.
+
+Each folder is checked with preflight() before it is made into an AIP, and is skipped if there are problems,
+which are added to preflight_issues.csv. A skipped folder is checked again once anything in it changes
+or its .complete file is made again, so it can be fixed without restarting the script.
+Folders are not split (split_aips()), since that rewrites metadata.csv while it may be added to,
+so general folders over AIP_MAX_FILES or AIP_MAX_SIZE are skipped by the preflight check.
+If there is a problem with metadata.csv, it is printed and no AIPs are made until it is fixed.
+
+Stop the script with Ctrl+C. If it is stopped while making an AIP, that AIP is left where it was stopped,
+the same as if general_aip.py was stopped.
+
+Parameters:
+    aips_directory : required,  folder that contains the folders to be made into AIPs, which must have metadata.csv
+    aip_type : required, either av, general, or web
+    zip_method : required, either tar or tar-bz2
+    workflow : optional, one of the AV workflows
+
+Returns:
+    The same as general_aip.py, for every folder made into an AIP while the script is running
+"""
+
+import os
+import sys
+import time
+import aip_functions as a
+import configuration
+
+# Seconds between each check of the AIPs directory.
+POLL_INTERVAL = 30
+
+# Seconds a folder must not change to be ready, if it does not have a .complete file.
+QUIET_PERIOD = 600
+
+if __name__ == '__main__':
+
+    # Verifies the script arguments and configuration file are correct. If not, ends the script.
+    AIPS_DIRECTORY, AIP_TYPE, ZIP, WORKFLOW, aip_metadata_csv, argument_errors = a.check_arguments(sys.argv)
+    if len(argument_errors) > 0:
+        print('\nProblems detected with the provided script arguments:')
+        for error in argument_errors:
+            print("   * " + error)
+        sys.exit()
+    configuration_errors = a.check_configuration(AIPS_DIRECTORY)
+    if len(configuration_errors) > 0:
+        print('\nProblems detected with configuration.py:')
+        for error in configuration_errors:
+            print("   * " + error)
+        sys.exit()
+
+    # Makes directories used to store script outputs in the AIP_STAGING directory.
+    a.make_output_directories(configuration.AIP_STAGING, AIP_TYPE)
+    MAX_FILES = getattr(configuration, 'AIP_MAX_FILES', None)
+    MAX_SIZE = getattr(configuration, 'AIP_MAX_SIZE', None)
+
+    # The folders being watched (see find_ready_aips()), the folders that were made into AIPs,
+    # the folders skipped for preflight problems, with their inventory and .complete date modified when checked,
+    # and the last problems with metadata.csv, so they are only printed when they change.
+    watched = {}
+    finished = set()
+    skipped = {}
+    last_errors = []
+
+    print(f'\nWatching {AIPS_DIRECTORY} for AIP folders. Press Ctrl+C to stop.')
+    try:
+        while True:
+
+            # Reads metadata.csv again, since rows may have been added. Folders are not compared to the rows,
+            # since either may be added first. If there are problems, waits for them to be fixed.
+            metadata_rows, metadata_errors = a.check_metadata_csv(aip_metadata_csv, AIPS_DIRECTORY,
+                                                                  check_folders=False)
+            if len(metadata_errors) > 0:
+                if metadata_errors != last_errors:
+                    print('\nProblems detected with metadata.csv. No AIPs will be made until they are fixed:')
+                    for error in metadata_errors:
+                        print("   * " + error)
+                metadata_rows = []
+            last_errors = metadata_errors
+            metadata_rows = [row for row in metadata_rows if row.Folder not in finished]
+
+            for aip_row in a.find_ready_aips(AIPS_DIRECTORY, metadata_rows, watched, QUIET_PERIOD):
+
+                # Skips a folder that had preflight problems, unless it or its .complete file changed since.
+                complete_path = os.path.join(AIPS_DIRECTORY, f'{aip_row.Folder}.complete')
+                state = (dict(watched[aip_row.Folder][0].inventory),
+                         os.path.getmtime(complete_path) if os.path.exists(complete_path) else None)
+                if skipped.get(aip_row.Folder) == state:
+                    continue
+
+                # Checks the folder for problems that would cause an error partway through the workflow.
+                preflight_issues = a.preflight(AIPS_DIRECTORY, AIP_TYPE, WORKFLOW, [aip_row], MAX_FILES, MAX_SIZE,
+                                               append=True)
+                if len(preflight_issues) > 0:
+                    print(f'\nProblems detected with {aip_row.AIP_ID}, which will be skipped until it changes '
+                          f'(saved to preflight_issues.csv):')
+                    for issue in preflight_issues[aip_row.AIP_ID][:10]:
+                        print(f"   * {issue}")
+                    skipped[aip_row.Folder] = state
+                    continue
+                skipped.pop(aip_row.Folder, None)
+                del watched[aip_row.Folder]
+
+                # Makes the AIP, starting the log if this is the first AIP in the AIPs directory.
+                if not os.path.exists(os.path.join(AIPS_DIRECTORY, 'aip_log.csv')):
+                    a.log("header", AIPS_DIRECTORY)
+                aip = a.AIP(AIPS_DIRECTORY, aip_row.Department, WORKFLOW, aip_row.Collection, aip_row.Folder,
+                            AIP_TYPE, aip_row.AIP_ID, aip_row.Title, aip_row.Rights, aip_row.Version, ZIP)
+                print(f'\n>>>Processing {aip.id}.')
+                a.make_aip(aip, configuration.AIP_STAGING)
+                finished.add(aip_row.Folder)
+
+                # Deletes the .complete file, if there is one, since the folder is no longer in the AIPs directory.
+                if os.path.exists(complete_path):
+                    os.remove(complete_path)
+
+            time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")